@@ -0,0 +1,256 @@
+"""Append-only action traces for RobotVacuum runs, with offline replay.
+
+Attach an ActionTrace to a robot to record every action at full speed with
+no visualizer attached:
+
+	trace = ActionTrace(meta={"room": "large_random"})
+	robot = RobotVacuum(rooms.TEST_ROOMS["large_random"], start=(1, 1), trace=trace)
+	CoveragePlanner(robot).run()
+	trace.save("run.rvt")
+
+and render only the runs worth looking at later:
+
+	python action_trace.py run.rvt --record run.gif
+
+The replay rebuilds the room from the trace's meta: a rooms.TEST_ROOMS name
+in meta["room"], or the batch.RoomSpec that `batch.py --trace-dir` stores
+in meta["room_spec"] (random_room sweeps, room files). --room and
+--room-file override it.
+
+Each entry costs 11 bytes (action, status, row, col, dir_idx) plus 8 for
+the optional timestamp, stored in typed `array` buffers. Obstacles added or
+removed while the robot runs (RobotVacuum.add_obstacle()) are recorded as
+map edits, tagged with the number of actions taken before them, and
+replayed at the same point.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import struct
+import sys
+import time
+from array import array
+from typing import Iterator, NamedTuple, Optional
+
+from grid import OBJECT, RoomGrid
+from scaffolding import Action, RenderPolicy, RobotVacuum, RoomVisualizer, Status
+
+
+TRACE_MAGIC = b"RVTRACE2"
+# version 1 files have no map edits
+_TRACE_MAGIC_V1 = b"RVTRACE1"
+# magic, entry count, start row, start col, start dir, start cleaned, has times, meta length
+_HEADER = struct.Struct("<8sIiiBBBI")
+# map edit count, after the entry columns
+_EDITS = struct.Struct("<I")
+
+
+class TraceEntry(NamedTuple):
+	action: Action
+	status: Status
+	r: int
+	c: int
+	dir_idx: int
+	timestamp: Optional[float]
+
+
+class MapEdit(NamedTuple):
+	at: int      # number of actions taken before the edit
+	r: int
+	c: int
+	code: int    # grid.OBJECT (added) or grid.OPEN (removed)
+
+
+class ActionTrace:
+	"""Compact record of robot actions and their results.
+
+	Args:
+		timestamps: also record time.perf_counter() per action
+		meta: free-form JSON-serializable metadata (e.g. how the room was built)
+	"""
+
+	def __init__(self, timestamps: bool = True, meta: Optional[dict] = None) -> None:
+		self.timestamps = timestamps
+		self.meta = dict(meta or {})
+		self.actions = array("B")
+		self.statuses = array("B")
+		self.rows = array("i")
+		self.cols = array("i")
+		self.dirs = array("B")
+		self.times = array("d")
+		self.edit_at = array("I")
+		self.edit_rows = array("i")
+		self.edit_cols = array("i")
+		self.edit_codes = array("B")
+		self.start = (0, 0)
+		self.start_dir = 0
+		self.start_cleaned = False
+
+	def begin(self, robot: RobotVacuum) -> None:
+		"""Remember the robot's starting pose (called by RobotVacuum)."""
+		self.start = (robot.r, robot.c)
+		self.start_dir = robot.dir_idx
+		self.start_cleaned = (robot.r, robot.c) in robot.cleaned
+
+	def record(self, action: Action, status: Status, r: int, c: int, dir_idx: int) -> None:
+		self.actions.append(action)
+		self.statuses.append(status.value)
+		self.rows.append(r)
+		self.cols.append(c)
+		self.dirs.append(dir_idx)
+		if self.timestamps:
+			self.times.append(time.perf_counter())
+
+	def record_edit(self, r: int, c: int, code: int) -> None:
+		"""Note that cell (r, c) became `code` (called by RobotVacuum)."""
+		self.edit_at.append(len(self.actions))
+		self.edit_rows.append(r)
+		self.edit_cols.append(c)
+		self.edit_codes.append(code)
+
+	def edits(self) -> Iterator[MapEdit]:
+		for i in range(len(self.edit_at)):
+			yield MapEdit(self.edit_at[i], self.edit_rows[i], self.edit_cols[i], self.edit_codes[i])
+
+	def __len__(self) -> int:
+		return len(self.actions)
+
+	def __getitem__(self, i: int) -> TraceEntry:
+		return TraceEntry(
+			Action(self.actions[i]),
+			Status(self.statuses[i]),
+			self.rows[i],
+			self.cols[i],
+			self.dirs[i],
+			self.times[i] if self.timestamps else None,
+		)
+
+	def __iter__(self) -> Iterator[TraceEntry]:
+		for i in range(len(self)):
+			yield self[i]
+
+	def _columns(self):
+		cols = [self.actions, self.statuses, self.rows, self.cols, self.dirs]
+		if self.timestamps:
+			cols.append(self.times)
+		return cols
+
+	def _edit_columns(self):
+		return [self.edit_at, self.edit_rows, self.edit_cols, self.edit_codes]
+
+	@staticmethod
+	def _write_columns(fh, cols) -> None:
+		for col in cols:
+			if sys.byteorder == "big":
+				col = array(col.typecode, col)
+				col.byteswap()
+			col.tofile(fh)
+
+	@staticmethod
+	def _read_columns(fh, cols, n: int) -> None:
+		for col in cols:
+			col.fromfile(fh, n)
+			if sys.byteorder == "big":
+				col.byteswap()
+
+	def save(self, path: str) -> None:
+		meta = json.dumps(self.meta).encode("utf-8")
+		with open(path, "wb") as fh:
+			fh.write(_HEADER.pack(TRACE_MAGIC, len(self), self.start[0], self.start[1],
+					self.start_dir, self.start_cleaned, self.timestamps, len(meta)))
+			fh.write(meta)
+			self._write_columns(fh, self._columns())
+			fh.write(_EDITS.pack(len(self.edit_at)))
+			self._write_columns(fh, self._edit_columns())
+
+	@classmethod
+	def load(cls, path: str) -> "ActionTrace":
+		with open(path, "rb") as fh:
+			magic, n, r, c, d, cleaned, has_times, meta_len = _HEADER.unpack(fh.read(_HEADER.size))
+			if magic not in (TRACE_MAGIC, _TRACE_MAGIC_V1):
+				raise ValueError(f"{path} is not an action trace")
+			trace = cls(timestamps=bool(has_times), meta=json.loads(fh.read(meta_len) or b"{}"))
+			trace.start = (r, c)
+			trace.start_dir = d
+			trace.start_cleaned = bool(cleaned)
+			trace._read_columns(fh, trace._columns(), n)
+			if magic == TRACE_MAGIC:
+				edits, = _EDITS.unpack(fh.read(_EDITS.size))
+				trace._read_columns(fh, trace._edit_columns(), edits)
+		return trace
+
+
+def replay(trace: ActionTrace, room_map, visualizer: Optional[RoomVisualizer] = None,
+		verify: bool = True) -> RobotVacuum:
+	"""Re-run a trace on `room_map`, rendering through `visualizer`.
+
+	The actions are executed against a fresh RobotVacuum placed at the
+	trace's start, so the visualizer sees exactly the original sequence of
+	updates. Recorded map edits are applied to the room (a copy of it, if
+	`room_map` is a RoomGrid) before the action they preceded. With
+	`verify`, a ValueError is raised as soon as a status or pose differs
+	from the recording, or a map edit cannot be repeated (e.g. the wrong
+	room was supplied). Returns the robot in its final state.
+	"""
+	if isinstance(room_map, RoomGrid) and len(trace.edit_at):
+		room_map = room_map.copy()
+	robot = RobotVacuum(room_map, start=trace.start, start_dir=RobotVacuum.DIRS[trace.start_dir],
+			visualizer=visualizer, auto_clean_start=trace.start_cleaned)
+	methods = [getattr(robot, action.method) for action in Action]
+	edits = list(trace.edits())
+	edits.reverse()
+
+	def apply_edits(i: int) -> None:
+		while edits and edits[-1].at == i:
+			edit = edits.pop()
+			if edit.code == OBJECT:
+				status = robot.add_obstacle(edit.r, edit.c)
+			else:
+				status = robot.remove_obstacle(edit.r, edit.c)
+			if verify and status is not Status.OK:
+				raise ValueError(f"replay could not repeat {edit}: {status}")
+
+	for i in range(len(trace)):
+		apply_edits(i)
+		status = methods[trace.actions[i]]()
+		if verify and (status.value != trace.statuses[i] or robot.r != trace.rows[i]
+				or robot.c != trace.cols[i] or robot.dir_idx != trace.dirs[i]):
+			raise ValueError(f"replay diverged from trace at entry {i}: {trace[i]}")
+	apply_edits(len(trace))
+	if visualizer is not None:
+		visualizer.flush()
+	return robot
+
+
+if __name__ == "__main__":
+	import roomfile
+	import rooms
+
+	parser = argparse.ArgumentParser(description="Replay a recorded RobotVacuum trace")
+	parser.add_argument("trace")
+	parser.add_argument("--room", help="name in rooms.TEST_ROOMS (default: from the trace's meta)")
+	parser.add_argument("--room-file", help="binary room file (see roomfile.py) to replay on")
+	parser.add_argument("--record", help="output .gif/.mp4/.rvf (default: PNG frames or a window)")
+	parser.add_argument("--every", type=int, default=1, help="draw every Nth action")
+	args = parser.parse_args()
+
+	trace = ActionTrace.load(args.trace)
+	if args.room_file:
+		# copy-on-write: replayed map edits must not reach the file
+		room = roomfile.open_room(args.room_file, "c")
+	elif args.room:
+		room = rooms.TEST_ROOMS[args.room]
+	else:
+		# imported here because batch imports this module
+		from batch import RoomSpec
+
+		spec = RoomSpec.from_meta(trace.meta)
+		if spec is None:
+			parser.error("trace has no room in its meta; pass --room or --room-file")
+		room = spec.build(writable=True)
+	viz = RoomVisualizer(room, title=f"replay: {args.trace}",
+			record=args.record, policy=RenderPolicy(every=args.every), pause=0.0)
+	robot = replay(trace, viz.grid, viz)
+	viz.close()
+	print(f"replayed {len(trace)} actions, {len(robot.cleaned)} cells cleaned")
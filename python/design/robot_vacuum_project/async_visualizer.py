@@ -0,0 +1,180 @@
+"""Background rendering for RoomVisualizer.
+
+AsyncVisualizer wraps a RoomVisualizer and can be passed to RobotVacuum in
+its place. Each robot update becomes a small immutable snapshot (position,
+direction, newly cleaned cells) on a bounded queue, and a worker thread
+feeds the snapshots to the real visualizer. When the worker falls behind,
+intermediate frames are dropped; their cleaned cells are carried into the
+next snapshot so the picture never loses state.
+
+Matplotlib GUI backends must run on the main thread, so use this with a
+headless visualizer (PNG frames or a `record=` file).
+
+	viz = AsyncVisualizer(RoomVisualizer(room, record="run.rvf"))
+	robot = RobotVacuum(room, start=(1, 1), visualizer=viz)
+	CoveragePlanner(robot).run()
+	viz.close()
+"""
+from __future__ import annotations
+
+import queue
+import threading
+from typing import NamedTuple, Optional, Set, Tuple
+
+from grid import CellSet
+from scaffolding import RoomVisualizer
+
+
+class Snapshot(NamedTuple):
+	pos: Tuple[int, int]
+	dir: str
+	cleaned_delta: Tuple[Tuple[int, int], ...]
+	action: Optional[str]
+	reset: bool = False
+	# cells marked dirty by the producer (see AsyncVisualizer.mark_dirty)
+	dirty: Tuple[Tuple[int, int], ...] = ()
+	# map edits as (r, c, code), applied before drawing (see set_cell)
+	edits: Tuple[Tuple[int, int, int], ...] = ()
+
+
+# queue commands besides snapshots
+_FLUSH = "flush"
+_STOP = "stop"
+
+
+class AsyncVisualizer:
+	"""Drop-in visualizer that renders on a worker thread.
+
+	Args:
+		visualizer: the RoomVisualizer doing the actual drawing
+		max_queue: snapshots allowed in flight before frames are dropped
+	"""
+
+	def __init__(self, visualizer: RoomVisualizer, max_queue: int = 4) -> None:
+		self.visualizer = visualizer
+		self.rows = visualizer.rows
+		self.cols = visualizer.cols
+		self.dropped = 0
+
+		# producer side: cells already forwarded to the worker
+		self._sent = CellSet(self.rows, self.cols)
+		self._carry = []
+		self._carry_reset = False
+		self._carry_dirty = []
+		self._carry_edits = []
+		self._latest: Optional[Snapshot] = None
+		self._latest_queued = True
+
+		# worker side: its own copy of the cleaned cells
+		self._shadow = CellSet(self.rows, self.cols)
+		self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+		self._error: Optional[BaseException] = None
+		self._thread = threading.Thread(target=self._run, name="AsyncVisualizer", daemon=True)
+		self._thread.start()
+
+	def _delta(self, pos: Tuple[int, int], cleaned: Set[Tuple[int, int]]):
+		"""Cells cleaned since the last call; (cells, reset) where reset means a full resync."""
+		n = len(cleaned)
+		if n == len(self._sent):
+			return (), False
+		if n == len(self._sent) + 1 and pos in cleaned and pos not in self._sent:
+			# the common case: the robot just cleaned the cell it is on
+			self._sent.add(pos)
+			return (pos,), False
+		# something else changed the set: send all of it
+		self._sent = CellSet(self.rows, self.cols, cleaned)
+		return tuple(cleaned), True
+
+	def mark_dirty(self, cells) -> None:
+		"""Mark cells for repainting; they travel to the worker with the next snapshot."""
+		self._carry_dirty.extend(cells)
+
+	def set_cell(self, r: int, c: int, code: int) -> None:
+		"""Queue a map edit; the worker applies it before its next frame."""
+		self._carry_edits.append((r, c, code))
+
+	def update(
+		self,
+		robot_pos: Tuple[int, int],
+		robot_dir: str,
+		cleaned: Set[Tuple[int, int]],
+		action: Optional[str] = None,
+	) -> None:
+		"""Queue a snapshot of the robot state; never blocks on drawing."""
+		if self._error is not None:
+			raise RuntimeError("render thread failed") from self._error
+		delta, reset = self._delta(robot_pos, cleaned)
+		if reset:
+			self._carry = list(delta)
+			self._carry_reset = True
+		else:
+			self._carry.extend(delta)
+		snap = Snapshot(robot_pos, robot_dir, tuple(self._carry), action, self._carry_reset,
+				tuple(self._carry_dirty), tuple(self._carry_edits))
+		self._latest = snap
+		try:
+			self._queue.put_nowait(snap)
+		except queue.Full:
+			# back-pressure: drop this frame, keep its cleaned cells for the next one
+			self.dropped += 1
+			self._latest_queued = False
+			return
+		self._latest_queued = True
+		self._carry = []
+		self._carry_reset = False
+		self._carry_dirty = []
+		self._carry_edits = []
+
+	def flush(self) -> None:
+		"""Render the latest state and wait until the worker has caught up."""
+		pending = self._carry_dirty or self._carry_edits
+		if (not self._latest_queued or pending) and self._latest is not None:
+			# dirty cells and edits from after the last snapshot ride along with it again
+			self._queue.put(self._latest._replace(dirty=tuple(self._carry_dirty),
+					edits=tuple(self._carry_edits)))
+			self._latest_queued = True
+			self._carry = []
+			self._carry_reset = False
+			self._carry_dirty = []
+			self._carry_edits = []
+		self._queue.put(_FLUSH)
+		self._queue.join()
+		if self._error is not None:
+			raise RuntimeError("render thread failed") from self._error
+
+	def close(self) -> None:
+		"""Flush, stop the worker and close the wrapped visualizer."""
+		if not self._thread.is_alive():
+			return
+		self.flush()
+		self._queue.put(_STOP)
+		self._thread.join()
+		self.visualizer.close()
+
+	def _run(self) -> None:
+		while True:
+			item = self._queue.get()
+			try:
+				if item == _STOP:
+					return
+				if self._error is not None:
+					continue
+				if item == _FLUSH:
+					self.visualizer.flush()
+					continue
+				if item.reset:
+					self._shadow.clear()
+				for cell in item.cleaned_delta:
+					self._shadow.add(cell)
+				for r, c, code in item.edits:
+					self.visualizer.set_cell(r, c, code)
+				self.visualizer.mark_dirty(item.cleaned_delta)
+				self.visualizer.mark_dirty(item.dirty)
+				self.visualizer.update(item.pos, item.dir, self._shadow, action=item.action)
+			except BaseException as exc:
+				self._error = exc
+			finally:
+				self._queue.task_done()
+
+
+__all__ = ["AsyncVisualizer", "Snapshot"]
@@ -0,0 +1,376 @@
+"""Batch runner: evaluate a coverage planner over many rooms in parallel.
+
+Each job names a planner and a room *spec* (how to build the room, not the
+room itself), so workers build their own grids and nothing large is
+pickled. Runs are headless and traced; metrics are derived from the trace.
+
+Examples:
+
+	# every room in rooms.TEST_ROOMS
+	python batch.py --test-rooms
+
+	# 2 sizes x 3 obstacle densities x 1000 seeds on all cores, JSON lines out
+	python batch.py --sizes 24x36,200x200 --obstacle-probs 0.1,0.2,0.25 \\
+		--seeds 0:1000 --output results.jsonl
+
+	# keep every run's action trace and render one of them afterwards
+	python batch.py --sizes 200x200 --seeds 0:100 --trace-dir traces
+	python action_trace.py traces/random_200x200_p0.12_s7_dfs.rvt --record run.gif
+
+	# coverage time (ticks) of 1, 2, 4 and 8 robot fleets on the same rooms
+	python batch.py --sizes 200x200 --seeds 0:10 --robots 1,2,4,8
+"""
+from __future__ import annotations
+
+import argparse
+import inspect
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import roomfile
+import rooms
+from action_trace import ActionTrace
+from coverage import CoveragePlanner, KnownMapPlanner
+from exploration import ExplorationPlanner
+from grid import RoomGrid
+from reachability import Components, label_components
+from scaffolding import Action, CostModel, Fleet, RobotVacuum, Status
+
+
+# planner name -> class taking (robot) and exposing run()
+PLANNERS = {
+	"dfs": CoveragePlanner,
+	"known": KnownMapPlanner,
+	"explore": ExplorationPlanner,
+}
+
+
+# command-line flag -> planner keyword argument it turns on
+PLANNER_FLAGS = {
+	"--stop-when-done": "stop_when_done",
+	"--clean-on-entry": "clean_on_entry",
+	"--jump": "jump",
+	"--legacy-turns": "legacy_turns",
+}
+
+
+class RoomSpec(NamedTuple):
+	"""How to build a room: a rooms.py generator name and its kwargs.
+
+	The special generator "test" looks up rooms.TEST_ROOMS[kwargs["name"]],
+	and "file" memory-maps the room file kwargs["path"] (see roomfile.py), so
+	workers share one pre-generated map instead of each building a copy.
+	"""
+	label: str
+	generator: str
+	kwargs: Dict
+
+	def build(self, writable: bool = False) -> RoomGrid:
+		"""Build the room; `writable` maps room files copy-on-write instead of read-only."""
+		if self.generator == "test":
+			room = rooms.TEST_ROOMS[self.kwargs["name"]]
+			return room if isinstance(room, RoomGrid) else RoomGrid.from_rows(room)
+		if self.generator == "file":
+			return roomfile.open_room(self.kwargs["path"], "c" if writable else "r")
+		return getattr(rooms, self.generator)(compact=True, **self.kwargs)
+
+	def as_meta(self) -> Dict:
+		"""JSON-serializable description for ActionTrace.meta (see from_meta())."""
+		return {"room": self.label, "room_spec": {"generator": self.generator, "kwargs": dict(self.kwargs)}}
+
+	@classmethod
+	def from_meta(cls, meta: Dict) -> Optional["RoomSpec"]:
+		"""The spec stored by as_meta(), or a TEST_ROOMS lookup for a bare meta["room"]."""
+		spec = meta.get("room_spec")
+		if spec is not None:
+			return cls(meta.get("room", spec["generator"]), spec["generator"], spec["kwargs"])
+		if "room" in meta:
+			return cls(meta["room"], "test", {"name": meta["room"]})
+		return None
+
+
+def test_room_specs(names: Optional[Iterable[str]] = None) -> List[RoomSpec]:
+	names = list(names) if names is not None else list(rooms.TEST_ROOMS)
+	return [RoomSpec(name, "test", {"name": name}) for name in names]
+
+
+def room_file_specs(paths: Iterable[str]) -> List[RoomSpec]:
+	# absolute paths, so traces that record the spec replay from anywhere
+	return [RoomSpec(os.path.basename(path), "file", {"path": os.path.abspath(path)}) for path in paths]
+
+
+def random_room_specs(sizes: Iterable[Tuple[int, int]], seeds: Iterable[int],
+		obstacle_probs: Iterable[float] = (0.12,)) -> List[RoomSpec]:
+	"""Cartesian sweep of rooms.random_room parameters."""
+	specs = []
+	for rows, cols in sizes:
+		for prob in obstacle_probs:
+			for seed in seeds:
+				specs.append(RoomSpec(
+					f"random_{rows}x{cols}_p{prob}_s{seed}", "random_room",
+					{"rows": rows, "cols": cols, "obstacle_prob": prob, "seed": seed}))
+	return specs
+
+
+def first_open_cell(grid: RoomGrid) -> Tuple[int, int]:
+	"""Row-major first passable cell, used as the default start."""
+	for r in range(grid.rows):
+		for c in range(grid.cols):
+			if not grid.is_blocked(r, c):
+				return (r, c)
+	raise ValueError("room has no open cells")
+
+
+def trace_metrics(trace: ActionTrace, rows: int, cols: int) -> Dict[str, int]:
+	"""Action counts from a trace.
+
+	revisits counts successful moves into a cell the robot had already been in.
+	"""
+	turns = moves = failed_moves = revisits = cleans = 0
+	visited = bytearray(rows * cols)
+	visited[trace.start[0] * cols + trace.start[1]] = 1
+	turn_codes = (Action.TURN_LEFT, Action.TURN_RIGHT)
+	move_codes = (Action.FORWARD, Action.BACKWARD)
+	ok = Status.OK.value
+	for action, status, r, c in zip(trace.actions, trace.statuses, trace.rows, trace.cols):
+		if action in turn_codes:
+			turns += 1
+		elif action in move_codes:
+			if status != ok:
+				failed_moves += 1
+				continue
+			moves += 1
+			idx = r * cols + c
+			if visited[idx]:
+				revisits += 1
+			else:
+				visited[idx] = 1
+		elif status == ok:
+			cleans += 1
+	return {
+		"steps": len(trace),
+		"turns": turns,
+		"moves": moves,
+		"failed_moves": failed_moves,
+		"revisits": revisits,
+		"cleans": cleans,
+	}
+
+
+def run_one(job: Tuple[str, RoomSpec, str, Dict, bool]) -> Dict:
+	"""Run one planner on one room headless; returns a metrics dict.
+
+	coverage_pct is relative to the cells reachable from the start, so rooms
+	with walled-off pockets can still reach 100%; open_coverage_pct is
+	relative to every open cell. energy and sim_time_s are the run's cost
+	under the default CostModel. With `profile`, the run_stats.RunStats of
+	the run are included under "stats".
+	"""
+	planner_name, spec, start_dir, planner_kwargs, profile, trace_dir = job
+	grid = spec.build()
+	start = first_open_cell(grid)
+	comps = label_components(grid)
+	trace = ActionTrace(timestamps=False, meta=dict(spec.as_meta(), planner=planner_name))
+	robot = RobotVacuum(grid, start=start, start_dir=start_dir, trace=trace)
+	stats = robot.enable_stats() if profile else None
+	planner = PLANNERS[planner_name](robot, **planner_kwargs)
+
+	t0 = time.perf_counter()
+	planner.run()
+	wall = time.perf_counter() - t0
+	if stats is not None:
+		stats.stop()
+
+	open_cells = comps.open_cells
+	reachable = comps.reachable_count(start)
+	result = {
+		"room": spec.label,
+		"planner": planner_name,
+		"rows": grid.rows,
+		"cols": grid.cols,
+		"open_cells": open_cells,
+		"reachable_cells": reachable,
+		"components": comps.count,
+		"cleaned": len(robot.cleaned),
+		"coverage_pct": 100.0 * len(robot.cleaned) / reachable,
+		"open_coverage_pct": 100.0 * len(robot.cleaned) / open_cells,
+		"wall_time_s": wall,
+	}
+	result.update(trace_metrics(trace, grid.rows, grid.cols))
+	result["energy"], result["sim_time_s"] = CostModel().trace_cost(trace)
+	if stats is not None:
+		result["stats"] = stats.as_dict()
+	if trace_dir is not None:
+		result["trace"] = os.path.join(trace_dir, f"{spec.label}_{planner_name}.rvt")
+		trace.save(result["trace"])
+	return result
+
+
+def spread_starts(grid: RoomGrid, count: int, comps: Optional[Components] = None) -> List[Tuple[int, int]]:
+	"""Up to `count` distinct start cells spread evenly (row-major) over the largest open region.
+
+	Pass `comps` (label_components(grid)) if the caller already has it.
+	"""
+	if comps is None:
+		comps = label_components(grid)
+	cells = list(comps.cells(comps.largest()))
+	count = min(count, len(cells))
+	return [cells[i * len(cells) // count] for i in range(count)]
+
+
+def run_fleet_one(job: Tuple[RoomSpec, int, str]) -> Dict:
+	"""Run a Fleet of `robots` vacuums on one room; returns a metrics dict.
+
+	ticks is the simulated coverage time (one action per robot per tick).
+	Rooms whose largest open region is smaller than `robots` get one robot
+	per cell; the "robots" field reports the number actually used.
+	"""
+	spec, robots, start_dir = job
+	grid = spec.build()
+	comps = label_components(grid)
+	fleet = Fleet(grid, spread_starts(grid, robots, comps), start_dir=start_dir)
+	result = fleet.run()
+	reachable = comps.sizes[comps.largest()]
+	actions = result.pop("actions")
+	result.update({
+		"room": spec.label,
+		"rows": grid.rows,
+		"cols": grid.cols,
+		"reachable_cells": reachable,
+		"coverage_pct": 100.0 * result["cleaned"] / reachable,
+		"total_actions": sum(actions),
+		"max_actions": max(actions),
+		"min_actions": min(actions),
+	})
+	return result
+
+
+def _map_jobs(fn, jobs: List, workers: Optional[int]) -> Iterable[Dict]:
+	workers = workers or os.cpu_count() or 1
+	if workers == 1:
+		yield from map(fn, jobs)
+		return
+	chunksize = max(1, len(jobs) // (workers * 8))
+	with ProcessPoolExecutor(max_workers=workers) as pool:
+		yield from pool.map(fn, jobs, chunksize=chunksize)
+
+
+def run_batch(planner: str, specs: List[RoomSpec], workers: Optional[int] = None,
+		start_dir: str = "E", planner_kwargs: Optional[Dict] = None,
+		profile: bool = False, trace_dir: Optional[str] = None) -> Iterable[Dict]:
+	"""Yield one metrics dict per spec (in order), using a process pool.
+
+	planner_kwargs are passed to the planner class after the robot. With
+	`trace_dir`, each run's ActionTrace (with the room spec in its meta) is
+	saved there and its path reported under "trace", ready for
+	`python action_trace.py PATH --record run.gif`.
+	"""
+	jobs = [(planner, spec, start_dir, planner_kwargs or {}, profile, trace_dir) for spec in specs]
+	yield from _map_jobs(run_one, jobs, workers)
+
+
+def run_fleet_batch(specs: List[RoomSpec], robot_counts: Iterable[int],
+		workers: Optional[int] = None, start_dir: str = "E") -> Iterable[Dict]:
+	"""Yield one fleet metrics dict per (spec, robot count), using a process pool."""
+	jobs = [(spec, robots, start_dir) for spec in specs for robots in robot_counts]
+	yield from _map_jobs(run_fleet_one, jobs, workers)
+
+
+def _parse_sizes(text: str) -> List[Tuple[int, int]]:
+	sizes = []
+	for item in text.split(","):
+		rows, cols = item.lower().split("x")
+		sizes.append((int(rows), int(cols)))
+	return sizes
+
+
+def _parse_seeds(text: str) -> List[int]:
+	if ":" in text:
+		lo, hi = text.split(":")
+		return list(range(int(lo), int(hi)))
+	return [int(s) for s in text.split(",")]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+	parser = argparse.ArgumentParser(description="Run a coverage planner over many rooms")
+	parser.add_argument("--planner", default="dfs", choices=sorted(PLANNERS),
+			help="dfs probes with moves; explore only senses; known plans the whole tour "
+			"from the map up front (about 25 us per open cell and 22 bytes per cell)")
+	parser.add_argument("--test-rooms", nargs="*", metavar="NAME",
+			help="rooms from rooms.TEST_ROOMS (all if no names given)")
+	parser.add_argument("--room-files", nargs="+", metavar="PATH", help="binary room files to run")
+	parser.add_argument("--sizes", type=_parse_sizes, help="random_room sizes, e.g. 24x36,200x200")
+	parser.add_argument("--seeds", type=_parse_seeds, default=[0], help="e.g. 0:1000 or 1,2,3")
+	parser.add_argument("--obstacle-probs", default="0.12",
+			type=lambda s: [float(p) for p in s.split(",")])
+	parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+	parser.add_argument("--start-dir", default="E", choices=RobotVacuum.DIRS)
+	parser.add_argument("--stop-when-done", action="store_true",
+			help="end each run once every reachable cell is cleaned")
+	parser.add_argument("--clean-on-entry", action="store_true",
+			help="clean cells when first entered instead of on the way back")
+	parser.add_argument("--jump", action="store_true",
+			help="at dead ends, drive to the nearest uncleaned cell instead of backtracking")
+	parser.add_argument("--legacy-turns", action="store_true",
+			help="restore orientation with repeated right turns (for before/after turn counts)")
+	parser.add_argument("--robots", type=lambda s: [int(n) for n in s.split(",")],
+			help="fleet sizes, e.g. 1,2,4,8: run a Fleet per room and size instead of --planner")
+	parser.add_argument("--profile", action="store_true",
+			help="include per-method call counts and times (run_stats) in each result")
+	parser.add_argument("--trace-dir", help="save each run's action trace here (replay with action_trace.py)")
+	parser.add_argument("--output", help="write JSON lines here instead of stdout")
+	args = parser.parse_args(argv)
+
+	specs: List[RoomSpec] = []
+	if args.test_rooms is not None:
+		specs += test_room_specs(args.test_rooms or None)
+	if args.room_files:
+		specs += room_file_specs(args.room_files)
+	if args.sizes:
+		specs += random_room_specs(args.sizes, args.seeds, args.obstacle_probs)
+	if not specs:
+		parser.error("nothing to run: pass --test-rooms, --room-files and/or --sizes")
+
+	planner_kwargs = {}
+	accepted = inspect.signature(PLANNERS[args.planner]).parameters
+	for flag, name in PLANNER_FLAGS.items():
+		if getattr(args, name):
+			if args.robots:
+				parser.error(f"{flag} applies to --planner runs, not --robots")
+			if name not in accepted:
+				parser.error(f"{flag} is not supported by --planner {args.planner}")
+			planner_kwargs[name] = True
+	if args.trace_dir:
+		if args.robots:
+			parser.error("--trace-dir applies to --planner runs, not --robots")
+		os.makedirs(args.trace_dir, exist_ok=True)
+
+	out = open(args.output, "w") if args.output else sys.stdout
+	t0 = time.perf_counter()
+	totals = {"ticks": 0, "waits": 0} if args.robots else {"steps": 0, "turns": 0, "revisits": 0}
+	count = 0
+	try:
+		if args.robots:
+			results = run_fleet_batch(specs, args.robots, args.workers, args.start_dir)
+		else:
+			results = run_batch(args.planner, specs, args.workers, args.start_dir, planner_kwargs,
+					args.profile, args.trace_dir)
+		for result in results:
+			out.write(json.dumps(result) + "\n")
+			count += 1
+			for key in totals:
+				totals[key] += result[key]
+	finally:
+		if out is not sys.stdout:
+			out.close()
+	elapsed = time.perf_counter() - t0
+	print(f"{count} runs in {elapsed:.2f}s; totals: " + ", ".join(f"{k}={v}" for k, v in totals.items()),
+			file=sys.stderr)
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,319 @@
+"""Benchmark suite for the robot vacuum stack, with JSON output.
+
+Measures:
+  api        actions/second of the RobotVacuum method API, execute() and
+             vec_env.VecRobotVacuum (API_ACTIONS spread over VEC_ENVS envs)
+  generate   rooms.py generators (list-of-lists and NumPy RoomGrid versions)
+  coverage   full-coverage wall time, actions and turns per planner, room
+             family and size (checkerboard rooms have nothing to cover)
+  render     headless RoomVisualizer time per frame (full and incremental)
+
+Every record also gets peak_mem_bytes, the peak traced allocation of a
+second, tracemalloc-instrumented run of the same case (timings come from
+the uninstrumented run). Results are written as one JSON document so runs
+can be diffed release over release:
+
+	python benchmark.py --output bench.json
+	python benchmark.py --sizes 24x36,500x500,2000x2000 --planners dfs,known
+	python benchmark.py --output new.json --compare bench.json --threshold 0.2
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import rooms
+from action_trace import ActionTrace
+from batch import PLANNERS, _parse_sizes, first_open_cell, trace_metrics
+from reachability import label_components
+from scaffolding import Action, RobotVacuum, RoomVisualizer, MATPLOTLIB_AVAILABLE
+
+FAMILIES = ("random", "spiral", "checkerboard", "concentric")
+# every open checkerboard cell is isolated, so there is nothing to cover
+COVERAGE_FAMILIES = ("random", "spiral", "concentric")
+DEFAULT_SIZES = ((24, 36), (100, 100), (500, 500))
+# matplotlib frames cost seconds at 100x100, so rendering has its own sizes
+DEFAULT_RENDER_SIZES = ((24, 36), (100, 100))
+# actions replayed by the api benchmark
+API_ACTIONS = 200_000
+# envs stepped in lockstep by the api benchmark's vectorized mode
+VEC_ENVS = 4096
+# frames drawn per render benchmark
+RENDER_FRAMES = 5
+
+# concentric_rooms wall spacing used for every size
+_CONCENTRIC_SPACING = 2
+
+
+def _concentric_layers(rows: int, cols: int) -> int:
+	return max(1, (min(rows, cols) - 2) // ((_CONCENTRIC_SPACING + 1) * 2))
+
+
+def build_room(family: str, rows: int, cols: int, compact: bool = True):
+	"""Build a `family` room of about rows x cols with the rooms.py generators.
+
+	The room is generated as a list of lists; with `compact` (the default)
+	it is returned encoded as a RoomGrid, otherwise as the list of lists.
+	spiral and concentric rooms are square, so they use min(rows, cols).
+	"""
+	if family == "random":
+		return rooms.random_room(rows, cols, seed=0, compact=compact)
+	if family == "spiral":
+		return rooms.spiral_room(min(rows, cols), compact=compact)
+	if family == "checkerboard":
+		return rooms.checkerboard_room(rows, cols, compact=compact)
+	if family == "concentric":
+		return rooms.concentric_rooms(_concentric_layers(rows, cols), _CONCENTRIC_SPACING, compact=compact)
+	raise ValueError(f"unknown room family {family!r}")
+
+
+def build_grid(family: str, rows: int, cols: int):
+	"""Same as build_room() with the NumPy generator (list generator for spiral)."""
+	if family == "random":
+		return rooms.random_grid(rows, cols, seed=0)
+	if family == "checkerboard":
+		return rooms.checkerboard_grid(rows, cols)
+	if family == "concentric":
+		return rooms.concentric_grid(_concentric_layers(rows, cols), _CONCENTRIC_SPACING)
+	return build_room(family, rows, cols)
+
+
+def _timed(fn: Callable[[], object]) -> Tuple[float, object]:
+	t0 = time.perf_counter()
+	result = fn()
+	return time.perf_counter() - t0, result
+
+
+def _peak_memory(fn: Callable[[], object]) -> int:
+	tracemalloc.start()
+	try:
+		fn()
+		return tracemalloc.get_traced_memory()[1]
+	finally:
+		tracemalloc.stop()
+
+
+def _random_actions(count: int, seed: int = 0) -> array:
+	rng = random.Random(seed)
+	weighted = [Action.TURN_LEFT, Action.TURN_RIGHT, Action.FORWARD, Action.FORWARD,
+			Action.FORWARD, Action.BACKWARD, Action.CLEAN]
+	return array("B", (rng.choice(weighted) for _ in range(count)))
+
+
+def bench_api(rows: int, cols: int) -> Iterator[Tuple[Dict, Callable]]:
+	"""Random action stream through the method API and through execute()."""
+	grid = rooms.random_grid(rows, cols, seed=0)
+	start = first_open_cell(grid)
+	actions = _random_actions(API_ACTIONS)
+
+	def via_methods():
+		robot = RobotVacuum(grid, start=start)
+		methods = [getattr(robot, action.method) for action in Action]
+		for action in actions:
+			methods[action]()
+
+	def via_execute():
+		RobotVacuum(grid, start=start).execute(actions)
+
+	for mode, fn in (("methods", via_methods), ("execute", via_execute)):
+		yield {"bench": "api", "mode": mode, "actions": len(actions)}, fn
+
+	try:
+		import numpy as np
+		from vec_env import VecRobotVacuum
+	except ImportError:
+		return
+	steps = np.frombuffer(actions, dtype=np.uint8)[:len(actions) // VEC_ENVS * VEC_ENVS].reshape(-1, VEC_ENVS)
+
+	def via_vec():
+		env = VecRobotVacuum(grid, VEC_ENVS, start=start)
+		for row in steps:
+			env.step(row)
+
+	yield {"bench": "api", "mode": "vec", "actions": steps.size}, via_vec
+
+
+def bench_generate(family: str, rows: int, cols: int) -> Iterator[Tuple[Dict, Callable]]:
+	yield {"bench": "generate", "family": family, "mode": "rows"}, lambda: build_room(family, rows, cols, compact=False)
+	if family != "spiral":
+		yield {"bench": "generate", "family": family, "mode": "grid"}, lambda: build_grid(family, rows, cols)
+
+
+def bench_coverage(family: str, rows: int, cols: int, planner: str) -> Iterator[Tuple[Dict, Callable]]:
+	"""Full coverage from the first cell of the room's largest open region.
+
+	cleaned, actions and turns come from one extra, traced run (tracing
+	would slow the timed runs down noticeably).
+	"""
+	grid = build_grid(family, rows, cols)
+	comps = label_components(grid)
+	start = next(comps.cells(comps.largest()))
+
+	trace = ActionTrace()
+	robot = RobotVacuum(grid, start=start, start_dir="E", trace=trace)
+	PLANNERS[planner](robot).run()
+	counts = trace_metrics(trace, grid.rows, grid.cols)
+	record = {"bench": "coverage", "family": family, "planner": planner, "cleaned": len(robot.cleaned),
+			"actions": counts["steps"], "turns": counts["turns"]}
+
+	def cover():
+		PLANNERS[planner](RobotVacuum(grid, start=start, start_dir="E")).run()
+
+	yield record, cover
+
+
+def bench_render(rows: int, cols: int, incremental: bool) -> Iterator[Tuple[Dict, Callable]]:
+	"""RENDER_FRAMES headless frames (PNG sink) of a robot sweeping row 1.
+
+	The sink's per-frame "Saved frame" messages are swallowed so they do not
+	mix with the JSON report on stdout.
+	"""
+	grid = rooms.random_grid(rows, cols, obstacle_prob=0.0, seed=0)
+
+	def render():
+		import matplotlib.pyplot as plt
+
+		with tempfile.TemporaryDirectory() as save_dir, contextlib.redirect_stdout(io.StringIO()):
+			viz = RoomVisualizer(grid, save_dir=save_dir, pause=0.0, incremental=incremental)
+			cleaned = set()
+			for i in range(RENDER_FRAMES):
+				pos = (1, 1 + i % max(1, cols - 2))
+				cleaned.add(pos)
+				viz.update(pos, "E", cleaned)
+			viz.close()
+			# every case (and repeat) makes a new figure; free it
+			plt.close(viz.fig)
+
+	yield {"bench": "render", "mode": "incremental" if incremental else "full", "frames": RENDER_FRAMES}, render
+
+
+def run_suite(
+	sizes: Sequence[Tuple[int, int]] = DEFAULT_SIZES,
+	families: Sequence[str] = FAMILIES,
+	planners: Sequence[str] = ("dfs",),
+	render_sizes: Sequence[Tuple[int, int]] = DEFAULT_RENDER_SIZES,
+	memory: bool = True,
+	repeat: int = 1,
+	verbose: bool = False,
+) -> Iterator[Dict]:
+	"""Run every benchmark case and yield one record per case.
+
+	wall_time_s is the best of `repeat` runs. Render cases are skipped when
+	matplotlib is not installed.
+	"""
+	for rows, cols in dict.fromkeys(list(sizes) + list(render_sizes)):
+		cases = []
+		if (rows, cols) in sizes:
+			cases += bench_api(rows, cols)
+			for family in families:
+				cases += bench_generate(family, rows, cols)
+				if family in COVERAGE_FAMILIES:
+					for planner in planners:
+						cases += bench_coverage(family, rows, cols, planner)
+		if (rows, cols) in render_sizes and MATPLOTLIB_AVAILABLE:
+			cases += bench_render(rows, cols, incremental=False)
+			cases += bench_render(rows, cols, incremental=True)
+		for record, fn in cases:
+			record["size"] = f"{rows}x{cols}"
+			seconds = min(_timed(fn)[0] for _ in range(repeat))
+			record["wall_time_s"] = seconds
+			if "actions" in record:
+				record["actions_per_s"] = record["actions"] / seconds
+			if "frames" in record:
+				record["ms_per_frame"] = 1000.0 * seconds / record["frames"]
+			if memory:
+				record["peak_mem_bytes"] = _peak_memory(fn)
+			if verbose:
+				print(f"{case_key(record):<50s} {seconds:9.4f}s", file=sys.stderr)
+			yield record
+
+
+def case_key(record: Dict) -> str:
+	"""Identity of a benchmark case, used to match records across runs."""
+	parts = [record["bench"], record.get("family"), record.get("planner"), record.get("mode"), record["size"]]
+	return "/".join(p for p in parts if p)
+
+
+def compare(old: Dict, new: Dict, threshold: float = 0.2) -> List[Tuple[str, float, float]]:
+	"""Cases whose wall time grew by more than `threshold` (a fraction) between two reports."""
+	before = {case_key(r): r["wall_time_s"] for r in old["results"]}
+	slower = []
+	for record in new["results"]:
+		key = case_key(record)
+		if key in before and record["wall_time_s"] > before[key] * (1.0 + threshold):
+			slower.append((key, before[key], record["wall_time_s"]))
+	return slower
+
+
+def _environment() -> Dict:
+	env = {
+		"python": platform.python_version(),
+		"implementation": platform.python_implementation(),
+		"platform": platform.platform(),
+		"cpu_count": os.cpu_count(),
+		"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+	}
+	try:
+		import numpy
+		env["numpy"] = numpy.__version__
+	except ImportError:
+		pass
+	return env
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+	parser = argparse.ArgumentParser(description="Benchmark the robot vacuum simulation")
+	parser.add_argument("--sizes", type=_parse_sizes, default=list(DEFAULT_SIZES),
+			help="room sizes, e.g. 24x36,500x500,2000x2000")
+	parser.add_argument("--families", default=",".join(FAMILIES), type=lambda s: s.split(","))
+	parser.add_argument("--planners", default="dfs", type=lambda s: s.split(","),
+			help=f"comma-separated, from {sorted(PLANNERS)}")
+	parser.add_argument("--render-sizes", type=_parse_sizes, default=list(DEFAULT_RENDER_SIZES),
+			help="room sizes for the render benchmarks")
+	parser.add_argument("--no-render", action="store_true", help="skip the render benchmarks")
+	parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+	parser.add_argument("--repeat", type=int, default=1, help="report the best of N runs per case")
+	parser.add_argument("--output", help="write the JSON report here instead of stdout")
+	parser.add_argument("--compare", metavar="OLD_JSON", help="report cases slower than in this report")
+	parser.add_argument("--threshold", type=float, default=0.2, help="slowdown fraction counted as a regression")
+	args = parser.parse_args(argv)
+	for name in args.planners:
+		if name not in PLANNERS:
+			parser.error(f"unknown planner {name!r}")
+	for family in args.families:
+		if family not in FAMILIES:
+			parser.error(f"unknown room family {family!r}")
+
+	render_sizes = [] if args.no_render else args.render_sizes
+	results = list(run_suite(args.sizes, args.families, args.planners, render_sizes,
+			memory=not args.no_memory, repeat=args.repeat, verbose=True))
+	report = {"environment": _environment(), "results": results}
+	text = json.dumps(report, indent=1)
+	if args.output:
+		with open(args.output, "w") as fh:
+			fh.write(text + "\n")
+	else:
+		print(text)
+
+	if args.compare:
+		with open(args.compare) as fh:
+			slower = compare(json.load(fh), report, args.threshold)
+		for key, before, after in slower:
+			print(f"REGRESSION {key}: {before:.4f}s -> {after:.4f}s", file=sys.stderr)
+		return 1 if slower else 0
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,238 @@
+"""Frontier-based coverage of rooms the planner cannot see.
+
+The planners in coverage.py read `robot.grid` (KnownMapPlanner) or probe
+with moves (CoveragePlanner). ExplorationPlanner only uses
+`robot.sense()`, which reports the four cells around the robot. What it
+has sensed so far is kept in an OccupancyGrid, and the robot is driven to
+the next *frontier* cell until none are left.
+
+For a vacuum the frontier is every cell sensed as free but not yet
+visited (and so not yet cleaned). That is the edge of the swept area.
+Each sensor reading changes at most five cells, so the frontier set is
+updated in O(1) per step instead of by rescanning the map. When no
+frontier cell is next to the robot, a breadth-first search over the known
+free cells finds the nearest one. That search stops at the first frontier
+cell it reaches, so its cost depends on how far the robot has to travel,
+not on how much is known.
+
+	robot = RobotVacuum(room, start=(1, 1))
+	planner = ExplorationPlanner(robot)
+	planner.run()
+	print(planner.occupancy)        # the map as the robot saw it ('?' = unknown)
+
+Only the room's dimensions are assumed known (they size the occupancy grid).
+"""
+from __future__ import annotations
+
+from array import array
+from collections import deque
+from typing import List, Optional, Set, Tuple
+
+from grid import RoomGrid, padded_cells
+from scaffolding import RobotVacuum, Status
+
+# occupancy values (one byte per cell)
+UNKNOWN = 0
+FREE = 1
+OCCUPIED = 2
+
+_CHARS = {UNKNOWN: "?", FREE: ".", OCCUPIED: "#"}
+
+
+class OccupancyGrid:
+	"""What a robot has sensed of a room: UNKNOWN, FREE or OCCUPIED per cell.
+
+	Stored padded with an OCCUPIED ring so neighbour lookups need no bounds
+	checks (index (r + 1) * width + c + 1). Unknown cells count as blocked,
+	so the grid can be handed to pathing.astar() to plan over known cells.
+	"""
+
+	def __init__(self, rows: int, cols: int) -> None:
+		self.rows = rows
+		self.cols = cols
+		width = self.width = cols + 2
+		# only the dimensions are known: an all-UNKNOWN room inside the ring
+		self.cells = padded_cells(RoomGrid(rows, cols), open_code=UNKNOWN, ring_code=OCCUPIED)
+		# cells sensed so far (FREE or OCCUPIED, excluding the ring)
+		self.known = 0
+
+	def index(self, r: int, c: int) -> int:
+		return (r + 1) * self.width + c + 1
+
+	def cell(self, idx: int) -> Tuple[int, int]:
+		r, c = divmod(idx, self.width)
+		return (r - 1, c - 1)
+
+	def state(self, r: int, c: int) -> int:
+		return self.cells[self.index(r, c)]
+
+	def mark(self, idx: int, value: int) -> bool:
+		"""Set padded cell `idx` to FREE or OCCUPIED. Returns True if it changed."""
+		old = self.cells[idx]
+		if old == value:
+			return False
+		if old == UNKNOWN:
+			self.known += 1
+		self.cells[idx] = value
+		return True
+
+	def is_blocked(self, r: int, c: int) -> bool:
+		return self.cells[self.index(r, c)] != FREE
+
+	def in_bounds(self, r: int, c: int) -> bool:
+		return 0 <= r < self.rows and 0 <= c < self.cols
+
+	def to_rows(self) -> List[List[str]]:
+		width = self.width
+		return [[_CHARS[self.cells[(r + 1) * width + c + 1]] for c in range(self.cols)]
+				for r in range(self.rows)]
+
+	def __str__(self) -> str:
+		return "\n".join("".join(row) for row in self.to_rows())
+
+	def __repr__(self) -> str:
+		return f"OccupancyGrid(rows={self.rows}, cols={self.cols}, known={self.known})"
+
+
+class ExplorationPlanner:
+	"""Coverage planner for an unknown room, driven by robot.sense().
+
+	On every newly visited cell the robot senses its neighbours, cleans the
+	cell and moves to an adjacent frontier cell if there is one (straight
+	ahead first, then left, right, and behind via backward()). Otherwise it
+	travels to the nearest frontier cell over known free cells. Moves that
+	fail because the room changed (see RobotVacuum.add_obstacle()) mark the
+	cell occupied, and the route is planned again.
+
+	Attributes:
+		occupancy: OccupancyGrid of everything sensed so far
+		frontier: padded indices of free cells not yet visited
+		searched: cells expanded by nearest-frontier searches (a measure of
+			planning work; compare with the number of actions)
+	"""
+
+	def __init__(self, robot: RobotVacuum, verbose: bool = False, clean: bool = True) -> None:
+		"""Create a planner.
+
+		Args:
+			robot: the robot to drive; only its sense() and actions are used
+			verbose: print progress
+			clean: clean each cell when it is first visited
+		"""
+		self.robot = robot
+		self.verbose = verbose
+		self.clean = clean
+		self.occupancy = OccupancyGrid(robot.rows, robot.cols)
+		width = self.occupancy.width
+		self.steps = (-width, 1, width, -1)  # N, E, S, W
+		self.visited = bytearray(len(self.occupancy.cells))
+		self.frontier: Set[int] = set()
+		self.searched = 0
+		# BFS bookkeeping, reused across searches
+		self._stamp = array("I", bytes(4 * len(self.occupancy.cells)))
+		self._search = 0
+
+	def _here(self) -> int:
+		return self.occupancy.index(self.robot.r, self.robot.c)
+
+	def _visit(self) -> None:
+		"""Sense around the robot's cell, update the frontier and clean."""
+		here = self._here()
+		occupancy, frontier, visited = self.occupancy, self.frontier, self.visited
+		visited[here] = 1
+		occupancy.mark(here, FREE)
+		frontier.discard(here)
+		for step, status in zip(self.steps, self.robot.sense()):
+			idx = here + step
+			# a cell held by another robot is still floor
+			if status is Status.OK or status is Status.OCCUPIED:
+				occupancy.mark(idx, FREE)
+				if not visited[idx]:
+					frontier.add(idx)
+			else:
+				# a frontier cell can turn out blocked (an obstacle was added)
+				occupancy.mark(idx, OCCUPIED)
+				frontier.discard(idx)
+		if self.verbose:
+			print(f"visiting new square: {occupancy.cell(here)} ({len(frontier)} on the frontier)")
+		if self.clean:
+			self.robot.clean()
+
+	def _route(self) -> Optional[List[int]]:
+		"""Cells from the robot to the nearest frontier cell, or None if none is reachable."""
+		here = self._here()
+		steps, frontier = self.steps, self.frontier
+		facing = self.robot.dir_idx
+		# turn-cheapest neighbours first: ahead, left, right, behind
+		order = (steps[facing], steps[(facing - 1) % 4], steps[(facing + 1) % 4], steps[(facing + 2) % 4])
+		for step in order:
+			if here + step in frontier:
+				return [here + step]
+
+		self._search += 1
+		search, stamp, cells = self._search, self._stamp, self.occupancy.cells
+		stamp[here] = search
+		parent = {here: -1}
+		queue = deque([here])
+		while queue:
+			u = queue.popleft()
+			self.searched += 1
+			for step in order:
+				v = u + step
+				if stamp[v] == search or cells[v] != FREE:
+					continue
+				stamp[v] = search
+				parent[v] = u
+				if v in frontier:
+					path = []
+					while v != here:
+						path.append(v)
+						v = parent[v]
+					path.reverse()
+					return path
+				queue.append(v)
+		return None
+
+	def _follow(self, path: List[int]) -> bool:
+		"""Drive along `path` (adjacent padded indices). False if a move failed."""
+		robot = self.robot
+		steps = self.steps
+		here = self._here()
+		for idx in path:
+			d = steps.index(idx - here)
+			if d == robot.dir_idx:
+				status = robot.forward()
+			elif d == (robot.dir_idx + 2) % 4:
+				status = robot.backward()
+			else:
+				robot.rotate_to(d)
+				status = robot.forward()
+			if status is not Status.OK:
+				if status is Status.BLOCKED:
+					self.occupancy.mark(idx, OCCUPIED)
+					self.frontier.discard(idx)
+				return False
+			here = idx
+		return True
+
+	def run(self) -> int:
+		"""Explore and clean every cell reachable from the robot's position.
+
+		Returns the number of cleaned cells.
+		"""
+		self._visit()
+		while self.frontier:
+			path = self._route()
+			if path is None:
+				break
+			if self._follow(path) and not self.visited[path[-1]]:
+				self._visit()
+		if self.robot.visualizer is not None:
+			# draw the final state if the render policy skipped it
+			self.robot.visualizer.flush()
+		if self.verbose:
+			print("your room is clean!")
+		return len(self.robot.cleaned)
+
+
+__all__ = ["OccupancyGrid", "ExplorationPlanner", "UNKNOWN", "FREE", "OCCUPIED"]
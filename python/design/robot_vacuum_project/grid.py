@@ -0,0 +1,274 @@
+"""Compact grid storage shared by RobotVacuum, RoomVisualizer and rooms.py.
+
+A RoomGrid keeps one byte per cell (a cell-type code) in a flat buffer with
+a row stride, instead of a list of lists of one-character strings. The
+buffer can be a bytearray, a memoryview over a NumPy uint8 array or an mmap,
+so several consumers can share one room without copying it.
+
+Cell codes:
+  OPEN    (0): open floor ('.' or ' ')
+  WALL    (1): wall ('#')
+  OBJECT  (2): object ('X')
+  CLEANED (3): cleaned floor ('C'), used by ASCII frames and renderers
+
+CellSet is a set of (row, col) coordinates backed by a byte per cell, used
+for the robot's cleaned cells.
+"""
+from __future__ import annotations
+
+from collections.abc import MutableSet
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+# numpy is imported lazily in the methods that need it, so that importing
+# rooms.py (and therefore this module) stays cheap in worker processes
+
+OPEN = 0
+WALL = 1
+OBJECT = 2
+CLEANED = 3
+
+CHAR_TO_CODE = {".": OPEN, " ": OPEN, "#": WALL, "X": OBJECT, "C": CLEANED}
+CODE_TO_CHAR = {OPEN: ".", WALL: "#", OBJECT: "X", CLEANED: "C"}
+
+# byte translation tables between ASCII rows and cell codes;
+# unknown characters are treated as open floor, like the visualizer does
+_ENCODE = bytearray(256)
+for _ch, _code in CHAR_TO_CODE.items():
+	_ENCODE[ord(_ch)] = _code
+_ENCODE = bytes(_ENCODE)
+_DECODE = bytearray(b"." * 256)
+for _code, _ch in CODE_TO_CHAR.items():
+	_DECODE[_code] = ord(_ch)
+_DECODE = bytes(_DECODE)
+
+
+def is_blocked(code: int) -> bool:
+	"""True for impassable cell codes (walls and objects)."""
+	return code == WALL or code == OBJECT
+
+
+class RoomGrid:
+	"""Room map stored as one cell code per byte in a flat, row-strided buffer.
+
+	Indexing with ``grid[r]`` returns the row as a string, so code written
+	against the list-of-lists form (``grid[r][c] == '#'``) keeps working.
+	Hot paths should use `code()` / `is_blocked()` instead.
+	"""
+
+	__slots__ = ("rows", "cols", "stride", "cells")
+
+	def __init__(self, rows: int, cols: int, cells=None, stride: Optional[int] = None) -> None:
+		"""Create a grid.
+
+		Args:
+			rows, cols: dimensions
+			cells: optional writable byte buffer holding the codes (shared, not copied);
+				defaults to a new all-OPEN bytearray
+			stride: bytes per row in `cells` (defaults to `cols`)
+		"""
+		if rows < 0 or cols < 0:
+			raise ValueError("rows and cols must be >= 0")
+		stride = cols if stride is None else stride
+		if stride < cols:
+			raise ValueError("stride must be >= cols")
+		if cells is None:
+			cells = bytearray(rows * stride)
+		elif len(cells) < rows * stride:
+			raise ValueError("cell buffer is smaller than rows * stride")
+		self.rows = rows
+		self.cols = cols
+		self.stride = stride
+		self.cells = cells
+
+	@classmethod
+	def from_rows(cls, room_map: Sequence[Sequence[str]]) -> "RoomGrid":
+		"""Encode a list-of-lists (or list of strings) room map."""
+		rows = len(room_map)
+		cols = len(room_map[0]) if rows else 0
+		cells = bytearray(rows * cols)
+		for r, row in enumerate(room_map):
+			if len(row) != cols:
+				raise ValueError("room rows must all have the same length")
+			line = "".join(row).encode("ascii", "replace")
+			cells[r * cols:(r + 1) * cols] = line.translate(_ENCODE)
+		return cls(rows, cols, cells)
+
+	@classmethod
+	def from_array(cls, arr) -> "RoomGrid":
+		"""Wrap a 2D uint8 NumPy array of cell codes without copying it."""
+		import numpy as np
+
+		if arr.ndim != 2 or arr.dtype != np.uint8:
+			raise ValueError("expected a 2D uint8 array")
+		if not arr.flags.c_contiguous:
+			arr = np.ascontiguousarray(arr)
+		rows, cols = arr.shape
+		return cls(rows, cols, memoryview(arr).cast("B"))
+
+	def code(self, r: int, c: int) -> int:
+		return self.cells[r * self.stride + c]
+
+	def set(self, r: int, c: int, code: int) -> None:
+		self.cells[r * self.stride + c] = code
+
+	def is_blocked(self, r: int, c: int) -> bool:
+		code = self.cells[r * self.stride + c]
+		return code == WALL or code == OBJECT
+
+	def in_bounds(self, r: int, c: int) -> bool:
+		return 0 <= r < self.rows and 0 <= c < self.cols
+
+	def row_codes(self, r: int) -> bytes:
+		start = r * self.stride
+		return bytes(self.cells[start:start + self.cols])
+
+	def as_array(self):
+		"""Return a (rows, cols) uint8 NumPy view of the cells (no copy)."""
+		try:
+			import numpy as np
+		except ImportError:
+			raise RuntimeError("numpy is required for RoomGrid.as_array()") from None
+		buf = np.frombuffer(self.cells, dtype=np.uint8, count=self.rows * self.stride)
+		return buf.reshape(self.rows, self.stride)[:, :self.cols]
+
+	def to_rows(self) -> List[List[str]]:
+		"""Decode into the list-of-lists form used by rooms.py."""
+		return [list(self[r]) for r in range(self.rows)]
+
+	def copy(self) -> "RoomGrid":
+		cells = bytearray(self.rows * self.cols)
+		for r in range(self.rows):
+			cells[r * self.cols:(r + 1) * self.cols] = self.row_codes(r)
+		return RoomGrid(self.rows, self.cols, cells)
+
+	def __len__(self) -> int:
+		return self.rows
+
+	def __getitem__(self, r: int) -> str:
+		if r < 0:
+			r += self.rows
+		if not 0 <= r < self.rows:
+			raise IndexError("row index out of range")
+		return self.row_codes(r).translate(_DECODE).decode("ascii")
+
+	def __iter__(self) -> Iterator[str]:
+		for r in range(self.rows):
+			yield self[r]
+
+	def __repr__(self) -> str:
+		return f"RoomGrid(rows={self.rows}, cols={self.cols})"
+
+
+def as_grid(room_map):
+	"""Return `room_map` as a grid object.
+
+	Anything that already has the grid interface (a RoomGrid, or an on-demand
+	grid such as tiles.TiledRoom) is returned unchanged; list-of-lists and
+	list-of-strings maps are encoded into a RoomGrid.
+	"""
+	if hasattr(room_map, "is_blocked"):
+		return room_map
+	return RoomGrid.from_rows(room_map)
+
+
+def padded_cells(room_map, open_code: int = 1, blocked_code: int = 0, ring_code: int = 0,
+		zone=None) -> bytearray:
+	"""The room as one byte per cell with an extra ring of cells around it.
+
+	Cell (r, c) is at index (r + 1) * (cols + 2) + c + 1 and holds
+	`open_code` or `blocked_code`; the ring holds `ring_code`. Planners use
+	this layout so that neighbour lookups (index +- 1, +- cols + 2) never
+	need a bounds check.
+
+	Args:
+		room_map: RoomGrid, on-demand grid (e.g. tiles.TiledRoom) or list-of-lists map
+		open_code, blocked_code, ring_code: byte stored for each kind of cell
+		zone: optional set of cells; cells outside it are stored as blocked
+	"""
+	grid = as_grid(room_map)
+	rows, cols = grid.rows, grid.cols
+	width = cols + 2
+	cells = bytearray([ring_code]) * ((rows + 2) * width)
+	if isinstance(grid, RoomGrid):
+		table = bytearray([open_code]) * 256
+		table[WALL] = table[OBJECT] = blocked_code
+		for r in range(rows):
+			base = (r + 1) * width + 1
+			cells[base:base + cols] = grid.row_codes(r).translate(table)
+	else:
+		for r in range(rows):
+			base = (r + 1) * width + 1
+			for c in range(cols):
+				cells[base + c] = blocked_code if grid.is_blocked(r, c) else open_code
+	if zone is not None:
+		for r in range(rows):
+			base = (r + 1) * width + 1
+			for c in range(cols):
+				if (r, c) not in zone:
+					cells[base + c] = blocked_code
+	return cells
+
+
+class CellSet(MutableSet):
+	"""Set of (row, col) cells stored as one byte per cell.
+
+	Membership, add and discard are O(1); iteration scans the buffer.
+	"""
+
+	__slots__ = ("rows", "cols", "bits", "_count")
+
+	def __init__(self, rows: int, cols: int, cells=()) -> None:
+		self.rows = rows
+		self.cols = cols
+		self.bits = bytearray(rows * cols)
+		self._count = 0
+		for cell in cells:
+			self.add(cell)
+
+	def __contains__(self, cell) -> bool:
+		r, c = cell
+		return 0 <= r < self.rows and 0 <= c < self.cols and self.bits[r * self.cols + c] != 0
+
+	def add(self, cell: Tuple[int, int]) -> None:
+		r, c = cell
+		if not (0 <= r < self.rows and 0 <= c < self.cols):
+			raise ValueError(f"cell {cell} is outside the grid")
+		idx = r * self.cols + c
+		if not self.bits[idx]:
+			self.bits[idx] = 1
+			self._count += 1
+
+	def discard(self, cell: Tuple[int, int]) -> None:
+		r, c = cell
+		if 0 <= r < self.rows and 0 <= c < self.cols:
+			idx = r * self.cols + c
+			if self.bits[idx]:
+				self.bits[idx] = 0
+				self._count -= 1
+
+	def clear(self) -> None:
+		self.bits[:] = bytes(len(self.bits))
+		self._count = 0
+
+	def __len__(self) -> int:
+		return self._count
+
+	def __iter__(self) -> Iterator[Tuple[int, int]]:
+		cols = self.cols
+		idx = self.bits.find(1)
+		while idx != -1:
+			yield divmod(idx, cols)
+			idx = self.bits.find(1, idx + 1)
+
+	def copy(self) -> "CellSet":
+		other = CellSet(self.rows, self.cols)
+		other.bits[:] = self.bits
+		other._count = self._count
+		return other
+
+	def __repr__(self) -> str:
+		return f"CellSet(rows={self.rows}, cols={self.cols}, len={self._count})"
+
+
+__all__ = ["OPEN", "WALL", "OBJECT", "CLEANED", "CHAR_TO_CODE", "CODE_TO_CHAR",
+	"is_blocked", "RoomGrid", "as_grid", "padded_cells", "CellSet"]
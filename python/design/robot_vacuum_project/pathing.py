@@ -0,0 +1,506 @@
+"""Shortest action sequences over a room grid.
+
+Paths are planned over robot *states* (r, c, dir_idx) rather than cells,
+with every RobotVacuum action (turn_left, turn_right, forward, backward)
+costing one step, so a returned path is the cheapest way to get somewhere
+in actions, not just in cells.
+
+  astar()          cheapest action sequence from a pose to a goal cell
+  DistanceField    per-cell move distance to the nearest uncleaned cell,
+                   kept up to date incrementally as cells are cleaned
+  route_to_nearest()  both together: pick the nearest uncleaned cell from
+                   the field, then plan the actions to it with A*
+  DStarLite        cheapest action sequence to a fixed goal that is repaired
+                   incrementally when obstacles are added or removed
+  navigate()       drive a robot to a goal with a DStarLite planner
+
+	field = DistanceField(robot.grid, robot.cleaned)
+	target, actions = route_to_nearest(robot.grid, field, (robot.r, robot.c), robot.dir_idx)
+
+	planner = DStarLite(robot.grid, (robot.r, robot.c), robot.dir_idx, goal)
+	robot.map_listeners.append(planner.update_cell)
+	status = navigate(robot, planner)
+"""
+from __future__ import annotations
+
+import heapq
+from array import array
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from grid import as_grid, padded_cells
+from scaffolding import Action, RobotVacuum, Status
+
+Cell = Tuple[int, int]
+
+# (dr, dc) per dir_idx: N, E, S, W
+_DELTAS = tuple(RobotVacuum.DELTAS[d] for d in RobotVacuum.DIRS)
+
+
+def turn_lower_bound(r: int, c: int, dir_idx: int, goal: Cell) -> int:
+	"""Admissible estimate of the actions needed to reach `goal`.
+
+	Every move covers one cell along the robot's facing axis (forward or
+	backward), so the estimate is the Manhattan distance plus one turn if
+	the goal is off the current axis.
+	"""
+	dr, dc = goal[0] - r, goal[1] - c
+	h = abs(dr) + abs(dc)
+	if dr and dc:
+		return h + 1
+	if (dr and dir_idx % 2 == 1) or (dc and dir_idx % 2 == 0):
+		return h + 1
+	return h
+
+
+def astar(room_map, start: Cell, dir_idx: int, goal: Cell) -> Optional[array]:
+	"""Cheapest action sequence that takes the robot from `start` to `goal`.
+
+	Args:
+		room_map: RoomGrid (or any grid with is_blocked/in_bounds)
+		start: (row, col) start cell
+		dir_idx: starting facing direction (index into RobotVacuum.DIRS)
+		goal: (row, col) target cell; any final facing is accepted
+
+	Returns:
+		array('B') of Action values, or None if `goal` is unreachable.
+	"""
+	grid = as_grid(room_map)
+	if not grid.in_bounds(*goal) or grid.is_blocked(*goal):
+		return None
+	start_state = (start[0], start[1], dir_idx)
+	best = {start_state: 0}
+	parent = {}
+	heap = [(turn_lower_bound(start[0], start[1], dir_idx, goal), 0, start_state)]
+	while heap:
+		_, neg_g, state = heapq.heappop(heap)
+		g = -neg_g
+		if best.get(state, g) < g:
+			continue
+		r, c, d = state
+		if (r, c) == goal:
+			actions = array("B")
+			while state != start_state:
+				state, action = parent[state]
+				actions.append(action)
+			actions.reverse()
+			return actions
+		dr, dc = _DELTAS[d]
+		for action, nxt in (
+			(Action.FORWARD, (r + dr, c + dc, d)),
+			(Action.BACKWARD, (r - dr, c - dc, d)),
+			(Action.TURN_LEFT, (r, c, (d - 1) % 4)),
+			(Action.TURN_RIGHT, (r, c, (d + 1) % 4)),
+		):
+			nr, nc, nd = nxt
+			if (nr, nc) != (r, c) and (not grid.in_bounds(nr, nc) or grid.is_blocked(nr, nc)):
+				continue
+			ng = g + 1
+			if ng < best.get(nxt, ng + 1):
+				best[nxt] = ng
+				parent[nxt] = (state, action)
+				# ties prefer the deeper state (larger g), which is closer to the goal
+				heapq.heappush(heap, (ng + turn_lower_bound(nr, nc, nd, goal), -ng, nxt))
+	return None
+
+
+class DistanceField:
+	"""Move distance from every cell to the nearest uncleaned open cell.
+
+	Built once with a multi-source BFS. Cleaning a cell removes it as a
+	source; mark_cleaned() only queues it, and the next query repairs just
+	the cells whose distance was derived through the removed sources (or
+	rebuilds from scratch when a large part of the field is affected).
+
+	Args:
+		room_map: RoomGrid or list-of-lists map
+		cleaned: cells that are already clean
+		rebuild_fraction: rebuild instead of repairing when more than this
+			fraction of the open cells would need recomputing
+	"""
+
+	UNREACHABLE = -1
+
+	def __init__(self, room_map, cleaned: Iterable[Cell] = (), rebuild_fraction: float = 0.25) -> None:
+		grid = as_grid(room_map)
+		self.rows = grid.rows
+		self.cols = grid.cols
+		self.rebuild_fraction = rebuild_fraction
+		width = self.width = self.cols + 2
+		self.passable = padded_cells(grid)
+		self.todo = bytearray(self.passable)
+		for (r, c) in cleaned:
+			self.todo[self._index(r, c)] = 0
+		self.open_cells = sum(self.passable)
+		self._steps = (-width, 1, width, -1)
+		self.dist = array("i")
+		self._pending: List[int] = []
+		self.rebuilds = 0
+		self.repairs = 0
+		self.rebuild()
+
+	def _index(self, r: int, c: int) -> int:
+		return (r + 1) * self.width + c + 1
+
+	def _cell(self, idx: int) -> Cell:
+		r, c = divmod(idx, self.width)
+		return (r - 1, c - 1)
+
+	def rebuild(self) -> None:
+		"""Recompute every distance from scratch."""
+		self.rebuilds += 1
+		self._pending.clear()
+		dist = self.dist = array("i", [self.UNREACHABLE]) * len(self.passable)
+		todo = self.todo
+		queue = deque(i for i in range(len(todo)) if todo[i])
+		for i in queue:
+			dist[i] = 0
+		passable, steps = self.passable, self._steps
+		while queue:
+			u = queue.popleft()
+			du = dist[u] + 1
+			for s in steps:
+				v = u + s
+				if passable[v] and dist[v] == -1:
+					dist[v] = du
+					queue.append(v)
+
+	def mark_cleaned(self, cell: Cell) -> None:
+		"""Record that `cell` is clean; the field is repaired lazily."""
+		idx = self._index(*cell)
+		if self.todo[idx]:
+			self.todo[idx] = 0
+			self._pending.append(idx)
+
+	def _repair(self) -> None:
+		if not self._pending:
+			return
+		dist, passable, steps = self.dist, self.passable, self._steps
+		# every cell whose distance may have come through a removed source
+		affected = set(self._pending)
+		stack = list(self._pending)
+		self._pending.clear()
+		limit = self.rebuild_fraction * self.open_cells
+		while stack:
+			u = stack.pop()
+			du = dist[u] + 1
+			for s in steps:
+				v = u + s
+				if v not in affected and dist[v] == du:
+					affected.add(v)
+					stack.append(v)
+			if len(affected) > limit:
+				self.rebuild()
+				return
+		self.repairs += 1
+
+		for v in affected:
+			dist[v] = -1
+		# re-seed from the unaffected boundary, then grow in distance order by
+		# merging the sorted seeds with a BFS queue (both are non-decreasing)
+		seeds = []
+		for v in affected:
+			if self.todo[v]:
+				seeds.append((0, v))
+				continue
+			best = -1
+			for s in steps:
+				n = v + s
+				if passable[n] and n not in affected and dist[n] >= 0 and (best < 0 or dist[n] < best):
+					best = dist[n]
+			if best >= 0:
+				seeds.append((best + 1, v))
+		seeds.sort()
+		queue = deque()
+		i = 0
+		while i < len(seeds) or queue:
+			if queue and (i == len(seeds) or queue[0][0] <= seeds[i][0]):
+				d, u = queue.popleft()
+			else:
+				d, u = seeds[i]
+				i += 1
+			if dist[u] != -1:
+				continue
+			dist[u] = d
+			for s in steps:
+				v = u + s
+				if dist[v] == -1 and v in affected:
+					queue.append((d + 1, v))
+
+	def distance(self, cell: Cell) -> int:
+		"""Moves from `cell` to the nearest uncleaned cell (UNREACHABLE if none)."""
+		self._repair()
+		return self.dist[self._index(*cell)]
+
+	def nearest(self, start: Cell, dir_idx: Optional[int] = None) -> Optional[Cell]:
+		"""Nearest uncleaned cell to `start` by moves, or None when none is reachable.
+
+		Walks down the field; with `dir_idx`, steps along the robot's facing
+		axis are preferred so the target tends to need fewer turns.
+		"""
+		self._repair()
+		dist, steps = self.dist, self._steps
+		u = self._index(*start)
+		if dist[u] < 0:
+			return None
+		order = steps
+		if dir_idx is not None:
+			order = (steps[dir_idx], steps[(dir_idx + 2) % 4], steps[(dir_idx + 1) % 4], steps[(dir_idx + 3) % 4])
+		while dist[u] > 0:
+			want = dist[u] - 1
+			for s in order:
+				if dist[u + s] == want:
+					u += s
+					break
+		return self._cell(u)
+
+
+def route_to_nearest(room_map, field: DistanceField, start: Cell,
+		dir_idx: int) -> Optional[Tuple[Cell, array]]:
+	"""Pick the nearest uncleaned cell from `field` and plan the actions to it.
+
+	The target is nearest by moves; the actions are the cheapest (moves plus
+	turns) way to reach that target. Returns (target, actions), or None if
+	every reachable cell is clean.
+	"""
+	target = field.nearest(start, dir_idx)
+	if target is None:
+		return None
+	return target, astar(room_map, start, dir_idx, target)
+
+
+INF = float("inf")
+
+
+class DStarLite:
+	"""Cheapest action sequence to a fixed goal, repaired as the map changes.
+
+	D* Lite over robot states: the search runs backwards from the goal, so
+	g[s] is the number of actions from state s to the goal. When cells are
+	blocked or cleared (update_cell()) only the states whose cost went
+	through them are re-expanded by the next compute(), so replanning after
+	a small change costs roughly the size of the affected region rather
+	than a new search. Moving the start (move_to()) keeps every value and
+	only shifts the priority keys.
+
+	Costs are read from the live grid and values are kept in dicts for the
+	states actually touched, so nothing is allocated per room cell. The
+	planner must be told about every changed cell, either through
+	robot.map_listeners or by calling update_cell() directly.
+
+	Args:
+		room_map: RoomGrid (or any grid with is_blocked/in_bounds)
+		start: (row, col) start cell
+		dir_idx: starting facing direction (index into RobotVacuum.DIRS)
+		goal: (row, col) target cell; any final facing is accepted
+
+	Attributes:
+		expansions: states expanded by compute() so far
+	"""
+
+	def __init__(self, room_map, start: Cell, dir_idx: int, goal: Cell) -> None:
+		self.grid = as_grid(room_map)
+		self.cols = self.grid.cols
+		self.goal = goal
+		self._goal_cell = goal[0] * self.cols + goal[1]
+		self.g: Dict[int, int] = {}
+		self.rhs: Dict[int, int] = {}
+		self.km = 0
+		self.expansions = 0
+		self._heap: List[Tuple[float, float, int]] = []
+		# state -> key of its live heap entry; other entries are stale
+		self._queued: Dict[int, Tuple[float, float]] = {}
+		self._changed: List[Cell] = []
+		self.start = self._state(start[0], start[1], dir_idx)
+		for d in range(4):
+			self._update_state(self._goal_cell * 4 + d)
+
+	def _state(self, r: int, c: int, dir_idx: int) -> int:
+		return (r * self.cols + c) * 4 + dir_idx
+
+	def _open(self, r: int, c: int) -> bool:
+		return self.grid.in_bounds(r, c) and not self.grid.is_blocked(r, c)
+
+	def _moves(self, s: int) -> List[Tuple[int, int]]:
+		"""(action, next state) for every action that succeeds from state s.
+
+		Every action is undone by another (forward/backward, left/right), so
+		these are also the predecessors of s.
+		"""
+		cell, d = divmod(s, 4)
+		r, c = divmod(cell, self.cols)
+		if not self._open(r, c):
+			return []
+		dr, dc = _DELTAS[d]
+		step = (dr * self.cols + dc) * 4
+		moves = []
+		if self._open(r + dr, c + dc):
+			moves.append((Action.FORWARD, s + step))
+		if self._open(r - dr, c - dc):
+			moves.append((Action.BACKWARD, s - step))
+		moves.append((Action.TURN_LEFT, cell * 4 + (d - 1) % 4))
+		moves.append((Action.TURN_RIGHT, cell * 4 + (d + 1) % 4))
+		return moves
+
+	def _h(self, s: int) -> int:
+		# Manhattan distance to the start: consistent, and the sum of its
+		# values over the robot's moves bounds how far keys can drift (km)
+		cell = s // 4
+		start = self.start // 4
+		cols = self.cols
+		return abs(cell // cols - start // cols) + abs(cell % cols - start % cols)
+
+	def _key(self, s: int) -> Tuple[float, float]:
+		m = min(self.g.get(s, INF), self.rhs.get(s, INF))
+		return (m + self._h(s) + self.km, m)
+
+	def _update_state(self, s: int) -> None:
+		"""Recompute rhs[s] from its successors, then fix its queue entry."""
+		if s // 4 == self._goal_cell:
+			rhs = 0 if self._open(*self.goal) else INF
+		else:
+			g = self.g
+			rhs = min((g.get(v, INF) for _, v in self._moves(s)), default=INF) + 1
+		if rhs == INF:
+			self.rhs.pop(s, None)
+		else:
+			self.rhs[s] = rhs
+		self._enqueue(s)
+
+	def _enqueue(self, s: int) -> None:
+		"""Queue s if it is inconsistent (g != rhs), otherwise drop it from the queue."""
+		if self.g.get(s, INF) != self.rhs.get(s, INF):
+			key = self._key(s)
+			self._queued[s] = key
+			heapq.heappush(self._heap, (key[0], key[1], s))
+		else:
+			self._queued.pop(s, None)
+
+	def update_cell(self, cell: Cell) -> None:
+		"""Record that `cell` was blocked or cleared; repaired by the next compute()."""
+		self._changed.append(cell)
+
+	def move_to(self, r: int, c: int, dir_idx: int) -> None:
+		"""Move the start to the robot's current pose."""
+		new = self._state(r, c, dir_idx)
+		if new != self.start:
+			self.km += self._h(new)
+			self.start = new
+
+	def compute(self) -> Optional[int]:
+		"""Apply pending cell changes and finish the search for the current start.
+
+		Returns:
+			The number of actions from the start to the goal, or None if the
+			goal is unreachable.
+		"""
+		changed, self._changed = self._changed, []
+		for r, c in changed:
+			for nr, nc in ((r, c), (r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+				if self.grid.in_bounds(nr, nc):
+					base = (nr * self.cols + nc) * 4
+					for d in range(4):
+						self._update_state(base + d)
+
+		heap, queued, g, rhs = self._heap, self._queued, self.g, self.rhs
+		goal_cell = self._goal_cell
+		start = self.start
+		while heap:
+			k1, k2, u = heap[0]
+			if queued.get(u) != (k1, k2):
+				heapq.heappop(heap)
+				continue
+			if (k1, k2) >= self._key(start) and rhs.get(start, INF) == g.get(start, INF):
+				break
+			heapq.heappop(heap)
+			key = self._key(u)
+			if (k1, k2) < key:
+				queued[u] = key
+				heapq.heappush(heap, (key[0], key[1], u))
+				continue
+			del queued[u]
+			self.expansions += 1
+			moves = self._moves(u)
+			g_old = g.get(u, INF)
+			if g_old > rhs.get(u, INF):
+				# cost went down: predecessors can only improve through u
+				gu = g[u] = rhs[u]
+				for _, v in moves:
+					if gu + 1 < rhs.get(v, INF) and v // 4 != goal_cell:
+						rhs[v] = gu + 1
+						self._enqueue(v)
+			else:
+				# cost went up: rescan the states whose rhs came through u
+				g.pop(u, None)
+				self._update_state(u)
+				for _, v in moves:
+					if rhs.get(v, INF) == g_old + 1:
+						self._update_state(v)
+		cost = g.get(start, INF)
+		return None if cost == INF else cost
+
+	def _best(self, s: int) -> Optional[Tuple[int, int]]:
+		"""(action, next state) with the lowest cost-to-go from s."""
+		g = self.g
+		best = None
+		best_cost = INF
+		for action, v in self._moves(s):
+			cost = g.get(v, INF)
+			if cost < best_cost:
+				best, best_cost = (action, v), cost
+		return best
+
+	def next_action(self) -> Optional[int]:
+		"""First action of the current plan (None at the goal or if it is unreachable)."""
+		if self.start // 4 == self._goal_cell:
+			return None
+		best = self._best(self.start)
+		return None if best is None else best[0]
+
+	def path(self) -> Optional[array]:
+		"""The whole current plan as array('B') of Action values, or None if unreachable."""
+		cost = self.compute()
+		if cost is None:
+			return None
+		actions = array("B")
+		s = self.start
+		for _ in range(cost):
+			action, s = self._best(s)
+			actions.append(action)
+		return actions
+
+
+def navigate(robot: RobotVacuum, planner: DStarLite, max_actions: Optional[int] = None) -> Status:
+	"""Drive `robot` to the planner's goal, replanning whenever the map changes.
+
+	Cells the robot bumps into are reported to the planner, so this also
+	works when the planner is not subscribed to robot.map_listeners.
+
+	Returns:
+		Status.OK at the goal, Status.BLOCKED if the goal is unreachable,
+		Status.OCCUPIED if another robot of a fleet is in the way, or
+		Status.OUT_OF_BOUNDS if max_actions ran out first.
+	"""
+	methods = [getattr(robot, action.method) for action in Action]
+	taken = 0
+	while True:
+		planner.move_to(robot.r, robot.c, robot.dir_idx)
+		if planner.compute() is None:
+			return Status.BLOCKED
+		action = planner.next_action()
+		if action is None:
+			return Status.OK
+		if max_actions is not None and taken >= max_actions:
+			return Status.OUT_OF_BOUNDS
+		status = methods[action]()
+		taken += 1
+		if status is Status.BLOCKED:
+			dr, dc = _DELTAS[robot.dir_idx]
+			if action == Action.BACKWARD:
+				dr, dc = -dr, -dc
+			planner.update_cell((robot.r + dr, robot.c + dc))
+		elif status is Status.OCCUPIED:
+			return status
+
+
+__all__ = ["turn_lower_bound", "astar", "DistanceField", "route_to_nearest", "DStarLite", "navigate"]
@@ -0,0 +1,147 @@
+"""Connected open regions of a room, precomputed once per map.
+
+`label_components()` assigns every open cell the id of the 4-connected
+region it belongs to, so questions like "how many cells can the robot
+reach from here?" or "is (r, c) reachable?" are answered with a lookup
+instead of by driving the robot into walls.
+
+Labelling works on horizontal runs of open cells rather than single cells:
+runs in adjacent rows that overlap are merged with a union-find, then each
+run is written into the label buffer with one slice assignment. Open
+floor is usually long runs, so this is far cheaper than a per-cell flood
+fill in Python.
+
+	comps = label_components(grid)
+	comps.reachable_count((1, 1))   # cells a robot starting at (1, 1) can clean
+	comps.same_component((1, 1), (20, 30))
+"""
+from __future__ import annotations
+
+import re
+from array import array
+from typing import Iterator, List, Tuple
+
+from grid import OBJECT, WALL, as_grid
+
+# a run of passable cell codes (anything but WALL/OBJECT)
+_OPEN_RUN = re.compile(b"[^" + re.escape(bytes([WALL, OBJECT])) + b"]+")
+
+
+class Components:
+	"""Connected-component labels of a room's open cells.
+
+	Attributes:
+		rows, cols: grid dimensions
+		labels: flat array('I') of component ids, indexed r * cols + c;
+			0 for blocked cells, 1..count for open cells
+		sizes: sizes[k] is the number of cells in component k (sizes[0] == 0)
+	"""
+
+	def __init__(self, rows: int, cols: int, labels: array, sizes: List[int]) -> None:
+		self.rows = rows
+		self.cols = cols
+		self.labels = labels
+		self.sizes = sizes
+
+	@property
+	def count(self) -> int:
+		"""Number of connected open regions."""
+		return len(self.sizes) - 1
+
+	@property
+	def open_cells(self) -> int:
+		return sum(self.sizes)
+
+	def component_of(self, cell: Tuple[int, int]) -> int:
+		"""Component id of `cell` (0 if it is blocked or out of bounds)."""
+		r, c = cell
+		if not (0 <= r < self.rows and 0 <= c < self.cols):
+			return 0
+		return self.labels[r * self.cols + c]
+
+	def reachable_count(self, start: Tuple[int, int]) -> int:
+		"""Number of open cells reachable from `start`, including itself."""
+		return self.sizes[self.component_of(start)]
+
+	def same_component(self, a: Tuple[int, int], b: Tuple[int, int]) -> bool:
+		label = self.component_of(a)
+		return label != 0 and label == self.component_of(b)
+
+	def largest(self) -> int:
+		"""Id of the largest component (0 if the room has no open cells)."""
+		return max(range(len(self.sizes)), key=self.sizes.__getitem__)
+
+	def cells(self, label: int) -> Iterator[Tuple[int, int]]:
+		"""Cells of component `label` in row-major order."""
+		cols = self.cols
+		for idx, value in enumerate(self.labels):
+			if value == label:
+				yield divmod(idx, cols)
+
+	def __repr__(self) -> str:
+		return f"Components(rows={self.rows}, cols={self.cols}, count={self.count})"
+
+
+def _find(parent: List[int], x: int) -> int:
+	while parent[x] != x:
+		parent[x] = parent[parent[x]]
+		x = parent[x]
+	return x
+
+
+def label_components(room_map) -> Components:
+	"""Label the 4-connected open regions of a room.
+
+	Args:
+		room_map: RoomGrid or list-of-lists map
+	"""
+	grid = as_grid(room_map)
+	rows, cols = grid.rows, grid.cols
+
+	# 1. open runs per row as (start, end, run id), merging overlaps with the row above
+	run_rows: List[List[Tuple[int, int, int]]] = []
+	parent: List[int] = []
+	prev: List[Tuple[int, int, int]] = []
+	for r in range(rows):
+		current = []
+		j = 0
+		for m in _OPEN_RUN.finditer(grid.row_codes(r)):
+			start, end = m.span()
+			run = len(parent)
+			parent.append(run)
+			# runs above that overlap [start, end)
+			while j < len(prev) and prev[j][1] <= start:
+				j += 1
+			k = j
+			while k < len(prev) and prev[k][0] < end:
+				a, b = _find(parent, prev[k][2]), _find(parent, run)
+				if a != b:
+					parent[max(a, b)] = min(a, b)
+				k += 1
+			current.append((start, end, run))
+		run_rows.append(current)
+		prev = current
+
+	# 2. compact root ids to 1..count and write each run's label
+	label_of = {}
+	sizes = [0]
+	labels = array("I", bytes(4 * rows * cols))
+	for r, runs in enumerate(run_rows):
+		base = r * cols
+		for start, end, run in runs:
+			root = _find(parent, run)
+			label = label_of.get(root)
+			if label is None:
+				label = label_of[root] = len(sizes)
+				sizes.append(0)
+			sizes[label] += end - start
+			labels[base + start:base + end] = array("I", (label,)) * (end - start)
+	return Components(rows, cols, labels, sizes)
+
+
+def reachable_count(room_map, start: Tuple[int, int]) -> int:
+	"""Number of open cells reachable from `start` (0 if `start` is blocked)."""
+	return label_components(room_map).reachable_count(start)
+
+
+__all__ = ["Components", "label_components", "reachable_count"]
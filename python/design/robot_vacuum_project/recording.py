@@ -0,0 +1,366 @@
+"""Headless recording backends for RoomVisualizer.
+
+Instead of writing one PNG per robot action, a headless visualizer can
+stream its frames into a single file:
+
+  *.mp4     matplotlib's ffmpeg writer; frames are piped to ffmpeg as they
+            are drawn, so memory stays flat
+  *.gif     cell-resolution frames (one pixel block per cell, robot in red)
+            encoded with Pillow and appended to the file as they come; no
+            matplotlib drawing per frame
+  *.rvf     compact binary frame log: one zlib-compressed byte per cell per
+            frame plus the robot pose, appended as it goes
+  (default) a directory of frame_NNNN.png files, as before
+
+Frame logs can be turned into a video later with `frame_log_to_video()`:
+
+	python recording.py run.rvf run.gif --fps 30
+"""
+from __future__ import annotations
+
+import abc
+import argparse
+import os
+import struct
+import zlib
+from typing import Iterable, Iterator, Optional, Tuple
+
+from grid import CLEANED, CODE_TO_CHAR, OBJECT, WALL, RoomGrid
+
+try:
+	import numpy as np
+	import matplotlib
+	if not os.environ.get("DISPLAY"):
+		matplotlib.use("Agg")
+	from matplotlib import animation
+	MATPLOTLIB_AVAILABLE = True
+except Exception:
+	MATPLOTLIB_AVAILABLE = False
+
+
+DIRS = "NESW"
+DELTAS = {"N": (-1, 0), "E": (0, 1), "S": (1, 0), "W": (0, -1)}
+ROBOT_RGB = (220, 30, 30)
+ROBOT_NOSE_RGB = (110, 0, 0)
+
+FRAME_LOG_MAGIC = b"RVFRAME1"
+# magic, rows, cols
+_LOG_HEADER = struct.Struct("<8sII")
+# robot row, robot col, dir index, compressed payload length
+_FRAME_HEADER = struct.Struct("<iiBI")
+
+
+def display_codes(viz, cleaned) -> bytes:
+	"""The visualizer's grid codes with cleaned floor marked CLEANED."""
+	codes = viz.grid.as_array().copy()
+	mask = viz._cleaned_mask(cleaned) & (codes != WALL) & (codes != OBJECT)
+	codes[mask] = CLEANED
+	return codes.tobytes()
+
+
+def rgb_lut():
+	"""(256, 3) uint8 colour table for cell codes, from RoomVisualizer.COLOR_MAP."""
+	from scaffolding import RoomVisualizer
+
+	lut = np.full((256, 3), 255, dtype=np.uint8)
+	for code, ch in CODE_TO_CHAR.items():
+		lut[code] = [round(v * 255) for v in RoomVisualizer.COLOR_MAP.get(ch, (1.0, 1.0, 1.0))]
+	return lut
+
+
+def cell_image(lut, codes: bytes, rows: int, cols: int, robot_pos: Tuple[int, int],
+		robot_dir: str, scale: int = 8, robot_color=ROBOT_RGB, nose_color=ROBOT_NOSE_RGB):
+	"""Render display codes as an RGB image with `scale` x `scale` pixels per cell.
+
+	The robot's cell is drawn red with a dark strip on the side it faces.
+	With a 1-D `lut` of palette indices (and palette indices as the robot colours)
+	the result is a palette-index image instead.
+	"""
+	arr = np.frombuffer(codes, dtype=np.uint8).reshape(rows, cols)
+	img = lut[arr].repeat(scale, axis=0).repeat(scale, axis=1)
+	r, c = robot_pos
+	if 0 <= r < rows and 0 <= c < cols:
+		y, x = r * scale, c * scale
+		img[y:y + scale, x:x + scale] = robot_color
+		dr, dc = DELTAS[robot_dir]
+		nose = max(1, scale // 4)
+		ys = _edge(y, scale, nose, dr)
+		xs = _edge(x, scale, nose, dc)
+		img[ys, xs] = nose_color
+	return img
+
+
+def _edge(start: int, scale: int, width: int, delta: int) -> slice:
+	# pixel span of a cell along one axis: the far edge, near edge or all of it
+	if delta > 0:
+		return slice(start + scale - width, start + scale)
+	if delta < 0:
+		return slice(start, start + width)
+	return slice(start, start + scale)
+
+
+class GifWriter:
+	"""Animated GIF written one frame at a time.
+
+	Pillow's save(save_all=True) collects every frame before writing, so a
+	long run would hold the whole animation in memory. Here all frames share
+	one fixed palette (the cell colours plus the robot), the file header is
+	written up front and each frame is appended as it comes, cropped to the
+	rectangle that changed since the previous one. Only the previous frame
+	is kept.
+	"""
+
+	def __init__(self, path: str, rows: int, cols: int, fps: int = 10, scale: int = 8) -> None:
+		from PIL import GifImagePlugin, Image
+
+		self._image_cls = Image
+		self._getdata = GifImagePlugin.getdata
+		self.rows = rows
+		self.cols = cols
+		self.scale = scale
+		self.duration = max(1, round(1000 / fps))
+		self.frames = 0
+
+		colors, index = np.unique(rgb_lut(), axis=0, return_inverse=True)
+		self._lut = index.reshape(-1).astype(np.uint8)
+		self._robot, self._nose = len(colors), len(colors) + 1
+		palette = np.zeros((16, 3), dtype=np.uint8)
+		palette[:len(colors)] = colors
+		palette[self._robot] = ROBOT_RGB
+		palette[self._nose] = ROBOT_NOSE_RGB
+		self._palette = palette.tobytes()
+		self._previous = None
+
+		width, height = cols * scale, rows * scale
+		self._fh = open(path, "wb")
+		# header, logical screen (16-colour global table), palette, loop forever
+		self._fh.write(b"GIF89a" + struct.pack("<HHBBB", width, height, 0x80 | 0x70 | 3, 0, 0))
+		self._fh.write(self._palette)
+		self._fh.write(b"!\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", 0) + b"\x00")
+
+	def append(self, robot_pos: Tuple[int, int], robot_dir: str, codes: bytes) -> None:
+		"""Add one frame of display codes with the robot at `robot_pos`."""
+		img = cell_image(self._lut, codes, self.rows, self.cols, robot_pos, robot_dir, self.scale,
+				robot_color=self._robot, nose_color=self._nose)
+		x0, y0 = 0, 0
+		frame = img
+		if self._previous is not None:
+			changed = img != self._previous
+			ys, xs = np.nonzero(changed.any(axis=1)), np.nonzero(changed.any(axis=0))
+			if len(ys[0]):
+				y0, y1, x0, x1 = ys[0][0], ys[0][-1] + 1, xs[0][0], xs[0][-1] + 1
+			else:
+				y1, x1 = 1, 1  # unchanged: repeat a single pixel to keep the timing
+			frame = img[y0:y1, x0:x1]
+		self._previous = img
+		im = self._image_cls.fromarray(np.ascontiguousarray(frame), "P")
+		im.putpalette(self._palette)
+		for chunk in self._getdata(im, (int(x0), int(y0)), duration=self.duration):
+			self._fh.write(chunk)
+		self.frames += 1
+
+	def close(self) -> int:
+		"""Finish the file; returns the number of frames written."""
+		if self._fh is not None:
+			self._fh.write(b";")
+			self._fh.close()
+			self._fh = None
+		return self.frames
+
+
+def write_gif(frames: Iterable[Tuple[Tuple[int, int], str, bytes]], rows: int, cols: int,
+		path: str, fps: int = 10, scale: int = 8) -> int:
+	"""Encode (robot_pos, robot_dir, display_codes) frames as an animated GIF.
+
+	Frames are consumed one at a time, so `frames` can be a generator over
+	a log of any length.
+	"""
+	writer = GifWriter(path, rows, cols, fps=fps, scale=scale)
+	try:
+		for pos, robot_dir, codes in frames:
+			writer.append(pos, robot_dir, codes)
+	finally:
+		count = writer.close()
+	return count
+
+
+class FrameSink(abc.ABC):
+	"""Destination for headless frames.
+
+	`needs_figure` tells the visualizer whether it has to draw the matplotlib
+	figure before calling `write()`.
+	"""
+
+	needs_figure = True
+
+	@abc.abstractmethod
+	def write(self, viz, robot_pos: Tuple[int, int], robot_dir: str, cleaned) -> None:
+		"""Record one frame."""
+
+	def close(self) -> None:
+		pass
+
+
+class PNGSequenceSink(FrameSink):
+	"""One PNG file per frame in `save_dir` (the original headless behaviour)."""
+
+	def __init__(self, save_dir: str = "frames") -> None:
+		self.save_dir = save_dir
+		os.makedirs(self.save_dir, exist_ok=True)
+
+	def write(self, viz, robot_pos, robot_dir, cleaned) -> None:
+		path = os.path.join(self.save_dir, f"frame_{viz.frame:04d}.png")
+		viz.fig.savefig(path, bbox_inches="tight")
+		print(f"Saved frame -> {path}")
+
+
+class VideoSink(FrameSink):
+	"""Stream figure frames to ffmpeg (any format ffmpeg can write, e.g. .mp4)."""
+
+	def __init__(self, path: str, fps: int = 10, dpi: int = 100) -> None:
+		if not MATPLOTLIB_AVAILABLE or not animation.writers.is_available("ffmpeg"):
+			raise RuntimeError(f"matplotlib and ffmpeg are required to write {path}")
+		self.path = path
+		self.dpi = dpi
+		self.writer = animation.FFMpegWriter(fps=fps)
+		self._started = False
+
+	def write(self, viz, robot_pos, robot_dir, cleaned) -> None:
+		if not self._started:
+			self.writer.setup(viz.fig, self.path, dpi=self.dpi)
+			self._started = True
+		self.writer.grab_frame()
+
+	def close(self) -> None:
+		if self._started:
+			self.writer.finish()
+			self._started = False
+
+
+class GifSink(FrameSink):
+	"""Animated GIF at cell resolution, streamed to disk with GifWriter.
+
+	No frames are buffered: each one is encoded and appended to the file
+	when it is drawn, so memory does not grow with the length of the run.
+	"""
+
+	needs_figure = False
+
+	def __init__(self, path: str, fps: int = 10, scale: int = 8) -> None:
+		self.path = path
+		self.fps = fps
+		self.scale = scale
+		self._writer: Optional[GifWriter] = None
+
+	def write(self, viz, robot_pos, robot_dir, cleaned) -> None:
+		if self._writer is None:
+			self._writer = GifWriter(self.path, viz.rows, viz.cols, fps=self.fps, scale=self.scale)
+		self._writer.append(robot_pos, robot_dir, display_codes(viz, cleaned))
+
+	def close(self) -> None:
+		if self._writer is not None:
+			self._writer.close()
+			self._writer = None
+
+
+class FrameLogSink(FrameSink):
+	"""Append frames to a compact binary log without drawing the figure.
+
+	Each frame stores the robot pose and the room's display codes (cell codes
+	with cleaned floor marked CLEANED), zlib-compressed. Only one frame is
+	held in memory at a time.
+	"""
+
+	needs_figure = False
+
+	def __init__(self, path: str, level: int = 1) -> None:
+		self.path = path
+		self.level = level
+		self._fh = None
+
+	def write(self, viz, robot_pos, robot_dir, cleaned) -> None:
+		if self._fh is None:
+			self._fh = open(self.path, "wb")
+			self._fh.write(_LOG_HEADER.pack(FRAME_LOG_MAGIC, viz.rows, viz.cols))
+		payload = zlib.compress(display_codes(viz, cleaned), self.level)
+		r, c = robot_pos
+		self._fh.write(_FRAME_HEADER.pack(r, c, DIRS.index(robot_dir), len(payload)))
+		self._fh.write(payload)
+
+	def close(self) -> None:
+		if self._fh is not None:
+			self._fh.close()
+			self._fh = None
+
+
+def open_sink(record: Optional[str], save_dir: str = "frames", fps: int = 10) -> FrameSink:
+	"""Pick a sink for `record` by file extension (None = PNG sequence)."""
+	if record is None:
+		return PNGSequenceSink(save_dir)
+	ext = os.path.splitext(record)[1].lower()
+	if ext == ".gif":
+		return GifSink(record, fps=fps)
+	if ext == ".rvf":
+		return FrameLogSink(record)
+	return VideoSink(record, fps=fps)
+
+
+def read_frame_log(path: str) -> Iterator[Tuple[Tuple[int, int], str, RoomGrid]]:
+	"""Yield (robot_pos, robot_dir, display_grid) for each frame in a log."""
+	for pos, robot_dir, codes, rows, cols in _iter_frame_log(path):
+		yield pos, robot_dir, RoomGrid(rows, cols, bytearray(codes))
+
+
+def _iter_frame_log(path: str):
+	with open(path, "rb") as fh:
+		magic, rows, cols = _LOG_HEADER.unpack(fh.read(_LOG_HEADER.size))
+		if magic != FRAME_LOG_MAGIC:
+			raise ValueError(f"{path} is not a frame log")
+		while True:
+			head = fh.read(_FRAME_HEADER.size)
+			if len(head) < _FRAME_HEADER.size:
+				return
+			r, c, dir_idx, size = _FRAME_HEADER.unpack(head)
+			yield (r, c), DIRS[dir_idx], zlib.decompress(fh.read(size)), rows, cols
+
+
+def frame_log_to_video(log_path: str, out_path: str, fps: int = 10, scale: int = 8) -> int:
+	"""Render a frame log to .gif (Pillow) or .mp4 (ffmpeg); returns the frame count."""
+	with open(log_path, "rb") as fh:
+		_, rows, cols = _LOG_HEADER.unpack(fh.read(_LOG_HEADER.size))
+	frames = ((pos, d, codes) for pos, d, codes, _, _ in _iter_frame_log(log_path))
+	if out_path.lower().endswith(".gif"):
+		return write_gif(frames, rows, cols, out_path, fps=fps, scale=scale)
+
+	if not MATPLOTLIB_AVAILABLE or not animation.writers.is_available("ffmpeg"):
+		raise RuntimeError(f"matplotlib and ffmpeg are required to write {out_path}")
+	import matplotlib.pyplot as plt
+
+	lut = rgb_lut()
+	fig, ax = plt.subplots()
+	ax.set_xticks([])
+	ax.set_yticks([])
+	image = None
+	writer = animation.FFMpegWriter(fps=fps)
+	count = 0
+	with writer.saving(fig, out_path, dpi=100):
+		for pos, robot_dir, codes in frames:
+			img = cell_image(lut, codes, rows, cols, pos, robot_dir, scale)
+			if image is None:
+				image = ax.imshow(img)
+			else:
+				image.set_data(img)
+			writer.grab_frame()
+			count += 1
+	plt.close(fig)
+	return count
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Convert a .rvf frame log to a video")
+	parser.add_argument("log")
+	parser.add_argument("out")
+	parser.add_argument("--fps", type=int, default=10)
+	args = parser.parse_args()
+	n = frame_log_to_video(args.log, args.out, fps=args.fps)
+	print(f"wrote {n} frames -> {args.out}")
@@ -1,4 +1,5 @@
-from scaffolding import RoomVisualizer, RobotVacuum, Status
+from scaffolding import RoomVisualizer, RobotVacuum
+from coverage import CoveragePlanner
 import rooms
 
 
@@ -67,79 +68,10 @@ def demo():
 		print(f"Action: {act:10s} -> {status}")
 	"""
 
-	# before moving, push where we were
-	# we will pop the stack at the end
-
-	visit_stack = []
-	orientation_stack = []
-	cleaned_stack = [(1,1)]
-	checked_list = []
-
-	#def push_orientation():
-	#visit_stack.append((robot.r, robot.c, robot.dir_idx))
-		
-	
-	# called upon reaching a brand new square.
-	def visit():
-		print(f"visiting new square: {(robot.r, robot.c)}")
-		visit_stack.append((robot.r, robot.c))
-		orientation_stack.append(robot.dir_idx)
-		# check left
-		if get_side_coords(robot) not in (visit_stack + cleaned_stack + checked_list):
-			robot.turn_left()
-			forward_coords = get_front_coords(robot)
-			if forward_coords not in (visit_stack + cleaned_stack + checked_list):
-				if robot.forward() == Status.OK:
-					visit()
-				else:
-					checked_list.append(forward_coords)
-					print("blocked!")
-			else:
-				print("already visited or cleaned the left square!")
-			robot.turn_right()
-		# check forward
-		forward_coords = get_front_coords(robot)
-		if forward_coords not in (visit_stack + cleaned_stack + checked_list):
-			if robot.forward() == Status.OK:
-				visit()
-			else:
-				checked_list.append(forward_coords)
-				print("blocked!")
-		else:
-			print("already visited the forward square!")
-		# check right
-		if get_side_coords(robot, right=True) not in (visit_stack + cleaned_stack + checked_list):
-			robot.turn_right()
-			forward_coords = get_front_coords(robot)
-			if forward_coords not in (visit_stack + cleaned_stack + checked_list):
-				if robot.forward() == Status.OK:
-					visit()
-				else:
-					checked_list.append(forward_coords)
-					print("blocked!")
-			else:
-				print("already visited or cleaned the square!")
-			# clean
-			robot.turn_left()
-		robot.clean()
-		cleaned_stack.append((robot.r, robot.c))
-		prior_orientation = orientation_stack.pop()
-		print("restoring orientation")
-		while (robot.dir_idx != prior_orientation):
-			robot.turn_right()
-		print("restoring location")
-		robot.backward()
-		if len(visit_stack) > 0:
-			pass
-			"""
-			if visit_stack[-1] != get_front_coords(robot, backwards=True):
-				print("backtracking assertion did not pan out!")
-				import code
-				code.interact(local=locals())
-			"""
-		else:
-			print("your room is clean!")
-	
+	# the planner keeps visited/cleaned/blocked state in a flat byte grid,
+	# so each neighbour check is O(1) instead of scanning concatenated lists
+	planner = CoveragePlanner(robot, verbose=True)
+	visit = planner.run
 
 	print("exit this shell to start simulation")
 	import code
@@ -152,7 +84,7 @@ def demo():
 		code.interact(local=locals())
 
 
-	print("\nControls: robot.turn_left(), robot.turn_right(), robot.forward(), robot.backward(), robot.clean()")
+	print("\nControls: robot.turn_left(), robot.turn_right(), robot.face('N'), robot.forward(), robot.backward(), robot.clean()")
 	print()
 	import code
 	code.interact(local=locals())
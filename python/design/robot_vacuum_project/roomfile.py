@@ -0,0 +1,153 @@
+"""Binary room files that can be memory-mapped and shared between processes.
+
+Layout (little-endian):
+
+	offset  size  field
+	0       8     magic b"RVROOM\\0\\0"
+	8       2     format version (1)
+	10      2     header size in bytes (body offset)
+	12      4     rows
+	16      4     cols
+	20      4     row stride in bytes (>= cols)
+	24      8     reserved (zero)
+	32      ...   rows * stride cell codes (grid.OPEN/WALL/OBJECT/CLEANED)
+
+The body is exactly RoomGrid's cell buffer, so `open_room()` wraps the
+mapped file without parsing or copying it. Every worker that opens the same
+file shares the page cache:
+
+	roomfile.save_room(rooms.random_grid(5000, 5000, seed=1), "big.rvm")
+	grid = roomfile.open_room("big.rvm")            # read-only, zero-copy
+	robot = RobotVacuum(grid, start=(1, 1))
+
+ASCII frames written by RoomVisualizer (frame_NNNN.txt) convert both ways:
+
+	python roomfile.py frames/frame_0000.txt room.rvm
+	python roomfile.py room.rvm room.txt
+"""
+from __future__ import annotations
+
+import argparse
+import mmap
+import os
+import struct
+
+from grid import CLEANED, OPEN, RoomGrid, as_grid
+
+ROOM_MAGIC = b"RVROOM\0\0"
+ROOM_VERSION = 1
+# magic, version, header size, rows, cols, stride, reserved
+_HEADER = struct.Struct("<8sHHIIIQ")
+HEADER_SIZE = _HEADER.size
+
+_MMAP_ACCESS = {"r": mmap.ACCESS_READ, "r+": mmap.ACCESS_WRITE, "c": mmap.ACCESS_COPY}
+
+
+def _read_header(buf, path: str):
+	if len(buf) < HEADER_SIZE:
+		raise ValueError(f"{path} is too short to be a room file")
+	magic, version, header_size, rows, cols, stride, _ = _HEADER.unpack_from(buf)
+	if magic != ROOM_MAGIC:
+		raise ValueError(f"{path} is not a room file")
+	if version > ROOM_VERSION:
+		raise ValueError(f"{path} has unsupported room format version {version}")
+	if len(buf) < header_size + rows * stride:
+		raise ValueError(f"{path} is truncated")
+	return header_size, rows, cols, stride
+
+
+def save_room(room_map, path: str) -> None:
+	"""Write a room (RoomGrid or list-of-lists) as a binary room file."""
+	grid = as_grid(room_map)
+	with open(path, "wb") as fh:
+		fh.write(_HEADER.pack(ROOM_MAGIC, ROOM_VERSION, HEADER_SIZE, grid.rows, grid.cols, grid.cols, 0))
+		if grid.stride == grid.cols:
+			fh.write(memoryview(grid.cells)[:grid.rows * grid.cols])
+		else:
+			for r in range(grid.rows):
+				fh.write(grid.row_codes(r))
+
+
+def open_room(path: str, mode: str = "r") -> RoomGrid:
+	"""Memory-map a room file and return a RoomGrid over it (no copy).
+
+	Args:
+		path: file written by save_room()
+		mode: "r" read-only (RoomGrid.set raises TypeError), "r+" writes go
+			to the file, "c" copy-on-write (changes stay private to this
+			process), as for numpy.memmap
+	"""
+	if mode not in _MMAP_ACCESS:
+		raise ValueError(f"mode must be one of {sorted(_MMAP_ACCESS)}")
+	with open(path, "r+b" if mode == "r+" else "rb") as fh:
+		mm = mmap.mmap(fh.fileno(), 0, access=_MMAP_ACCESS[mode])
+	header_size, rows, cols, stride = _read_header(mm, path)
+	# the memoryview keeps the mapping alive for as long as the grid is used
+	body = memoryview(mm)[header_size:header_size + rows * stride]
+	return RoomGrid(rows, cols, body, stride=stride)
+
+
+def load_room(path: str) -> RoomGrid:
+	"""Read a room file into an in-memory (bytearray-backed) RoomGrid."""
+	with open(path, "rb") as fh:
+		data = fh.read()
+	header_size, rows, cols, stride = _read_header(data, path)
+	return RoomGrid(rows, cols, bytearray(data[header_size:header_size + rows * stride]), stride=stride)
+
+
+def read_ascii_room(path: str, keep_cleaned: bool = False) -> RoomGrid:
+	"""Parse an ASCII room or visualizer frame.
+
+	The robot arrow (^ > v <) becomes open floor. Cleaned cells ('C') become
+	open floor too unless `keep_cleaned` is set. A row of spaces is a row of
+	open floor; only empty lines at the end of the file are ignored.
+
+	Raises:
+		ValueError: if the rows are not all the same length
+	"""
+	with open(path, newline="") as fh:
+		lines = [line.rstrip("\r\n") for line in fh]
+	while lines and not lines[-1]:
+		lines.pop()
+	for i, line in enumerate(lines):
+		if len(line) != len(lines[0]):
+			raise ValueError(f"{path}: row {i} has {len(line)} cells, expected {len(lines[0])}")
+	grid = RoomGrid.from_rows(lines)
+	if not keep_cleaned:
+		grid.cells[:] = bytes(grid.cells).replace(bytes([CLEANED]), bytes([OPEN]))
+	return grid
+
+
+def write_ascii_room(room_map, path: str) -> None:
+	"""Write a room in the same character format as the visualizer's frames."""
+	grid = as_grid(room_map)
+	with open(path, "w") as fh:
+		fh.write("\n".join(grid))
+
+
+def _is_binary(path: str) -> bool:
+	with open(path, "rb") as fh:
+		return fh.read(len(ROOM_MAGIC)) == ROOM_MAGIC
+
+
+def convert(src: str, dst: str) -> RoomGrid:
+	"""Convert between binary room files and ASCII rooms/frames.
+
+	The input format is detected from the file contents; the output is ASCII
+	if `dst` ends in .txt, binary otherwise.
+	"""
+	grid = open_room(src) if _is_binary(src) else read_ascii_room(src)
+	if os.path.splitext(dst)[1].lower() == ".txt":
+		write_ascii_room(grid, dst)
+	else:
+		save_room(grid, dst)
+	return grid
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Convert rooms between binary (.rvm) and ASCII (.txt)")
+	parser.add_argument("src")
+	parser.add_argument("dst")
+	args = parser.parse_args()
+	grid = convert(args.src, args.dst)
+	print(f"wrote {grid.rows}x{grid.cols} room -> {args.dst}")
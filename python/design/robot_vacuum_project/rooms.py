@@ -1,30 +1,52 @@
 """Reusable room generators for the robot vacuum visualizer.
 
-Each room is represented as a list of lists of single-character strings.
+Each room is represented as a list of lists of single-character strings,
+or, when a generator is called with ``compact=True``, as a grid.RoomGrid
+holding one byte per cell.
 Chars used:
   '#': wall (impassable)
   'X': object (impassable)
   '.': open floor
   ' ': open floor (alternate)
 
-The module exports several named generators and a TEST_ROOMS dict for
-quick import in demos/tests.
+The module exports several named generators and a lazily built TEST_ROOMS
+mapping for quick import in demos/tests; register_room() adds more names.
+
+For very large floor plans, the *_grid variants (empty_grid, random_grid,
+checkerboard_grid, concentric_grid) build the same layouts with NumPy and
+return a RoomGrid directly.
 """
 from __future__ import annotations
 
 import random
-from typing import Dict, List, Optional, Tuple
+from collections.abc import Mapping
+from functools import partial
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from grid import OBJECT, WALL, RoomGrid
 
 Grid = List[List[str]]
+# what a generator returns: a list of lists, or a RoomGrid with compact=True
+Room = Union[Grid, RoomGrid]
+
+
+def _emit(grid: Grid, compact: bool) -> Room:
+    return RoomGrid.from_rows(grid) if compact else grid
 
 
-def empty_room(rows: int, cols: int, border: bool = True) -> Grid:
+def empty_room(rows: int, cols: int, border: bool = True, compact: bool = False) -> Room:
     """Create an empty room (all open floor) with optional walls on border.
 
     Args:
         rows, cols: dimensions (>=3 recommended)
         border: whether to put '#' around the perimeter
+        compact: return a RoomGrid instead of a list of lists
     """
+    return _emit(_empty_rows(rows, cols, border), compact)
+
+
+def _empty_rows(rows: int, cols: int, border: bool = True) -> Grid:
+    # empty_room() as a list of lists, for the generators that draw on it
     if rows <= 0 or cols <= 0:
         raise ValueError("rows and cols must be > 0")
 
@@ -39,22 +61,23 @@ def empty_room(rows: int, cols: int, border: bool = True) -> Grid:
     return grid
 
 
-def random_room(rows: int, cols: int, obstacle_prob: float = 0.12, seed: Optional[int] = None) -> Grid:
+def random_room(rows: int, cols: int, obstacle_prob: float = 0.12, seed: Optional[int] = None,
+                compact: bool = False) -> Room:
     """Create a random room with border walls and interior obstacles marked 'X'.
 
     obstacle_prob: probability each interior cell becomes 'X'.
     seed: optional randomness seed for reproducibility.
     """
     rng = random.Random(seed)
-    grid = empty_room(rows, cols, border=True)
+    grid = _empty_rows(rows, cols, border=True)
     for r in range(1, rows - 1):
         for c in range(1, cols - 1):
             if rng.random() < obstacle_prob:
                 grid[r][c] = "X"
-    return grid
+    return _emit(grid, compact)
 
 
-def narrow_corridor(length: int = 1, width: int = 5) -> Grid:
+def narrow_corridor(length: int = 1, width: int = 5, compact: bool = False) -> Room:
     """Create a narrow corridor room: width x length with walls around.
 
     The corridor will be oriented along rows (length rows, width cols)
@@ -62,7 +85,7 @@ def narrow_corridor(length: int = 1, width: int = 5) -> Grid:
     """
     rows = max(3, length + 2)
     cols = max(3, width)
-    grid = empty_room(rows, cols, border=True)
+    grid = _empty_rows(rows, cols, border=True)
     # carve interior corridor ('.') across all interior cells
     for r in range(1, rows - 1):
         for c in range(1, cols - 1):
@@ -70,25 +93,25 @@ def narrow_corridor(length: int = 1, width: int = 5) -> Grid:
     # Make an opening at bottom center
     mid = cols // 2
     grid[rows - 1][mid] = "."
-    return grid
+    return _emit(grid, compact)
 
 
-def checkerboard_room(rows: int, cols: int) -> Grid:
+def checkerboard_room(rows: int, cols: int, compact: bool = False) -> Room:
     """Create a room with a checkerboard pattern of open and small obstacles.
 
     Useful for testing coverage in constrained obstacle fields.
     """
-    grid = empty_room(rows, cols, border=True)
+    grid = _empty_rows(rows, cols, border=True)
     for r in range(1, rows - 1):
         for c in range(1, cols - 1):
             if (r + c) % 2 == 0:
                 grid[r][c] = "X"
             else:
                 grid[r][c] = "."
-    return grid
+    return _emit(grid, compact)
 
 
-def spiral_room(size: int = 11) -> Grid:
+def spiral_room(size: int = 11, compact: bool = False) -> Room:
     """Create a spiral-shaped open path inside walls.
 
     size: outer dimension (will be made odd if necessary).
@@ -116,10 +139,10 @@ def spiral_room(size: int = 11) -> Grid:
         if dc == 0:
             steps -= 1
     grid[1][1] = "."
-    return grid
+    return _emit(grid, compact)
 
 
-def concentric_rooms(layers: int = 3, layer_spacing: int = 2) -> Grid:
+def concentric_rooms(layers: int = 3, layer_spacing: int = 2, compact: bool = False) -> Room:
     """Create nested square rooms (concentric walls) useful for path planning.
 
     layers: number of enclosed layers (>=1).
@@ -136,26 +159,164 @@ def concentric_rooms(layers: int = 3, layer_spacing: int = 2) -> Grid:
             grid[max_idx][i] = "#"
             grid[i][offset] = "#"
             grid[i][max_idx] = "#"
-    return grid
+    return _emit(grid, compact)
+
+
+# --- NumPy-backed generators -------------------------------------------------
+#
+# Same layouts as the generators above, built with array slicing straight
+# into a RoomGrid (one byte per cell) instead of cell-by-cell Python loops.
+# numpy is imported on first use so `import rooms` stays cheap.
+
+# rows of random draws generated per step in random_grid (fixed so results
+# only depend on the seed, and peak memory stays bounded)
+_RANDOM_CHUNK_ROWS = 512
+
+
+def _bordered(rows: int, cols: int, border: bool = True):
+    import numpy as np
+
+    if rows <= 0 or cols <= 0:
+        raise ValueError("rows and cols must be > 0")
+    arr = np.zeros((rows, cols), dtype=np.uint8)
+    if border and rows >= 2 and cols >= 2:
+        arr[0, :] = WALL
+        arr[-1, :] = WALL
+        arr[:, 0] = WALL
+        arr[:, -1] = WALL
+    return arr
+
+
+def empty_grid(rows: int, cols: int, border: bool = True) -> RoomGrid:
+    """NumPy version of empty_room(); returns a RoomGrid."""
+    return RoomGrid.from_array(_bordered(rows, cols, border))
+
+
+def random_grid(rows: int, cols: int, obstacle_prob: float = 0.12, seed: Optional[int] = None) -> RoomGrid:
+    """NumPy version of random_room(); returns a RoomGrid.
+
+    Uses numpy.random.default_rng(seed), so the layout is reproducible per
+    seed (but differs from random_room() with the same seed). Draws are
+    16-bit integers, so obstacle_prob is resolved to 1/65536.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    arr = _bordered(rows, cols)
+    inner = arr[1:rows - 1, 1:cols - 1]
+    threshold = round(obstacle_prob * 65536)
+    for r0 in range(0, inner.shape[0], _RANDOM_CHUNK_ROWS):
+        block = inner[r0:r0 + _RANDOM_CHUNK_ROWS]
+        draws = rng.integers(0, 65536, size=block.shape, dtype=np.uint16)
+        if threshold >= 65536:
+            block[...] = OBJECT
+        else:
+            # interior starts OPEN (0), so OBJECT * (draw < threshold) is the cell code
+            np.multiply(draws < threshold, OBJECT, out=block, casting="unsafe")
+    return RoomGrid.from_array(arr)
+
+
+def checkerboard_grid(rows: int, cols: int) -> RoomGrid:
+    """NumPy version of checkerboard_room(); returns a RoomGrid."""
+    arr = _bordered(rows, cols)
+    inner = arr[1:rows - 1, 1:cols - 1]
+    # (r + c) even with r, c >= 1 <=> (i + j) even for interior indices i, j
+    inner[0::2, 0::2] = OBJECT
+    inner[1::2, 1::2] = OBJECT
+    return RoomGrid.from_array(arr)
+
+
+def concentric_grid(layers: int = 3, layer_spacing: int = 2) -> RoomGrid:
+    """NumPy version of concentric_rooms(); returns a RoomGrid."""
+    import numpy as np
+
+    size = 2 + layers * (layer_spacing + 1) * 2
+    arr = np.zeros((size, size), dtype=np.uint8)
+    for layer in range(layers):
+        offset = 1 + layer * (layer_spacing + 1)
+        max_idx = size - 1 - offset
+        arr[offset, offset:max_idx + 1] = WALL
+        arr[max_idx, offset:max_idx + 1] = WALL
+        arr[offset:max_idx + 1, offset] = WALL
+        arr[offset:max_idx + 1, max_idx] = WALL
+    return RoomGrid.from_array(arr)
+
+
+class LazyRooms(Mapping):
+    """Read-only mapping of room name -> grid that builds each room on first access.
+
+    Rooms come from a registry of zero-argument factories (see register_room);
+    a built room is cached until its factory is replaced.
+    """
+
+    def __init__(self, factories: Dict[str, Callable[[], Room]]) -> None:
+        self._factories = factories
+        self._cache: Dict[str, Room] = {}
+
+    def __getitem__(self, name: str) -> Room:
+        try:
+            return self._cache[name]
+        except KeyError:
+            pass
+        room = self._factories[name]()
+        self._cache[name] = room
+        return room
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._factories)
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    def is_built(self, name: str) -> bool:
+        return name in self._cache
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Drop the cached room `name` (or all of them)."""
+        if name is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(name, None)
+
+    def __repr__(self) -> str:
+        return f"LazyRooms({list(self._factories)})"
+
+
+# name -> factory for the named test rooms; add to it with register_room()
+ROOM_REGISTRY: Dict[str, Callable[[], Room]] = {}
+
+
+def register_room(name: str, factory: Callable[[], Room], replace: bool = False) -> None:
+    """Register a named room that TEST_ROOMS builds lazily with `factory()`.
+
+    Use functools.partial (rather than a lambda) if the factory has to be
+    picklable, e.g. for process pools.
+    """
+    if name in ROOM_REGISTRY and not replace:
+        raise KeyError(f"room {name!r} is already registered")
+    ROOM_REGISTRY[name] = factory
+    TEST_ROOMS.invalidate(name)
+
 
+def named_test_rooms() -> Dict[str, Room]:
+    """Return a dict of freshly built rooms for every registered name."""
+    return {name: factory() for name, factory in ROOM_REGISTRY.items()}
 
-def named_test_rooms() -> Dict[str, Grid]:
-    """Return a dict of pre-built rooms for easy import and iteration."""
-    rooms: Dict[str, Grid] = {}
-    rooms["small_empty"] = empty_room(7, 9)
-    rooms["medium_random"] = random_room(12, 16, obstacle_prob=0.12, seed=42)
-    rooms["large_random"] = random_room(24, 36, obstacle_prob=0.10, seed=123)
-    rooms["narrow_corridor"] = narrow_corridor(length=10, width=5)
-    rooms["checkerboard"] = checkerboard_room(13, 13)
-    rooms["spiral"] = spiral_room(15)
-    rooms["concentric"] = concentric_rooms(layers=3, layer_spacing=1)
-    return rooms
 
+# module-level TEST_ROOMS for convenience; rooms are built on first access
+TEST_ROOMS: LazyRooms = LazyRooms(ROOM_REGISTRY)
 
-# module-level TEST_ROOMS for convenience
-TEST_ROOMS: Dict[str, Grid] = named_test_rooms()
+register_room("small_empty", partial(empty_room, 7, 9))
+register_room("medium_random", partial(random_room, 12, 16, obstacle_prob=0.12, seed=42))
+register_room("large_random", partial(random_room, 24, 36, obstacle_prob=0.10, seed=123))
+register_room("narrow_corridor", partial(narrow_corridor, length=10, width=5))
+register_room("checkerboard", partial(checkerboard_room, 13, 13))
+register_room("spiral", partial(spiral_room, 15))
+register_room("concentric", partial(concentric_rooms, layers=3, layer_spacing=1))
 
 
-__all__ = ["Grid", "empty_room", "random_room", "narrow_corridor",
+__all__ = ["Grid", "Room", "empty_room", "random_room", "narrow_corridor",
            "checkerboard_room", "spiral_room", "concentric_rooms",
-           "named_test_rooms", "TEST_ROOMS"]
+           "empty_grid", "random_grid", "checkerboard_grid", "concentric_grid",
+           "named_test_rooms", "register_room", "LazyRooms", "ROOM_REGISTRY",
+           "TEST_ROOMS"]
@@ -0,0 +1,179 @@
+"""Opt-in profiling counters for RobotVacuum runs.
+
+Enabling stats replaces the robot's action methods (and its visualizer's
+update/flush/_render) with timing wrappers on that one instance; disabling
+removes them again. A robot without stats runs the plain class methods,
+so there is no overhead at all when instrumentation is off.
+
+	robot = RobotVacuum(room, start=(1, 1), visualizer=viz)
+	stats = robot.enable_stats()          # before the planner grabs methods
+	CoveragePlanner(robot).run()
+	stats.stop()
+	print(stats.report())
+	stats.dump("run_stats.json")
+
+The wall time of the run is split into:
+  render    time inside RoomVisualizer._render (frames actually drawn)
+  viz       the rest of RoomVisualizer.update and flush (policy checks,
+            bookkeeping)
+  robot     time inside robot action methods, minus the visualizer
+  planner   everything else between enable_stats() and stop()
+
+The parts add up to the wall time. flush() (which planners call once at
+the end of a run) runs outside any action, so its time is taken out of
+the planner share rather than counted twice.
+"""
+from __future__ import annotations
+
+import json
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from scaffolding import Action, Status
+
+# methods wrapped on the robot; rotate_to/face call turn_left/turn_right,
+# so their time is also counted under those
+ROBOT_METHODS = [action.method for action in Action] + ["rotate_to", "face", "execute"]
+
+
+class RunStats:
+	"""Call counts, cumulative times and Status counts for one run.
+
+	Attributes:
+		calls: method name -> number of calls
+		ns: method name -> cumulative time in nanoseconds
+		statuses: Status -> number of results (including execute() batches)
+	"""
+
+	def __init__(self) -> None:
+		self.calls: Counter = Counter()
+		self.ns: Counter = Counter()
+		self.statuses: Counter = Counter()
+		self.started = time.perf_counter_ns()
+		self.stopped: Optional[int] = None
+		self._wrapped: List[tuple] = []
+
+	def _wrap(self, obj, name: str, key: str, count_status: bool = False) -> None:
+		method = getattr(obj, name)
+		calls, ns, statuses = self.calls, self.ns, self.statuses
+		clock = time.perf_counter_ns
+
+		def timed(*args, **kwargs):
+			t0 = clock()
+			result = method(*args, **kwargs)
+			ns[key] += clock() - t0
+			calls[key] += 1
+			if count_status:
+				statuses[result] += 1
+			return result
+
+		setattr(obj, name, timed)
+		self._wrapped.append((obj, name))
+
+	def _wrap_execute(self, robot) -> None:
+		method = robot.execute
+		calls, ns, statuses = self.calls, self.ns, self.statuses
+		clock = time.perf_counter_ns
+
+		def timed(*args, **kwargs):
+			t0 = clock()
+			result = method(*args, **kwargs)
+			ns["execute"] += clock() - t0
+			calls["execute"] += 1
+			for value, count in Counter(result).items():
+				statuses[Status(value)] += count
+			return result
+
+		robot.execute = timed
+		self._wrapped.append((robot, "execute"))
+
+	def attach(self, robot, visualizer=None) -> "RunStats":
+		"""Instrument `robot` (and `visualizer`, default robot.visualizer)."""
+		for name in ROBOT_METHODS:
+			if name == "execute":
+				self._wrap_execute(robot)
+			else:
+				# rotate_to/face results would double count their turns
+				self._wrap(robot, name, name, count_status=name not in ("rotate_to", "face"))
+		visualizer = visualizer if visualizer is not None else robot.visualizer
+		if visualizer is not None:
+			self._wrap(visualizer, "update", "viz.update")
+			self._wrap(visualizer, "flush", "viz.flush")
+			# async_visualizer.AsyncVisualizer draws on its own thread and has
+			# no _render; only its (queueing) update() time is counted
+			if hasattr(visualizer, "_render"):
+				self._wrap(visualizer, "_render", "viz.render")
+		return self
+
+	def detach(self) -> None:
+		"""Restore the plain class methods on every instrumented object."""
+		for obj, name in reversed(self._wrapped):
+			obj.__dict__.pop(name, None)
+		self._wrapped.clear()
+
+	def stop(self) -> None:
+		"""Mark the end of the run (the wall time stops growing)."""
+		if self.stopped is None:
+			self.stopped = time.perf_counter_ns()
+
+	@property
+	def frames(self) -> int:
+		"""Visualizer frames actually drawn (updates the render policy let through)."""
+		return self.calls["viz.render"]
+
+	@property
+	def wall_ns(self) -> int:
+		end = self.stopped if self.stopped is not None else time.perf_counter_ns()
+		return end - self.started
+
+	def breakdown(self) -> Dict[str, float]:
+		"""Wall time split into render / viz / robot / planner seconds.
+
+		Each timer nests inside the one it is subtracted from (_render inside
+		update or flush, update inside the actions), so the parts are
+		non-negative and sum to the wall time.
+		"""
+		actions_ns = sum(self.ns[action.method] for action in Action) + self.ns["execute"]
+		update_ns = self.ns["viz.update"]
+		flush_ns = self.ns["viz.flush"]
+		render_ns = self.ns["viz.render"]
+		wall_ns = self.wall_ns
+		return {
+			"wall": wall_ns / 1e9,
+			"render": render_ns / 1e9,
+			"viz": (update_ns + flush_ns - render_ns) / 1e9,
+			"robot": (actions_ns - update_ns) / 1e9,
+			"planner": (wall_ns - actions_ns - flush_ns) / 1e9,
+		}
+
+	def as_dict(self) -> Dict:
+		return {
+			"time_s": self.breakdown(),
+			"calls": dict(self.calls),
+			"method_time_s": {name: ns / 1e9 for name, ns in self.ns.items()},
+			"statuses": {status.name: count for status, count in self.statuses.items()},
+			"frames": self.frames,
+		}
+
+	def dump(self, path: str) -> None:
+		with open(path, "w") as fh:
+			json.dump(self.as_dict(), fh, indent=1)
+
+	def report(self) -> str:
+		"""Human-readable summary table."""
+		lines = ["time: " + ", ".join(f"{k} {v:.3f}s" for k, v in self.breakdown().items())]
+		lines.append(f"{'method':<12s} {'calls':>10s} {'total ms':>10s} {'avg us':>8s}")
+		for name, calls in sorted(self.calls.items(), key=lambda item: -self.ns[item[0]]):
+			total = self.ns[name]
+			lines.append(f"{name:<12s} {calls:>10d} {total / 1e6:>10.1f} {total / 1e3 / calls:>8.2f}")
+		lines.append("statuses: " + ", ".join(f"{s.name}={n}" for s, n in sorted(
+				self.statuses.items(), key=lambda item: item[0].value)))
+		lines.append(f"frames drawn: {self.frames}")
+		return "\n".join(lines)
+
+	def __repr__(self) -> str:
+		return f"RunStats(calls={sum(self.calls.values())}, wall={self.wall_ns / 1e9:.3f}s)"
+
+
+__all__ = ["RunStats", "ROBOT_METHODS"]
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 This module provides:
 - Status enum: return codes for the robot API
+- Action enum: compact codes for the robot actions (traces, batch APIs)
 - RobotVacuum: the robot interface (turn_left, turn_right, forward)
 - RoomVisualizer: Matplotlib-based visualizer that updates on each call
 
@@ -10,9 +11,20 @@ The demo at the bottom runs a few moves to show the API and visualization.
 """
 
 
+import heapq
 import os
-from enum import Enum
-from typing import Optional, Sequence, Tuple, Set
+import time
+from array import array
+from collections import deque
+from enum import Enum, IntEnum
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple, Set, Union
+
+from grid import CODE_TO_CHAR, OBJECT, OPEN, WALL, CellSet, RoomGrid, as_grid
+from recording import FrameSink, open_sink
+
+if TYPE_CHECKING:
+	from action_trace import ActionTrace
+	from run_stats import RunStats
 
 try:
 	import numpy as np
@@ -30,6 +42,121 @@ class Status(Enum):
 	BLOCKED = 1
 	OUT_OF_BOUNDS = 2
 	ALREADY_CLEANED = 3
+	OCCUPIED = 4
+
+
+class Action(IntEnum):
+	TURN_LEFT = 0
+	TURN_RIGHT = 1
+	FORWARD = 2
+	BACKWARD = 3
+	CLEAN = 4
+
+	@property
+	def method(self) -> str:
+		"""Name of the RobotVacuum method for this action, e.g. 'turn_left'."""
+		return self.name.lower()
+
+
+class CostModel:
+	"""Energy and time charged per robot action.
+
+	Moves that fail (into a wall, object, another robot or off the map)
+	are charged the bump cost instead of the move cost. Units are up to the
+	caller (e.g. joules and seconds).
+
+	Usage:
+		model = CostModel(move_energy=1.0, clean_energy=3.0)
+		statuses = robot.execute(actions, cost_model=model, energy_budget=5000)
+		energy, seconds = model.cost(actions[:len(statuses)], statuses)
+	"""
+
+	def __init__(
+		self,
+		move_energy: float = 1.0,
+		turn_energy: float = 0.5,
+		clean_energy: float = 2.0,
+		bump_energy: float = 1.5,
+		move_time: float = 1.0,
+		turn_time: float = 0.5,
+		clean_time: float = 1.5,
+		bump_time: float = 1.0,
+	) -> None:
+		self.move_energy = move_energy
+		self.turn_energy = turn_energy
+		self.clean_energy = clean_energy
+		self.bump_energy = bump_energy
+		self.move_time = move_time
+		self.turn_time = turn_time
+		self.clean_time = clean_time
+		self.bump_time = bump_time
+		# tables indexed by action * 2 + failed, where failed applies to moves only
+		self.energy_table = self._table(move_energy, turn_energy, clean_energy, bump_energy)
+		self.time_table = self._table(move_time, turn_time, clean_time, bump_time)
+
+	@staticmethod
+	def _table(move: float, turn: float, clean: float, bump: float) -> Tuple[float, ...]:
+		table = [0.0] * (2 * len(Action))
+		for action in Action:
+			if action in (Action.FORWARD, Action.BACKWARD):
+				table[2 * action], table[2 * action + 1] = move, bump
+			elif action == Action.CLEAN:
+				table[2 * action] = table[2 * action + 1] = clean
+			else:
+				table[2 * action] = table[2 * action + 1] = turn
+		return tuple(table)
+
+	def cost(self, actions: Sequence[int], statuses: Sequence[int]) -> Tuple[float, float]:
+		"""Total (energy, time) of actions with the given Status values."""
+		counts = [0] * len(self.energy_table)
+		ok = Status.OK.value
+		for action, status in zip(actions, statuses):
+			counts[2 * action + (status != ok)] += 1
+		energy = sum(n * e for n, e in zip(counts, self.energy_table))
+		seconds = sum(n * t for n, t in zip(counts, self.time_table))
+		return energy, seconds
+
+	def trace_cost(self, trace: "ActionTrace") -> Tuple[float, float]:
+		"""Total (energy, time) of a recorded action_trace.ActionTrace."""
+		return self.cost(trace.actions, trace.statuses)
+
+
+class RenderPolicy:
+	"""Decides which RoomVisualizer updates are actually drawn.
+
+	All conditions must hold for a frame to be drawn; skipped updates are
+	remembered and drawn by `RoomVisualizer.flush()`. The first update is
+	always drawn.
+
+	Args:
+		every: draw every Nth update (1 = every update)
+		min_interval_ms: draw at most once per this many milliseconds
+		clean_only: only draw after clean() actions
+	"""
+
+	def __init__(self, every: int = 1, min_interval_ms: Optional[float] = None, clean_only: bool = False) -> None:
+		if every < 1:
+			raise ValueError("every must be >= 1")
+		self.every = every
+		self.min_interval_ms = min_interval_ms
+		self.clean_only = clean_only
+		self._count = 0
+		self._last_draw: Optional[float] = None
+
+	def should_render(self, action: Optional[str] = None) -> bool:
+		self._count += 1
+		if self._last_draw is None:
+			self._last_draw = time.monotonic()
+			return True
+		if self.clean_only and action != "clean":
+			return False
+		if (self._count - 1) % self.every != 0:
+			return False
+		now = time.monotonic()
+		if self.min_interval_ms is not None and (now - self._last_draw) * 1000.0 < self.min_interval_ms:
+			return False
+		self._last_draw = now
+		return True
 
 
 class RoomVisualizer:
@@ -43,7 +170,11 @@ class RoomVisualizer:
 
 	The visualizer will draw the grid and the robot's location and
 	orientation. In headless mode (no DISPLAY) it saves frames to
-	a `frames/` directory.
+	a `frames/` directory, or streams them into a single video / frame log
+	when `record` is given (see recording.py).
+
+	`room_map` may also be a RoomGrid, which is used as-is (shared with the
+	robot rather than copied).
 	"""
 
 	COLOR_MAP = {
@@ -58,24 +189,64 @@ class RoomVisualizer:
 
 	def __init__(
 		self,
-		room_map: Sequence[Sequence[str]],
+		room_map: Union[RoomGrid, Sequence[Sequence[str]]],
 		title: str = "Room",
 		save_dir: str = "frames",
 		pause: float = 0.15,
+		incremental: bool = False,
+		policy: Optional[RenderPolicy] = None,
+		record: Optional[str] = None,
+		fps: int = 10,
 	) -> None:
-		self.room_map = [list(row) for row in room_map]
-		self.rows = len(self.room_map)
-		self.cols = len(self.room_map[0]) if self.rows else 0
+		"""Create a visualizer.
+
+		Args:
+			room_map: grid of characters or a shared RoomGrid
+			title: axes title
+			save_dir: where headless frames are written
+			pause: seconds to pause after each frame in GUI mode
+			incremental: keep a persistent image and only repaint the cells
+				that changed since the last frame (robot's old/new cell and
+				newly cleaned cells) instead of redrawing the whole room
+			policy: optional RenderPolicy to skip frames (every N actions, at
+				most every T ms, or only on clean()); call flush() at the end
+				of a run to draw the final state
+			record: optional output file (.mp4, .gif or .rvf frame log) that
+				receives every drawn frame instead of one PNG per frame;
+				call close() at the end of the run to finalize it
+			fps: frame rate for video recordings
+		"""
+		self.grid = room_map if isinstance(room_map, RoomGrid) else RoomGrid.from_rows(room_map)
+		self.room_map = self.grid
+		self.rows = self.grid.rows
+		self.cols = self.grid.cols
 		self.title = title
 		self.save_dir = save_dir
 		self.pause = pause
+		self.incremental = incremental
+		self.policy = policy
 		self.frame = 0
+		self._pending = None
+
+		# persistent artists and bookkeeping for incremental mode
+		self._lut = None
+		self._img = None
+		self._image_artist = None
+		self._arrow = None
+		self._painted: Optional[CellSet] = None
+		self._last_pos: Optional[Tuple[int, int]] = None
+		self._dirty: Set[Tuple[int, int]] = set()
 
 		self.headless = not MATPLOTLIB_AVAILABLE or not os.environ.get("DISPLAY")
 
-		if self.headless:
+		self.sink: Optional[FrameSink] = None
+		if not MATPLOTLIB_AVAILABLE:
+			# ASCII frames
 			os.makedirs(self.save_dir, exist_ok=True)
-		else:
+		elif self.headless or record is not None:
+			self.sink = open_sink(record, save_dir=self.save_dir, fps=fps)
+
+		if MATPLOTLIB_AVAILABLE and (not self.headless or self.sink.needs_figure):
 			self.fig, self.ax = plt.subplots(figsize=(self.cols * 0.6, self.rows * 0.6))
 			self.ax.set_title(self.title)
 			self.ax.set_xticks([])
@@ -84,88 +255,230 @@ class RoomVisualizer:
 	def _char_to_rgb(self, ch: str):
 		return self.COLOR_MAP.get(ch, (1.0, 1.0, 1.0))
 
-	def update(self, robot_pos: Tuple[int, int], robot_dir: str, cleaned: Set[Tuple[int, int]]):
-		"""Redraw the current state.
+	def _cell_rgb(self, r: int, c: int, cleaned: bool):
+		ch = CODE_TO_CHAR.get(self.grid.code(r, c), ".")
+		if cleaned and ch not in ("#", "X"):
+			ch = "C"
+		return self._char_to_rgb(ch)
+
+	def mark_dirty(self, cells) -> None:
+		"""Tell incremental mode that these cells may have changed colour."""
+		self._dirty.update(cells)
+
+	def set_cell(self, r: int, c: int, code: int) -> None:
+		"""Show a map edit (e.g. RobotVacuum.add_obstacle()) from the next frame on.
+
+		A visualizer built from a list-of-lists map has its own grid, which is
+		updated here; a grid shared with the robot already holds the code.
+		"""
+		if self.grid.code(r, c) != code:
+			self.grid.set(r, c, code)
+		self._dirty.add((r, c))
+
+	def invalidate(self) -> None:
+		"""Force a full repaint on the next incremental update (e.g. after the map changed)."""
+		self._image_artist = None
+
+	def update(
+		self,
+		robot_pos: Tuple[int, int],
+		robot_dir: str,
+		cleaned: Set[Tuple[int, int]],
+		action: Optional[str] = None,
+	):
+		"""Redraw the current state (subject to the render policy).
 
 		Args:
 			robot_pos: (row, col)
 			robot_dir: one of 'N','E','S','W'
 			cleaned: set of (row, col) cleaned cells
+			action: name of the robot action that triggered the update
 		"""
-		# update internal map with cleaned marks for display only
-		disp = [[ch for ch in row] for row in self.room_map]
-		for (r, c) in cleaned:
-			if 0 <= r < self.rows and 0 <= c < self.cols and disp[r][c] not in ("#", "X"):
-				disp[r][c] = "C"
+		# cells the robot passed through while frames were skipped
+		self._dirty.add(robot_pos)
+		if self.policy is not None and not self.policy.should_render(action):
+			self._pending = (robot_pos, robot_dir, cleaned)
+			return
+		self._render(robot_pos, robot_dir, cleaned)
+
+	def flush(self) -> None:
+		"""Draw the most recent skipped state, if any (call at end of a run)."""
+		if self._pending is not None:
+			self._render(*self._pending)
+
+	def close(self) -> None:
+		"""Flush the last state and finalize any recording."""
+		self.flush()
+		if self.sink is not None:
+			self.sink.close()
 
+	def _render(self, robot_pos, robot_dir, cleaned) -> None:
+		self._pending = None
 		if not MATPLOTLIB_AVAILABLE:
-			# Simple ASCII fallback
-			lines = []
-			for r, row in enumerate(disp):
-				row_chars = []
-				for c, ch in enumerate(row):
-					if (r, c) == robot_pos:
-						row_chars.append({"N":"^","E":">","S":"v","W":"<"}[robot_dir])
-					else:
-						row_chars.append(ch)
-				lines.append("".join(row_chars))
-			out = "\n".join(lines)
-			path = os.path.join(self.save_dir, f"frame_{self.frame:04d}.txt")
-			with open(path, "w") as f:
-				f.write(out)
-			print(f"Saved ASCII frame -> {path}")
+			self._write_ascii(robot_pos, robot_dir, cleaned)
+			self._dirty.clear()
+			return
+
+		if self.headless and not self.sink.needs_figure:
+			# the sink encodes the grid itself; skip matplotlib entirely
+			self.sink.write(self, robot_pos, robot_dir, cleaned)
+			self._dirty.clear()
 			self.frame += 1
 			return
 
-		# Build RGB image
-		img = np.ones((self.rows, self.cols, 3), dtype=float)
-		for r in range(self.rows):
-			for c in range(self.cols):
-				img[r, c] = self._char_to_rgb(disp[r][c])
+		if self.incremental:
+			self._draw_incremental(robot_pos, robot_dir, cleaned)
+		else:
+			self._draw_full(robot_pos, robot_dir, cleaned)
+		self._dirty.clear()
 
-		self.ax.clear()
-		self.ax.imshow(img, origin="upper")
+		# save or show
+		if self.sink is not None:
+			self.sink.write(self, robot_pos, robot_dir, cleaned)
+		if self.headless:
+			self.frame += 1
+		else:
+			if self.incremental:
+				self.fig.canvas.draw_idle()
+			plt.pause(self.pause)
+			self.frame += 1
+
+	def _display_rows(self, cleaned: Set[Tuple[int, int]]):
+		# update internal map with cleaned marks for display only
+		disp = self.grid.to_rows()
+		for (r, c) in cleaned:
+			if 0 <= r < self.rows and 0 <= c < self.cols and disp[r][c] not in ("#", "X"):
+				disp[r][c] = "C"
+		return disp
+
+	def _write_ascii(self, robot_pos, robot_dir, cleaned) -> None:
+		# Simple ASCII fallback
+		disp = self._display_rows(cleaned)
+		lines = []
+		for r, row in enumerate(disp):
+			row_chars = []
+			for c, ch in enumerate(row):
+				if (r, c) == robot_pos:
+					row_chars.append({"N":"^","E":">","S":"v","W":"<"}[robot_dir])
+				else:
+					row_chars.append(ch)
+			lines.append("".join(row_chars))
+		out = "\n".join(lines)
+		path = os.path.join(self.save_dir, f"frame_{self.frame:04d}.txt")
+		with open(path, "w") as f:
+			f.write(out)
+		print(f"Saved ASCII frame -> {path}")
+		self.frame += 1
+
+	def _color_lut(self):
+		"""(256, 3) colour table indexed by cell code, built from COLOR_MAP."""
+		if self._lut is None:
+			lut = np.ones((256, 3), dtype=float)
+			for code, ch in CODE_TO_CHAR.items():
+				lut[code] = self._char_to_rgb(ch)
+			self._lut = lut
+		return self._lut
+
+	def _cleaned_mask(self, cleaned: Set[Tuple[int, int]]):
+		"""Boolean (rows, cols) mask of cleaned cells."""
+		if isinstance(cleaned, CellSet) and (cleaned.rows, cleaned.cols) == (self.rows, self.cols):
+			# zero-copy view of the robot's byte-per-cell set
+			return np.frombuffer(cleaned.bits, dtype=np.uint8).reshape(self.rows, self.cols) != 0
+		mask = np.zeros((self.rows, self.cols), dtype=bool)
+		if cleaned:
+			cells = np.array(list(cleaned), dtype=np.int64).reshape(-1, 2)
+			rr, cc = cells[:, 0], cells[:, 1]
+			keep = (rr >= 0) & (rr < self.rows) & (cc >= 0) & (cc < self.cols)
+			mask[rr[keep], cc[keep]] = True
+		return mask
+
+	def _build_image(self, cleaned: Set[Tuple[int, int]]):
+		"""Convert the whole grid to an RGB image in one vectorized step."""
+		codes = self.grid.as_array()
+		img = self._color_lut()[codes]
+		mask = self._cleaned_mask(cleaned) & (codes != WALL) & (codes != OBJECT)
+		img[mask] = self._char_to_rgb("C")
+		return img
+
+	def _setup_axes(self) -> None:
 		# keep square pixels so arrows and cells line up
 		self.ax.set_aspect('equal')
 		self.ax.set_title(self.title)
 		self.ax.set_xticks([])
 		self.ax.set_yticks([])
 
-		# Draw robot as a red arrow pointing to current_dir
+	@staticmethod
+	def _arrow_points(robot_pos: Tuple[int, int], robot_dir: str):
 		rr, rc = robot_pos
 		# row/col deltas (row increases downward); plotting coords are (x=col,y=row)
 		dir_to_delta = {"N": (-1, 0), "E": (0, 1), "S": (1, 0), "W": (0, -1)}
 		dr, dc = dir_to_delta.get(robot_dir, (0, 0))
 		# scale arrow length relative to cell size; increase so it's visible
 		scale = 0.45
-		dx = dc * scale
-		dy = dr * scale
+		return (rc, rr), (rc + dc * scale, rr + dr * scale)
+
+	def _draw_robot(self, robot_pos: Tuple[int, int], robot_dir: str):
+		"""Draw the robot as a red arrow pointing to robot_dir; returns the artist."""
+		(x0, y0), (x1, y1) = self._arrow_points(robot_pos, robot_dir)
 		try:
 			# FancyArrowPatch gives reliable arrowheads and rotates exactly with dx,dy
 			from matplotlib.patches import FancyArrowPatch
 
-			arrow = FancyArrowPatch((rc, rr), (rc + dx, rr + dy), arrowstyle='->',
+			arrow = FancyArrowPatch((x0, y0), (x1, y1), arrowstyle='->',
 					mutation_scale=24, color='red', linewidth=1,
 					shrinkA=0, shrinkB=0, zorder=3, transform=self.ax.transData)
 			self.ax.add_patch(arrow)
+			return arrow
 		except Exception:
 			# final fallback: use a simple arrow (may be backend-dependent)
 			try:
-				self.ax.arrow(rc, rr, dx, dy, head_width=0.25, head_length=0.25,
+				self.ax.arrow(x0, y0, x1 - x0, y1 - y0, head_width=0.25, head_length=0.25,
 						fc='red', ec='red', length_includes_head=True)
 			except Exception:
 				# last resort: small red dot
-				self.ax.scatter([rc], [rr], c='red', s=200)
+				self.ax.scatter([x0], [y0], c='red', s=200)
+			return None
 
-		# save or show
-		if self.headless:
-			path = os.path.join(self.save_dir, f"frame_{self.frame:04d}.png")
-			self.fig.savefig(path, bbox_inches="tight")
-			print(f"Saved frame -> {path}")
-			self.frame += 1
-		else:
-			plt.pause(self.pause)
-			self.frame += 1
+	def _draw_full(self, robot_pos, robot_dir, cleaned) -> None:
+		img = self._build_image(cleaned)
+		self.ax.clear()
+		self.ax.imshow(img, origin="upper")
+		self._setup_axes()
+		self._draw_robot(robot_pos, robot_dir)
+
+	def _draw_incremental(self, robot_pos, robot_dir, cleaned) -> None:
+		if self._image_artist is None:
+			# first frame (or invalidated): paint everything once
+			self._img = self._build_image(cleaned)
+			self._painted = CellSet(self.rows, self.cols, cleaned)
+			self.ax.clear()
+			self._image_artist = self.ax.imshow(self._img, origin="upper")
+			self._setup_axes()
+			self._arrow = self._draw_robot(robot_pos, robot_dir)
+			self._last_pos = robot_pos
+			return
+
+		# cleaning only ever happens under the robot, so the cells it occupied
+		# since the last frame (plus map edits) are the only ones that can have
+		# changed colour; repaint them all, since an edit keeps the cleaned state
+		self._dirty.add(self._last_pos)
+		for (r, c) in self._dirty:
+			is_clean = (r, c) in cleaned
+			self._img[r, c] = self._cell_rgb(r, c, is_clean)
+			if is_clean:
+				self._painted.add((r, c))
+			else:
+				self._painted.discard((r, c))
+		if len(self._painted) != len(cleaned):
+			# cells changed elsewhere (e.g. cleaned set edited directly): repaint
+			self.invalidate()
+			self._draw_incremental(robot_pos, robot_dir, cleaned)
+			return
+		self._image_artist.set_data(self._img)
+
+		if self._arrow is not None:
+			self._arrow.set_positions(*self._arrow_points(robot_pos, robot_dir))
+		self._last_pos = robot_pos
 
 
 class RobotVacuum:
@@ -179,6 +492,13 @@ class RobotVacuum:
 	The robot keeps track of cleaned cells. If `forward()` would move into
 	a cell already cleaned, it returns Status.ALREADY_CLEANED (so a
 	higher-level planner can avoid revisiting).
+
+	The room is held as a RoomGrid (one byte per cell) and cleaned cells as
+	a CellSet, so a robot and its visualizer can share one grid.
+
+	'X' objects can be added and removed mid-run (add_obstacle(),
+	remove_obstacle()); planners that cache costs subscribe to the changes
+	through `map_listeners` (see pathing.DStarLite).
 	"""
 
 	DIRS = ["N", "E", "S", "W"]
@@ -186,52 +506,274 @@ class RobotVacuum:
 
 	def __init__(
 		self,
-		room_map: Sequence[Sequence[str]],
+		room_map: Union[RoomGrid, Sequence[Sequence[str]]],
 		start: Tuple[int, int] = (0, 0),
 		start_dir: str = "N",
 		visualizer: Optional[RoomVisualizer] = None,
 		auto_clean_start: bool = True,
+		trace: Optional["ActionTrace"] = None,
+		cleaned: Optional[Set[Tuple[int, int]]] = None,
+		fleet: Optional["Fleet"] = None,
 	) -> None:
 		"""Create a RobotVacuum.
 
 		Args:
-			room_map: grid of characters ('#' walls, 'X' objects, '.' open)
+			room_map: grid of characters ('#' walls, 'X' objects, '.' open),
+				or a RoomGrid (or tiles.TiledRoom) which is shared rather than copied
 			start: (row, col) start position
 			start_dir: starting facing direction 'N','E','S','W'
 			visualizer: optional RoomVisualizer to update after actions
 			auto_clean_start: if True, mark the starting cell as cleaned
+			trace: optional action_trace.ActionTrace that records every
+				action, its Status and the resulting pose
+			cleaned: optional set of cleaned cells shared with other robots
+				(a new one is created by default)
+			fleet: optional Fleet this robot belongs to; moves into a cell
+				held by another robot fail with Status.OCCUPIED
 		"""
 
-		self.room_map = [list(row) for row in room_map]
-		self.rows = len(self.room_map)
-		self.cols = len(self.room_map[0]) if self.rows else 0
+		self.grid = as_grid(room_map)
+		self.room_map = self.grid
+		self.rows = self.grid.rows
+		self.cols = self.grid.cols
 		self.r, self.c = start
 		assert 0 <= self.r < self.rows and 0 <= self.c < self.cols, "start out of bounds"
 		self.dir_idx = self.DIRS.index(start_dir)
-		self.cleaned: Set[Tuple[int, int]] = set()
+		# a dense CellSet for in-memory rooms; on-demand grids (tiles.TiledRoom)
+		# may be far larger than RAM, so only the visited cells are kept
+		if cleaned is not None:
+			self.cleaned: Set[Tuple[int, int]] = cleaned
+		elif isinstance(self.grid, RoomGrid):
+			self.cleaned = CellSet(self.rows, self.cols)
+		else:
+			self.cleaned = set()
+		self.fleet = fleet
+		self.stats: Optional["RunStats"] = None
+		# called with (r, c) whenever add_obstacle()/remove_obstacle() changes a cell
+		self.map_listeners: List[Callable[[Tuple[int, int]], None]] = []
 
 		# optionally mark starting cell as cleaned
-		if auto_clean_start and self.room_map[self.r][self.c] not in ("#", "X"):
+		if auto_clean_start and not self.grid.is_blocked(self.r, self.c):
 			self.cleaned.add((self.r, self.c))
 
+		self.trace = trace
+		if self.trace is not None:
+			self.trace.begin(self)
+
 		self.visualizer = visualizer
 		if self.visualizer:
-			self.visualizer.update((self.r, self.c), self.current_dir, self.cleaned)
+			self.visualizer.update((self.r, self.c), self.current_dir, self.cleaned, action="start")
 
 	@property
 	def current_dir(self) -> str:
 		return self.DIRS[self.dir_idx]
 
+	def rotate_to(self, dir_idx: int) -> Status:
+		"""Turn in place to face `dir_idx` using the fewest turns.
+
+		A quarter turn uses turn_left() or turn_right(); a half turn uses two
+		turn_right() calls. Each turn is a normal action (visualizer update
+		and trace entry), so the cost of reorienting stays visible.
+		"""
+		delta = (dir_idx - self.dir_idx) % 4
+		if delta == 3:
+			self.turn_left()
+		else:
+			for _ in range(delta):
+				self.turn_right()
+		return Status.OK
+
+	def face(self, direction: str) -> Status:
+		"""Turn to face 'N', 'E', 'S' or 'W' using the fewest turns."""
+		return self.rotate_to(self.DIRS.index(direction))
+
+	def sense(self) -> Tuple[Status, Status, Status, Status]:
+		"""Probe the four neighbouring cells without moving.
+
+		Returns, indexed by dir_idx (N, E, S, W), the Status a move into each
+		neighbour would get: OK, BLOCKED, OUT_OF_BOUNDS or OCCUPIED. This is
+		all a planner sees of the room in partial-observability mode (see
+		exploration.py). Sensing is not an action, so it is not traced.
+		"""
+		result = []
+		for d in self.DIRS:
+			dr, dc = self.DELTAS[d]
+			nr, nc = self.r + dr, self.c + dc
+			if not (0 <= nr < self.rows and 0 <= nc < self.cols):
+				result.append(Status.OUT_OF_BOUNDS)
+			elif self.grid.is_blocked(nr, nc):
+				result.append(Status.BLOCKED)
+			elif self.fleet is not None and self.fleet.occupant(nr, nc) not in (None, self):
+				result.append(Status.OCCUPIED)
+			else:
+				result.append(Status.OK)
+		return tuple(result)
+
+	def add_obstacle(self, r: int, c: int) -> Status:
+		"""Put an 'X' object on (r, c) while the simulation runs.
+
+		Fails with OUT_OF_BOUNDS, BLOCKED (already a wall or object) or
+		OCCUPIED (a robot stands there). On success the map listeners of the
+		robot (and of the rest of its fleet) are told about the cell.
+		"""
+		if not self.grid.in_bounds(r, c):
+			return Status.OUT_OF_BOUNDS
+		if self.grid.is_blocked(r, c):
+			return Status.BLOCKED
+		if (r, c) == (self.r, self.c) or (self.fleet is not None and self.fleet.occupant(r, c) is not None):
+			return Status.OCCUPIED
+		self._set_cell(r, c, OBJECT)
+		return Status.OK
+
+	def remove_obstacle(self, r: int, c: int) -> Status:
+		"""Take the 'X' object off (r, c). Walls cannot be removed (BLOCKED)."""
+		if not self.grid.in_bounds(r, c):
+			return Status.OUT_OF_BOUNDS
+		code = self.grid.code(r, c)
+		if code == WALL:
+			return Status.BLOCKED
+		if code == OBJECT:
+			self._set_cell(r, c, OPEN)
+		return Status.OK
+
+	def _set_cell(self, r: int, c: int, code: int) -> None:
+		self.grid.set(r, c, code)
+		robots = self.fleet.robots if self.fleet is not None else [self]
+		for robot in robots:
+			for listener in robot.map_listeners:
+				listener((r, c))
+			if robot.trace is not None:
+				robot.trace.record_edit(r, c, code)
+		if self.visualizer:
+			self.visualizer.set_cell(r, c, code)
+
+	def enable_stats(self) -> "RunStats":
+		"""Start collecting run_stats.RunStats for this robot and its visualizer.
+
+		Call before handing the robot to a planner, since planners may keep
+		references to the robot's methods. Returns the stats object (also
+		available as `robot.stats`).
+		"""
+		# imported here because run_stats imports this module
+		from run_stats import RunStats
+
+		self.disable_stats()
+		self.stats = RunStats().attach(self)
+		return self.stats
+
+	def disable_stats(self) -> None:
+		"""Stop collecting stats and restore the uninstrumented methods."""
+		if self.stats is not None:
+			self.stats.stop()
+			self.stats.detach()
+		self.stats = None
+
+	def execute(
+		self,
+		actions: Sequence[int],
+		cost_model: Optional[CostModel] = None,
+		energy_budget: Optional[float] = None,
+	) -> array:
+		"""Run a batch of Action codes in one call.
+
+		Behaves like calling the action methods one by one (same statuses,
+		same trace entries), but runs in a single loop with local state and
+		updates the visualizer once at the end instead of after every action.
+
+		Args:
+			actions: sequence of Action values (e.g. array('B') from a planner)
+			cost_model: charges each action against `energy_budget`
+			energy_budget: stop after the action that brings the energy spent
+				to or past this value (requires `cost_model`)
+
+		Returns:
+			array('B') of Status values, one per executed action; shorter
+			than `actions` if the budget ran out.
+		"""
+		if energy_budget is not None and cost_model is None:
+			raise ValueError("energy_budget requires a cost_model")
+		FORWARD, BACKWARD, TURN_LEFT, TURN_RIGHT, CLEAN = (
+			Action.FORWARD, Action.BACKWARD, Action.TURN_LEFT, Action.TURN_RIGHT, Action.CLEAN)
+		OK, BLOCKED, OUT_OF_BOUNDS = Status.OK.value, Status.BLOCKED.value, Status.OUT_OF_BOUNDS.value
+		ALREADY_CLEANED, OCCUPIED = Status.ALREADY_CLEANED.value, Status.OCCUPIED.value
+		status_of = list(Status)
+		action_of = list(Action)
+		drs = tuple(self.DELTAS[d][0] for d in self.DIRS)
+		dcs = tuple(self.DELTAS[d][1] for d in self.DIRS)
+
+		rows, cols = self.rows, self.cols
+		blocked = self.grid.is_blocked
+		cleaned = self.cleaned
+		fleet = self.fleet
+		trace = self.trace
+		energy_table = cost_model.energy_table if energy_budget is not None else None
+		spent = 0.0
+		start = (self.r, self.c)
+		newly_cleaned = [] if self.visualizer else None
+
+		r, c, d = self.r, self.c, self.dir_idx
+		statuses = array("B")
+		for action in actions:
+			if action == FORWARD or action == BACKWARD:
+				sign = 1 if action == FORWARD else -1
+				nr, nc = r + sign * drs[d], c + sign * dcs[d]
+				if not (0 <= nr < rows and 0 <= nc < cols):
+					status = OUT_OF_BOUNDS
+				elif blocked(nr, nc):
+					status = BLOCKED
+				elif fleet is not None and not fleet.move(self, nr, nc):
+					status = OCCUPIED
+				else:
+					r, c = nr, nc
+					if fleet is not None:
+						self.r, self.c = r, c
+					status = OK
+			elif action == TURN_LEFT:
+				d = (d - 1) & 3
+				status = OK
+			elif action == TURN_RIGHT:
+				d = (d + 1) & 3
+				status = OK
+			elif action == CLEAN:
+				if (r, c) in cleaned:
+					status = ALREADY_CLEANED
+				elif blocked(r, c):
+					status = BLOCKED
+				else:
+					cleaned.add((r, c))
+					if newly_cleaned is not None:
+						newly_cleaned.append((r, c))
+					status = OK
+			else:
+				raise ValueError(f"unknown action code {action}")
+			statuses.append(status)
+			if trace is not None:
+				trace.record(action_of[action], status_of[status], r, c, d)
+			if energy_table is not None:
+				spent += energy_table[2 * action + (status != OK)]
+				if spent >= energy_budget:
+					break
+
+		self.r, self.c, self.dir_idx = r, c, d
+		if self.visualizer and len(statuses):
+			self.visualizer.mark_dirty([start] + newly_cleaned)
+			self.visualizer.update((r, c), self.current_dir, cleaned, action="execute")
+		return statuses
+
 	def turn_left(self) -> Status:
 		self.dir_idx = (self.dir_idx - 1) % 4
 		if self.visualizer:
-			self.visualizer.update((self.r, self.c), self.current_dir, self.cleaned)
+			self.visualizer.update((self.r, self.c), self.current_dir, self.cleaned, action="turn_left")
+		if self.trace is not None:
+			self.trace.record(Action.TURN_LEFT, Status.OK, self.r, self.c, self.dir_idx)
 		return Status.OK
 
 	def turn_right(self) -> Status:
 		self.dir_idx = (self.dir_idx + 1) % 4
 		if self.visualizer:
-			self.visualizer.update((self.r, self.c), self.current_dir, self.cleaned)
+			self.visualizer.update((self.r, self.c), self.current_dir, self.cleaned, action="turn_right")
+		if self.trace is not None:
+			self.trace.record(Action.TURN_RIGHT, Status.OK, self.r, self.c, self.dir_idx)
 		return Status.OK
 
 	def forward(self) -> Status:
@@ -245,17 +787,20 @@ class RobotVacuum:
 
 		# bounds check
 		if not (0 <= nr < self.rows and 0 <= nc < self.cols):
-			return Status.OUT_OF_BOUNDS
-
-		cell = self.room_map[nr][nc]
-		if cell in ("#", "X"):
-			return Status.BLOCKED
-
-		# move (we allow moving into cleaned cells to support backtracking)
-		self.r, self.c = nr, nc
-		if self.visualizer:
-			self.visualizer.update((self.r, self.c), self.current_dir, self.cleaned)
-		return Status.OK
+			status = Status.OUT_OF_BOUNDS
+		elif self.grid.is_blocked(nr, nc):
+			status = Status.BLOCKED
+		elif self.fleet is not None and not self.fleet.move(self, nr, nc):
+			status = Status.OCCUPIED
+		else:
+			# move (we allow moving into cleaned cells to support backtracking)
+			self.r, self.c = nr, nc
+			status = Status.OK
+			if self.visualizer:
+				self.visualizer.update((self.r, self.c), self.current_dir, self.cleaned, action="forward")
+		if self.trace is not None:
+			self.trace.record(Action.FORWARD, status, self.r, self.c, self.dir_idx)
+		return status
 
 	def backward(self) -> Status:
 		"""Move backward one cell (opposite of current facing direction).
@@ -267,27 +812,202 @@ class RobotVacuum:
 		nr, nc = self.r - dr, self.c - dc
 
 		if not (0 <= nr < self.rows and 0 <= nc < self.cols):
-			return Status.OUT_OF_BOUNDS
-
-		cell = self.room_map[nr][nc]
-		if cell in ("#", "X"):
-			return Status.BLOCKED
-
-		self.r, self.c = nr, nc
-		if self.visualizer:
-			self.visualizer.update((self.r, self.c), self.current_dir, self.cleaned)
-		return Status.OK
+			status = Status.OUT_OF_BOUNDS
+		elif self.grid.is_blocked(nr, nc):
+			status = Status.BLOCKED
+		elif self.fleet is not None and not self.fleet.move(self, nr, nc):
+			status = Status.OCCUPIED
+		else:
+			self.r, self.c = nr, nc
+			status = Status.OK
+			if self.visualizer:
+				self.visualizer.update((self.r, self.c), self.current_dir, self.cleaned, action="backward")
+		if self.trace is not None:
+			self.trace.record(Action.BACKWARD, status, self.r, self.c, self.dir_idx)
+		return status
 
 	def clean(self) -> Status:
 		"""Mark the current cell as cleaned. Returns ALREADY_CLEANED if it was cleaned before."""
 		if (self.r, self.c) in self.cleaned:
-			return Status.ALREADY_CLEANED
-
-		if self.room_map[self.r][self.c] in ("#", "X"):
+			status = Status.ALREADY_CLEANED
+		elif self.grid.is_blocked(self.r, self.c):
 			# shouldn't happen: cleaning an impassable cell is a no-op (or treat as BLOCKED)
-			return Status.BLOCKED
+			status = Status.BLOCKED
+		else:
+			self.cleaned.add((self.r, self.c))
+			status = Status.OK
+			if self.visualizer:
+				self.visualizer.update((self.r, self.c), self.current_dir, self.cleaned, action="clean")
+		if self.trace is not None:
+			self.trace.record(Action.CLEAN, status, self.r, self.c, self.dir_idx)
+		return status
+
+
+class Fleet:
+	"""Several RobotVacuums cleaning one room together.
+
+	All robots share the fleet's grid and one CellSet of cleaned cells, and
+	an occupancy map makes a move into another robot's cell fail with
+	Status.OCCUPIED. partition() splits the open cells reachable from the
+	robots into balanced, connected zones, plan() computes a tour per robot
+	inside its zone, and run() steps the robots round-robin, one action
+	each per tick, so `ticks` is the simulated wall-clock coverage time.
+
+	Usage:
+		fleet = Fleet(room, starts=[(1, 1), (1, 30), (20, 1)], start_dir="E")
+		result = fleet.run()          # partition + plan + schedule
+		print(result["ticks"], result["cleaned"])
+	"""
 
-		self.cleaned.add((self.r, self.c))
-		if self.visualizer:
-			self.visualizer.update((self.r, self.c), self.current_dir, self.cleaned)
-		return Status.OK
+	def __init__(
+		self,
+		room_map: Union[RoomGrid, Sequence[Sequence[str]]],
+		starts: Sequence[Tuple[int, int]],
+		start_dir: str = "N",
+		auto_clean_start: bool = True,
+	) -> None:
+		"""Create a fleet.
+
+		Args:
+			room_map: grid of characters or a RoomGrid (shared, not copied)
+			starts: one (row, col) start per robot; cells must be distinct
+			start_dir: starting facing direction for every robot
+			auto_clean_start: if True, each robot cleans its starting cell
+		"""
+		self.grid = as_grid(room_map)
+		self.rows = self.grid.rows
+		self.cols = self.grid.cols
+		if len(starts) > 255:
+			raise ValueError("a fleet holds at most 255 robots")
+		self.cleaned = CellSet(self.rows, self.cols)
+		# occupancy: robot index + 1 per cell, 0 when free
+		self.occupancy = bytearray(self.rows * self.cols)
+		self._ids = {}
+		self.robots: List[RobotVacuum] = []
+		for i, (r, c) in enumerate(starts):
+			if self.occupancy[r * self.cols + c]:
+				raise ValueError(f"two robots start at {(r, c)}")
+			self.occupancy[r * self.cols + c] = i + 1
+			robot = RobotVacuum(self.grid, start=(r, c), start_dir=start_dir,
+					auto_clean_start=auto_clean_start, cleaned=self.cleaned, fleet=self)
+			self._ids[id(robot)] = i + 1
+			self.robots.append(robot)
+		self.zones: Optional[List[CellSet]] = None
+
+	def occupant(self, r: int, c: int) -> Optional[RobotVacuum]:
+		"""The robot standing on (r, c), if any."""
+		i = self.occupancy[r * self.cols + c]
+		return self.robots[i - 1] if i else None
+
+	def move(self, robot: RobotVacuum, r: int, c: int) -> bool:
+		"""Claim (r, c) for `robot`; False if another robot is there.
+
+		Called by RobotVacuum before it changes position.
+		"""
+		idx = r * self.cols + c
+		me = self._ids[id(robot)]
+		if self.occupancy[idx] not in (0, me):
+			return False
+		self.occupancy[robot.r * self.cols + robot.c] = 0
+		self.occupancy[idx] = me
+		return True
+
+	def partition(self) -> List[CellSet]:
+		"""Split the reachable open cells into one connected zone per robot.
+
+		Zones grow breadth-first from the robots' positions, always extending
+		the currently smallest zone, so zones stay connected and their sizes
+		differ only where a zone is walled in.
+		"""
+		rows, cols = self.rows, self.cols
+		grid = self.grid
+		owner = bytearray(rows * cols)
+		zones = [CellSet(rows, cols) for _ in self.robots]
+		frontiers = []
+		heap = []
+		for i, robot in enumerate(self.robots):
+			owner[robot.r * cols + robot.c] = i + 1
+			zones[i].add((robot.r, robot.c))
+			frontiers.append(deque([(robot.r, robot.c)]))
+			heap.append((1, i))
+		heapq.heapify(heap)
+		while heap:
+			size, i = heapq.heappop(heap)
+			frontier = frontiers[i]
+			# next unowned neighbour of zone i, in BFS order
+			claimed = None
+			while frontier and claimed is None:
+				r, c = frontier[0]
+				for dr, dc in self.robots[i].DELTAS.values():
+					nr, nc = r + dr, c + dc
+					if (0 <= nr < rows and 0 <= nc < cols and not owner[nr * cols + nc]
+							and not grid.is_blocked(nr, nc)):
+						claimed = (nr, nc)
+						break
+				else:
+					frontier.popleft()
+			if claimed is None:
+				continue
+			owner[claimed[0] * cols + claimed[1]] = i + 1
+			zones[i].add(claimed)
+			frontier.append(claimed)
+			heapq.heappush(heap, (size + 1, i))
+		self.zones = zones
+		return zones
+
+	def plan(self) -> List[array]:
+		"""Compute each robot's tour of its zone (partitioning first if needed)."""
+		# imported here because coverage imports this module
+		from coverage import KnownMapPlanner
+
+		zones = self.zones if self.zones is not None else self.partition()
+		return [KnownMapPlanner(robot, zone=zone).plan() for robot, zone in zip(self.robots, zones)]
+
+	def run(self, plans: Optional[Sequence[Sequence[int]]] = None) -> Dict[str, object]:
+		"""Execute per-robot action plans in lock-step, one action per robot per tick.
+
+		A robot whose move fails with Status.OCCUPIED waits and retries on
+		the next tick. Raises RuntimeError on any other failure, or if no
+		robot can make progress (deadlock).
+
+		Args:
+			plans: one sequence of Action values per robot (default: plan())
+
+		Returns:
+			dict with ticks, per-robot action counts, total waits and the
+			number of cleaned cells
+		"""
+		t0 = time.perf_counter()
+		if plans is None:
+			plans = self.plan()
+		plan_time = time.perf_counter() - t0
+		methods = [[getattr(robot, action.method) for action in Action] for robot in self.robots]
+		pos = [0] * len(self.robots)
+		waits = 0
+		ticks = 0
+		active = [i for i, plan in enumerate(plans) if len(plan)]
+		while active:
+			ticks += 1
+			progressed = False
+			for i in active:
+				action = plans[i][pos[i]]
+				status = methods[i][action]()
+				if status == Status.OCCUPIED:
+					waits += 1
+					continue
+				if status != Status.OK:
+					raise RuntimeError(f"robot {i}: action {pos[i]} ({Action(action).name}) failed with {status}")
+				pos[i] += 1
+				progressed = True
+			if not progressed:
+				raise RuntimeError(f"fleet deadlocked at tick {ticks}")
+			active = [i for i in active if pos[i] < len(plans[i])]
+		return {
+			"robots": len(self.robots),
+			"ticks": ticks,
+			"actions": [len(plan) for plan in plans],
+			"waits": waits,
+			"cleaned": len(self.cleaned),
+			"plan_time_s": plan_time,
+			"wall_time_s": time.perf_counter() - t0,
+		}
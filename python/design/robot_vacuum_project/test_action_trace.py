@@ -0,0 +1,103 @@
+"""Tests for action_trace: save/load and replay, including map edits.
+
+Run from this directory:
+
+	python -m pytest -q test_action_trace.py
+"""
+from __future__ import annotations
+
+import pytest
+
+import rooms
+from action_trace import ActionTrace, MapEdit, replay
+from exploration import ExplorationPlanner
+from grid import OBJECT, OPEN, as_grid
+from scaffolding import RobotVacuum, Status
+
+
+def _traced_run(room, edit=True):
+	"""Explore `room` (copied) with a trace; optionally add and remove obstacles on the way."""
+	trace = ActionTrace(meta={"room": "medium_random"})
+	robot = RobotVacuum(room.copy(), start=(1, 1), start_dir="E", trace=trace)
+	if edit:
+		assert robot.add_obstacle(1, 3) is Status.OK
+		robot.forward()
+		assert robot.add_obstacle(5, 5) is Status.OK
+		assert robot.remove_obstacle(1, 3) is Status.OK
+	ExplorationPlanner(robot).run()
+	return trace, robot
+
+
+@pytest.mark.parametrize("timestamps", [True, False])
+def test_save_load_round_trip(tmp_path, timestamps):
+	room = as_grid(rooms.TEST_ROOMS["medium_random"])
+	trace = ActionTrace(timestamps=timestamps, meta={"seed": 1})
+	robot = RobotVacuum(room.copy(), start=(1, 1), start_dir="S", trace=trace)
+	robot.add_obstacle(4, 4)
+	ExplorationPlanner(robot).run()
+	trace.save(str(tmp_path / "run.rvt"))
+	loaded = ActionTrace.load(str(tmp_path / "run.rvt"))
+	assert list(loaded) == list(trace)
+	assert list(loaded.edits()) == [MapEdit(0, 4, 4, OBJECT)]
+	assert (loaded.start, loaded.start_dir, loaded.start_cleaned) == (trace.start, trace.start_dir, True)
+	assert loaded.meta == {"seed": 1}
+
+
+def test_replay_repeats_map_edits(tmp_path):
+	room = as_grid(rooms.TEST_ROOMS["medium_random"])
+	trace, robot = _traced_run(room)
+	assert [(e.r, e.c, e.code) for e in trace.edits()] == [(1, 3, OBJECT), (5, 5, OBJECT), (1, 3, OPEN)]
+	trace.save(str(tmp_path / "run.rvt"))
+	replayed = replay(ActionTrace.load(str(tmp_path / "run.rvt")), room)
+	assert set(replayed.cleaned) == set(robot.cleaned)
+	assert (replayed.r, replayed.c, replayed.dir_idx) == (robot.r, robot.c, robot.dir_idx)
+	assert replayed.grid.is_blocked(5, 5)
+	# the caller's room is left as it was
+	assert not room.is_blocked(5, 5)
+
+
+def test_replay_without_the_edits_diverges():
+	room = rooms.empty_grid(3, 5)
+	trace = ActionTrace()
+	robot = RobotVacuum(room.copy(), start=(1, 1), start_dir="E", trace=trace)
+	robot.add_obstacle(1, 2)
+	assert robot.forward() is Status.BLOCKED
+	replay(trace, room)
+	trace.edit_at = trace.edit_at[:0]
+	with pytest.raises(ValueError, match="diverged"):
+		replay(trace, room)
+
+
+def test_replay_rejects_the_wrong_room():
+	trace, _ = _traced_run(as_grid(rooms.TEST_ROOMS["medium_random"]), edit=False)
+	with pytest.raises(ValueError):
+		replay(trace, rooms.TEST_ROOMS["large_random"])
+
+
+def test_loads_version_1_traces(tmp_path):
+	trace = ActionTrace(timestamps=False)
+	robot = RobotVacuum(rooms.empty_grid(4, 4), start=(1, 1), trace=trace)
+	robot.turn_right()
+	robot.forward()
+	trace.save(str(tmp_path / "run.rvt"))
+	data = (tmp_path / "run.rvt").read_bytes()
+	# version 1: other magic, no edit section (a zero count here)
+	(tmp_path / "v1.rvt").write_bytes(b"RVTRACE1" + data[8:-4])
+	assert list(ActionTrace.load(str(tmp_path / "v1.rvt"))) == list(trace)
+
+
+def test_batch_traces_replay_from_their_room_spec(tmp_path):
+	import roomfile
+	from batch import RoomSpec, random_room_specs, room_file_specs, run_one
+
+	roomfile.save_room(rooms.random_grid(11, 13, seed=8), str(tmp_path / "room.rvm"))
+	specs = random_room_specs([(10, 12)], [3]) + room_file_specs([str(tmp_path / "room.rvm")])
+	for spec in specs:
+		result = run_one(("dfs", spec, "E", {}, False, str(tmp_path)))
+		trace = ActionTrace.load(result["trace"])
+		rebuilt = RoomSpec.from_meta(trace.meta)
+		assert rebuilt == spec
+		robot = replay(trace, rebuilt.build(writable=True))
+		assert len(robot.cleaned) == result["cleaned"]
+	assert RoomSpec.from_meta({"room": "spiral"}).build().rows == as_grid(rooms.TEST_ROOMS["spiral"]).rows
+	assert RoomSpec.from_meta({}) is None
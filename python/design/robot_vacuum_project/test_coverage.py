@@ -0,0 +1,61 @@
+"""Tests for the coverage planners.
+
+Run from this directory:
+
+	python -m pytest -q test_coverage.py
+"""
+from __future__ import annotations
+
+import pytest
+
+import rooms
+from coverage import CoveragePlanner, KnownMapPlanner
+from grid import as_grid
+from reachability import label_components
+from scaffolding import Action, RobotVacuum
+
+
+def _start_region(room):
+	"""The room's largest open region and its row-major first cell."""
+	grid = as_grid(rooms.TEST_ROOMS[room])
+	comps = label_components(grid)
+	region = set(comps.cells(comps.largest()))
+	return grid, region, min(region)
+
+
+@pytest.mark.parametrize("options", [{}, {"stop_when_done": True}, {"clean_on_entry": True}, {"jump": True},
+		{"legacy_turns": True}])
+@pytest.mark.parametrize("start_dir", RobotVacuum.DIRS)
+@pytest.mark.parametrize("room", sorted(rooms.TEST_ROOMS))
+def test_coverage_planner_cleans_start_region(room, start_dir, options):
+	grid, region, start = _start_region(room)
+	robot = RobotVacuum(grid, start=start, start_dir=start_dir)
+	CoveragePlanner(robot, **options).run()
+	assert set(robot.cleaned) == region
+
+
+@pytest.mark.parametrize("start_dir", RobotVacuum.DIRS)
+@pytest.mark.parametrize("room", sorted(rooms.TEST_ROOMS))
+def test_known_map_planner_cleans_start_region(room, start_dir):
+	grid, region, start = _start_region(room)
+	robot = RobotVacuum(grid, start=start, start_dir=start_dir)
+	planner = KnownMapPlanner(robot)
+	actions = planner.plan()
+	planner.run()
+	assert set(robot.cleaned) == region
+	# one clean() per cell but the (auto-cleaned) start, nothing after the last
+	assert actions.count(Action.CLEAN) == len(region) - 1
+	assert not actions or actions[-1] == Action.CLEAN
+
+
+def test_known_map_planner_zone_stays_inside():
+	grid = rooms.empty_grid(8, 10)
+	zone = {(r, c) for r in range(1, 7) for c in range(1, 5)}
+	robot = RobotVacuum(grid, start=(1, 1), start_dir="E")
+	seen = set()
+	planner = KnownMapPlanner(robot, zone=zone)
+	for action in planner.plan():
+		getattr(robot, Action(action).method)()
+		seen.add((robot.r, robot.c))
+	assert seen <= zone
+	assert set(robot.cleaned) == zone
@@ -0,0 +1,100 @@
+"""Tests for grid.RoomGrid and grid.CellSet.
+
+Run from this directory:
+
+	python -m pytest -q test_grid.py
+"""
+from __future__ import annotations
+
+import random
+
+import pytest
+
+import rooms
+from grid import OBJECT, OPEN, WALL, CellSet, RoomGrid, as_grid, padded_cells
+
+
+def test_room_grid_round_trips_list_of_lists():
+	room = rooms.random_room(9, 13, seed=4)
+	grid = RoomGrid.from_rows(room)
+	assert grid.to_rows() == [list(row) for row in room]
+	assert [grid[r][c] for r in range(grid.rows) for c in range(grid.cols)] == [
+			ch for row in room for ch in row]
+	assert as_grid(grid) is grid
+
+
+def test_room_grid_codes_and_blocking():
+	grid = RoomGrid.from_rows(["#X. ", "C..#"])
+	assert [grid.code(0, c) for c in range(4)] == [WALL, OBJECT, OPEN, OPEN]
+	assert list(grid) == ["#X..", "C..#"]
+	assert [grid.is_blocked(0, c) for c in range(4)] == [True, True, False, False]
+	assert not grid.in_bounds(2, 0) and not grid.in_bounds(0, -1)
+	with pytest.raises(ValueError):
+		RoomGrid.from_rows(["##", "#"])
+
+
+def test_room_grid_copy_is_independent_and_compacts_stride():
+	cells = bytearray(b"\x01\x00\x00\xff" * 3)
+	grid = RoomGrid(3, 3, cells, stride=4)
+	copy = grid.copy()
+	assert copy.stride == 3 and list(copy) == list(grid)
+	copy.set(1, 1, OBJECT)
+	assert grid.code(1, 1) == OPEN
+
+
+def test_room_grid_as_array_is_a_view():
+	np = pytest.importorskip("numpy")
+	grid = rooms.empty_grid(4, 6)
+	arr = grid.as_array()
+	assert arr.shape == (4, 6) and arr.dtype == np.uint8
+	grid.set(2, 3, OBJECT)
+	assert arr[2, 3] == OBJECT
+	assert list(RoomGrid.from_array(arr.copy())) == list(grid)
+
+
+def test_cell_set_matches_builtin_set():
+	rng = random.Random(0)
+	cells = CellSet(7, 9)
+	reference = set()
+	for _ in range(500):
+		cell = (rng.randrange(7), rng.randrange(9))
+		if rng.random() < 0.6:
+			cells.add(cell)
+			reference.add(cell)
+		else:
+			cells.discard(cell)
+			reference.discard(cell)
+		assert len(cells) == len(reference)
+	assert set(cells) == reference
+	assert list(cells) == sorted(reference)
+	assert (7, 0) not in cells and (-1, 0) not in cells
+	with pytest.raises(ValueError):
+		cells.add((0, 9))
+
+	copy = cells.copy()
+	copy.clear()
+	assert len(copy) == 0 and set(cells) == reference
+
+
+class _OnDemandGrid:
+	"""Minimal non-RoomGrid grid, like tiles.TiledRoom."""
+
+	def __init__(self, grid):
+		self.rows, self.cols, self._grid = grid.rows, grid.cols, grid
+
+	def is_blocked(self, r, c):
+		return self._grid.is_blocked(r, c)
+
+
+def test_padded_cells_layout():
+	grid = RoomGrid.from_rows(["#.X", "C.."])
+	width = grid.cols + 2
+	cells = padded_cells(grid, open_code=7, blocked_code=5, ring_code=9)
+	assert len(cells) == (grid.rows + 2) * width
+	inside = [[cells[(r + 1) * width + c + 1] for c in range(grid.cols)] for r in range(grid.rows)]
+	assert inside == [[5, 7, 5], [7, 7, 7]]
+	ring = [i for i in range(len(cells)) if not (1 <= i // width <= grid.rows and 1 <= i % width <= grid.cols)]
+	assert all(cells[i] == 9 for i in ring)
+	assert padded_cells(_OnDemandGrid(grid)) == padded_cells(grid)
+	zoned = padded_cells(grid, zone={(1, 1), (1, 2), (0, 2)})
+	assert [zoned[(r + 1) * width + c + 1] for r in range(2) for c in range(3)] == [0, 0, 0, 0, 1, 1]
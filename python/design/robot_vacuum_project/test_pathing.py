@@ -0,0 +1,135 @@
+"""Tests for pathing: A*, the incremental distance field and D* Lite.
+
+Run from this directory:
+
+	python -m pytest -q test_pathing.py
+"""
+from __future__ import annotations
+
+import random
+from collections import deque
+
+import pytest
+
+import rooms
+from grid import as_grid
+from pathing import DistanceField, DStarLite, astar, navigate
+from scaffolding import Action, RobotVacuum, Status
+
+
+def _open_cells(grid):
+	return [(r, c) for r in range(grid.rows) for c in range(grid.cols) if not grid.is_blocked(r, c)]
+
+
+def _bfs_actions(grid, start, dir_idx, goal):
+	"""Reference for astar(): breadth-first search over (r, c, dir_idx) states."""
+	deltas = [RobotVacuum.DELTAS[d] for d in RobotVacuum.DIRS]
+	first = (start[0], start[1], dir_idx)
+	seen = {first: 0}
+	queue = deque([first])
+	while queue:
+		r, c, d = state = queue.popleft()
+		if (r, c) == goal:
+			return seen[state]
+		dr, dc = deltas[d]
+		for nxt in ((r, c, (d - 1) % 4), (r, c, (d + 1) % 4), (r + dr, c + dc, d), (r - dr, c - dc, d)):
+			if nxt not in seen and grid.in_bounds(nxt[0], nxt[1]) and not grid.is_blocked(nxt[0], nxt[1]):
+				seen[nxt] = seen[state] + 1
+				queue.append(nxt)
+	return None
+
+
+def _bfs_distances(grid, cleaned):
+	"""Reference for DistanceField: multi-source BFS from every uncleaned open cell."""
+	dist = {cell: DistanceField.UNREACHABLE for cell in _open_cells(grid)}
+	queue = [cell for cell in dist if cell not in cleaned]
+	for cell in queue:
+		dist[cell] = 0
+	for (r, c) in queue:
+		for n in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+			if dist.get(n) == DistanceField.UNREACHABLE:
+				dist[n] = dist[(r, c)] + 1
+				queue.append(n)
+	return dist
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_astar_is_cheapest_and_drives_to_goal(seed):
+	grid = rooms.random_grid(12, 15, obstacle_prob=0.2, seed=seed)
+	rng = random.Random(seed)
+	cells = _open_cells(grid)
+	for _ in range(20):
+		start, goal = rng.choice(cells), rng.choice(cells)
+		dir_idx = rng.randrange(4)
+		actions = astar(grid, start, dir_idx, goal)
+		expected = _bfs_actions(grid, start, dir_idx, goal)
+		if expected is None:
+			assert actions is None
+			continue
+		assert len(actions) == expected
+		robot = RobotVacuum(grid, start=start, start_dir=RobotVacuum.DIRS[dir_idx])
+		for action in actions:
+			assert getattr(robot, Action(action).method)() is Status.OK
+		assert (robot.r, robot.c) == goal
+
+
+@pytest.mark.parametrize("room", ["medium_random", "spiral", "concentric"])
+def test_distance_field_repair_matches_fresh_bfs(room):
+	grid = as_grid(rooms.TEST_ROOMS[room])
+	cells = _open_cells(grid)
+	random.Random(0).shuffle(cells)
+	# never fall back to rebuild(), so every query goes through the repair
+	field = DistanceField(grid, rebuild_fraction=float("inf"))
+	cleaned = set()
+	for i, cell in enumerate(cells):
+		field.mark_cleaned(cell)
+		cleaned.add(cell)
+		if i % 3 == 0 or i == len(cells) - 1:
+			expected = _bfs_distances(grid, cleaned)
+			assert {cell: field.distance(cell) for cell in expected} == expected
+	assert field.rebuilds == 1
+	assert field.repairs > 0
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_dstar_lite_matches_astar_after_edits(seed):
+	rng = random.Random(seed)
+	grid = rooms.random_grid(16, 20, obstacle_prob=0.15, seed=seed)
+	cells = _open_cells(grid)
+	start, goal = cells[0], cells[-1]
+	robot = RobotVacuum(grid, start=start, start_dir="E")
+	planner = DStarLite(robot.grid, start, robot.dir_idx, goal)
+	robot.map_listeners.append(planner.update_cell)
+	added = []
+	for _ in range(40):
+		if added and rng.random() < 0.3:
+			robot.remove_obstacle(*added.pop(rng.randrange(len(added))))
+		else:
+			cell = rng.choice(cells)
+			if cell != goal and robot.add_obstacle(*cell) is Status.OK:
+				added.append(cell)
+		# follow the current plan for a step now and then, so the start moves too
+		action = planner.next_action() if planner.compute() is not None else None
+		if action is not None and rng.random() < 0.5:
+			getattr(robot, Action(action).method)()
+			planner.move_to(robot.r, robot.c, robot.dir_idx)
+
+		expected = astar(robot.grid, (robot.r, robot.c), robot.dir_idx, goal)
+		cost = planner.compute()
+		if expected is None:
+			assert cost is None
+		else:
+			assert cost == len(expected)
+			assert len(planner.path()) == cost
+
+
+def test_navigate_replans_around_new_obstacle():
+	grid = rooms.empty_grid(7, 12)
+	robot = RobotVacuum(grid, start=(3, 1), start_dir="E")
+	planner = DStarLite(robot.grid, (3, 1), robot.dir_idx, (3, 10))
+	robot.map_listeners.append(planner.update_cell)
+	assert navigate(robot, planner, max_actions=3) is Status.OUT_OF_BOUNDS
+	robot.add_obstacle(3, 6)
+	assert navigate(robot, planner) is Status.OK
+	assert (robot.r, robot.c) == (3, 10)
+	assert grid.is_blocked(3, 6)
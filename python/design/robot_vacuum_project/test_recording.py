@@ -0,0 +1,63 @@
+"""Tests for recording: frame logs and streamed GIFs.
+
+Run from this directory:
+
+	python -m pytest -q test_recording.py
+"""
+from __future__ import annotations
+
+import pytest
+
+import recording
+import rooms
+from coverage import CoveragePlanner
+from grid import CLEANED
+from scaffolding import RobotVacuum, RoomVisualizer
+
+pytestmark = pytest.mark.skipif(not recording.MATPLOTLIB_AVAILABLE, reason="needs numpy and matplotlib")
+
+
+def _record_run(path):
+	"""Clean medium_random with every frame recorded to `path`; returns the robot."""
+	viz = RoomVisualizer(rooms.TEST_ROOMS["medium_random"], record=str(path), pause=0.0)
+	robot = RobotVacuum(viz.grid, start=(1, 1), start_dir="E", visualizer=viz)
+	CoveragePlanner(robot).run()
+	viz.close()
+	return robot, viz
+
+
+def test_frame_log_round_trip(tmp_path):
+	robot, viz = _record_run(tmp_path / "run.rvf")
+	frames = list(recording.read_frame_log(str(tmp_path / "run.rvf")))
+	assert len(frames) == viz.frame
+	pos, robot_dir, grid = frames[-1]
+	assert pos == (robot.r, robot.c) and robot_dir == RobotVacuum.DIRS[robot.dir_idx]
+	cleaned = {(r, c) for r in range(grid.rows) for c in range(grid.cols) if grid.code(r, c) == CLEANED}
+	assert cleaned == set(robot.cleaned)
+
+
+def test_gif_from_frame_log_matches_cell_images(tmp_path):
+	image = pytest.importorskip("PIL.Image")
+	np = pytest.importorskip("numpy")
+	_record_run(tmp_path / "run.rvf")
+	log = str(tmp_path / "run.rvf")
+	count = recording.frame_log_to_video(log, str(tmp_path / "run.gif"), scale=4)
+	frames = list(recording._iter_frame_log(log))
+	assert count == len(frames)
+
+	lut = recording.rgb_lut()
+	with image.open(tmp_path / "run.gif") as gif:
+		assert gif.n_frames == count
+		for i in (0, count // 2, count - 1):
+			gif.seek(i)
+			pos, robot_dir, codes, rows, cols = frames[i]
+			expected = recording.cell_image(lut, codes, rows, cols, pos, robot_dir, 4)
+			assert np.array_equal(np.asarray(gif.convert("RGB")), expected)
+
+
+def test_open_sink_by_extension(tmp_path):
+	assert isinstance(recording.open_sink(None, save_dir=str(tmp_path)), recording.PNGSequenceSink)
+	assert isinstance(recording.open_sink("run.gif"), recording.GifSink)
+	assert isinstance(recording.open_sink("run.rvf"), recording.FrameLogSink)
+	with pytest.raises(TypeError):
+		recording.FrameSink()
@@ -0,0 +1,70 @@
+"""Tests for roomfile: binary room files and ASCII rooms.
+
+Run from this directory:
+
+	python -m pytest -q test_roomfile.py
+"""
+from __future__ import annotations
+
+import pytest
+
+import roomfile
+import rooms
+from grid import OBJECT, OPEN, WALL
+
+
+def test_binary_round_trip(tmp_path):
+	grid = rooms.random_grid(17, 23, seed=3)
+	path = str(tmp_path / "room.rvm")
+	roomfile.save_room(grid, path)
+	for loaded in (roomfile.open_room(path), roomfile.load_room(path)):
+		assert (loaded.rows, loaded.cols) == (grid.rows, grid.cols)
+		assert list(loaded) == list(grid)
+
+
+def test_open_room_modes(tmp_path):
+	path = str(tmp_path / "room.rvm")
+	roomfile.save_room(rooms.empty_grid(4, 5), path)
+	with pytest.raises(TypeError):
+		roomfile.open_room(path, "r").set(1, 1, OBJECT)
+	roomfile.open_room(path, "c").set(1, 1, OBJECT)
+	assert roomfile.load_room(path).code(1, 1) == OPEN
+	roomfile.open_room(path, "r+").set(1, 1, OBJECT)
+	assert roomfile.load_room(path).code(1, 1) == OBJECT
+
+
+def test_not_a_room_file(tmp_path):
+	path = tmp_path / "junk.rvm"
+	path.write_bytes(b"not a room" * 10)
+	with pytest.raises(ValueError):
+		roomfile.load_room(str(path))
+
+
+def test_ascii_round_trip(tmp_path):
+	grid = rooms.random_grid(9, 14, seed=5)
+	path = str(tmp_path / "room.txt")
+	roomfile.write_ascii_room(grid, path)
+	assert list(roomfile.read_ascii_room(path)) == list(grid)
+
+
+def test_ascii_keeps_rows_of_spaces_and_ignores_crlf(tmp_path):
+	path = tmp_path / "room.txt"
+	path.write_bytes(b"####\r\n#  #\r\n    \r\n####\r\n\r\n\n")
+	grid = roomfile.read_ascii_room(str(path))
+	assert (grid.rows, grid.cols) == (4, 4)
+	assert [grid.code(2, c) for c in range(4)] == [OPEN] * 4
+	assert grid.code(3, 0) == WALL
+
+
+def test_ascii_robot_and_cleaned_cells(tmp_path):
+	path = tmp_path / "frame.txt"
+	path.write_text("#####\n#C>X#\n#####")
+	assert roomfile.read_ascii_room(str(path))[1] == "#..X#"
+	assert roomfile.read_ascii_room(str(path), keep_cleaned=True)[1] == "#C.X#"
+
+
+def test_ascii_ragged_rows_raise(tmp_path):
+	path = tmp_path / "room.txt"
+	path.write_text("####\n#..#\n\n####\n")
+	with pytest.raises(ValueError, match="row 2"):
+		roomfile.read_ascii_room(str(path))
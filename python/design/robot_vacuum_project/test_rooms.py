@@ -0,0 +1,53 @@
+"""Tests for the rooms registry and lazily built TEST_ROOMS.
+
+Run from this directory:
+
+    python -m pytest -q test_rooms.py
+"""
+from __future__ import annotations
+
+from functools import partial
+
+import pytest
+
+import rooms
+
+
+def test_lazy_rooms_build_once_and_invalidate():
+    built = []
+
+    def factory():
+        built.append(1)
+        return rooms.empty_room(3, 4)
+
+    lazy = rooms.LazyRooms({"box": factory})
+    assert list(lazy) == ["box"] and len(lazy) == 1
+    assert not lazy.is_built("box")
+    room = lazy["box"]
+    assert lazy["box"] is room and len(built) == 1
+    lazy.invalidate("box")
+    assert lazy["box"] is not room and len(built) == 2
+    with pytest.raises(KeyError):
+        lazy["missing"]
+
+
+def test_register_room_round_trip():
+    name = "test_rooms_tmp"
+    try:
+        rooms.register_room(name, partial(rooms.empty_room, 4, 5))
+        assert rooms.TEST_ROOMS[name] == rooms.empty_room(4, 5)
+        with pytest.raises(KeyError):
+            rooms.register_room(name, partial(rooms.empty_room, 6, 6))
+        rooms.register_room(name, partial(rooms.empty_room, 6, 6), replace=True)
+        assert len(rooms.TEST_ROOMS[name]) == 6
+    finally:
+        rooms.ROOM_REGISTRY.pop(name, None)
+        rooms.TEST_ROOMS.invalidate(name)
+    assert name not in rooms.TEST_ROOMS
+
+
+def test_named_test_rooms_match_test_rooms():
+    fresh = rooms.named_test_rooms()
+    assert sorted(fresh) == sorted(rooms.TEST_ROOMS)
+    for name, room in fresh.items():
+        assert room == rooms.TEST_ROOMS[name]
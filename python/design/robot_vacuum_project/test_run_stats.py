@@ -0,0 +1,36 @@
+"""Tests for run_stats.RunStats.
+
+Run from this directory:
+
+	python -m pytest -q test_run_stats.py
+"""
+from __future__ import annotations
+
+import contextlib
+import io
+
+import pytest
+
+import rooms
+from coverage import CoveragePlanner
+from scaffolding import RenderPolicy, RobotVacuum, RoomVisualizer
+
+
+@pytest.mark.parametrize("every", [5, 10 ** 9])
+def test_breakdown_parts_sum_to_wall_time(tmp_path, every):
+	viz = RoomVisualizer(rooms.TEST_ROOMS["small_empty"], save_dir=str(tmp_path), pause=0.0,
+			policy=RenderPolicy(every=every))
+	robot = RobotVacuum(viz.grid, start=(1, 1), start_dir="E", visualizer=viz)
+	stats = robot.enable_stats()
+	with contextlib.redirect_stdout(io.StringIO()):
+		CoveragePlanner(robot).run()
+	stats.stop()
+	robot.disable_stats()
+
+	parts = stats.breakdown()
+	wall = parts.pop("wall")
+	assert all(seconds >= 0 for seconds in parts.values()), parts
+	assert sum(parts.values()) == pytest.approx(wall, rel=0.01)
+	# the final flush() draws a frame outside any action
+	assert stats.calls["viz.flush"] == 1
+	assert parts["render"] > 0
@@ -0,0 +1,50 @@
+"""Tests for tiles.TiledRoom (skipped without numpy).
+
+Run from this directory:
+
+	python -m pytest -q test_tiles.py
+"""
+from __future__ import annotations
+
+import pytest
+
+from grid import OBJECT, OPEN, WALL
+
+pytest.importorskip("numpy")
+from tiles import TiledRoom
+
+
+def _cells(room):
+	return [[room.code(r, c) for c in range(room.cols)] for r in range(room.rows)]
+
+
+def test_tiles_are_deterministic_and_survive_eviction():
+	room = TiledRoom(45, 70, obstacle_prob=0.2, seed=3, tile_size=16, max_tiles=64)
+	expected = _cells(room)
+	# a one-tile cache rebuilds tiles all the time and must give the same map
+	small = TiledRoom(45, 70, obstacle_prob=0.2, seed=3, tile_size=16, max_tiles=1)
+	assert _cells(small) == expected
+	assert small.evictions > 0
+	assert any(OBJECT in row for row in expected)
+	assert all(code == WALL for code in expected[0] + expected[-1])
+	assert all(row[0] == WALL and row[-1] == WALL for row in expected)
+
+
+def test_edits_survive_eviction():
+	room = TiledRoom(40, 40, obstacle_prob=0.0, seed=1, tile_size=8, max_tiles=1)
+	room.set(5, 5, OBJECT)
+	room.code(30, 30)  # evicts the edited tile
+	assert room.is_blocked(5, 5)
+	room.set(5, 5, OPEN)
+	room.code(30, 30)
+	assert not room.is_blocked(5, 5)
+
+
+def test_iter_tiles_stitches_back_to_the_map():
+	room = TiledRoom(21, 30, obstacle_prob=0.3, seed=9, tile_size=8)
+	stitched = [[None] * room.cols for _ in range(room.rows)]
+	for tr, tc, grid in room.iter_tiles():
+		for r in range(grid.rows):
+			for c in range(grid.cols):
+				stitched[tr * 8 + r][tc * 8 + c] = grid.code(r, c)
+	assert stitched == _cells(room)
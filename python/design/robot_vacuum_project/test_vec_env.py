@@ -0,0 +1,67 @@
+"""Tests for vec_env.VecRobotVacuum (skipped without numpy).
+
+Run from this directory:
+
+	python -m pytest -q test_vec_env.py
+"""
+from __future__ import annotations
+
+import random
+
+import pytest
+
+import rooms
+from grid import as_grid
+from scaffolding import Action, RobotVacuum, Status
+
+np = pytest.importorskip("numpy")
+from vec_env import VecRobotVacuum
+
+
+def _open_cells(grid):
+	return [(r, c) for r in range(grid.rows) for c in range(grid.cols) if not grid.is_blocked(r, c)]
+
+
+def _assert_matches(env, robots):
+	for i, robot in enumerate(robots):
+		assert tuple(env.positions[i]) == (robot.r, robot.c)
+		assert env.dir_idx[i] == robot.dir_idx
+		assert env.cleaned_count[i] == len(robot.cleaned)
+		assert set(zip(*np.nonzero(env.cleaned[i]))) == set(robot.cleaned)
+
+
+@pytest.mark.parametrize("room", ["medium_random", "narrow_corridor", "spiral"])
+def test_matches_robot_vacuum_step_for_step(room):
+	grid = as_grid(rooms.TEST_ROOMS[room])
+	rng = random.Random(1)
+	starts = rng.sample(_open_cells(grid), 6)
+	dirs = [rng.choice(RobotVacuum.DIRS) for _ in starts]
+	env = VecRobotVacuum(grid, num_envs=len(starts), start=starts, start_dir=dirs)
+	robots = [RobotVacuum(grid, start=s, start_dir=d) for s, d in zip(starts, dirs)]
+	for _ in range(300):
+		actions = [rng.randrange(len(Action)) for _ in robots]
+		statuses = env.step(np.array(actions))
+		for i, (robot, action) in enumerate(zip(robots, actions)):
+			assert statuses[i] == getattr(robot, Action(action).method)().value
+		sensed = env.sense()
+		for i, robot in enumerate(robots):
+			assert [Status(s) for s in sensed[i]] == list(robot.sense())
+	_assert_matches(env, robots)
+
+
+def test_from_rooms_and_masked_reset():
+	grids = [rooms.random_grid(10, 12, seed=seed) for seed in range(3)]
+	starts = [_open_cells(grid)[0] for grid in grids]
+	env = VecRobotVacuum.from_rooms(grids, start=starts, start_dir="S")
+	robots = [RobotVacuum(grid, start=s, start_dir="S") for grid, s in zip(grids, starts)]
+	rng = random.Random(2)
+	for _ in range(100):
+		actions = [rng.randrange(len(Action)) for _ in robots]
+		env.step(np.array(actions))
+		for robot, action in zip(robots, actions):
+			getattr(robot, Action(action).method)()
+	_assert_matches(env, robots)
+
+	env.reset(np.array([False, True, False]))
+	robots[1] = RobotVacuum(grids[1], start=starts[1], start_dir="S")
+	_assert_matches(env, robots)
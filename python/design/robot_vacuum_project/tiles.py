@@ -0,0 +1,157 @@
+"""Tiled, on-demand room generation for floor plans larger than RAM.
+
+A TiledRoom describes a random_room-style map (border walls, interior 'X'
+obstacles with probability `obstacle_prob`) without ever materializing it.
+The map is cut into square tiles; tile (tr, tc) is generated
+deterministically from (seed, tr, tc), so any tile can be rebuilt after it
+has been evicted. At most `max_tiles` tiles are kept in an LRU cache, which
+bounds memory to about max_tiles * tile_size**2 bytes.
+
+A TiledRoom has the grid interface RobotVacuum needs (rows, cols, code(),
+is_blocked(), in_bounds(), set()), so it can be passed as the room map:
+
+	room = TiledRoom(200_000, 200_000, obstacle_prob=0.1, seed=7)
+	robot = RobotVacuum(room, start=(1, 1))
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Dict, Iterator, Tuple
+
+import numpy as np
+
+from grid import OBJECT, OPEN, WALL, RoomGrid
+
+
+class TiledRoom:
+	"""Deterministic random room generated and cached tile by tile.
+
+	Args:
+		rows, cols: map dimensions
+		obstacle_prob: probability each interior cell is an 'X' object
+		seed: map seed; tile (tr, tc) uses numpy.random.default_rng([seed, tr, tc])
+		tile_size: tile edge length in cells
+		max_tiles: tiles kept in the LRU cache
+	"""
+
+	def __init__(
+		self,
+		rows: int,
+		cols: int,
+		obstacle_prob: float = 0.12,
+		seed: int = 0,
+		tile_size: int = 256,
+		max_tiles: int = 64,
+	) -> None:
+		if rows <= 0 or cols <= 0:
+			raise ValueError("rows and cols must be > 0")
+		if max_tiles < 1:
+			raise ValueError("max_tiles must be >= 1")
+		self.rows = rows
+		self.cols = cols
+		self.obstacle_prob = obstacle_prob
+		self.seed = seed
+		self.tile_size = tile_size
+		self.max_tiles = max_tiles
+		self.tile_rows = -(-rows // tile_size)
+		self.tile_cols = -(-cols // tile_size)
+
+		self._tiles: "OrderedDict[Tuple[int, int], bytearray]" = OrderedDict()
+		# the robot is local, so remember the last tile to skip LRU bookkeeping
+		self._last_key = None
+		self._last_tile = None
+		# cells changed with set(); re-applied when an evicted tile is rebuilt
+		self._edits: Dict[Tuple[int, int], int] = {}
+
+		# cache statistics; lookups in the last-used tile are not counted
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+	def generate_tile(self, tr: int, tc: int):
+		"""Build tile (tr, tc) from scratch as a (tile_size, tile_size) uint8 array.
+
+		Cells past the map edge are WALL.
+		"""
+		ts = self.tile_size
+		rng = np.random.default_rng([self.seed, tr, tc])
+		threshold = round(self.obstacle_prob * 65536)
+		draws = rng.integers(0, 65536, size=(ts, ts), dtype=np.uint16)
+		tile = np.where(draws < threshold, OBJECT, OPEN).astype(np.uint8)
+
+		# global border walls, and everything outside the map
+		r0, c0 = tr * ts, tc * ts
+		rr = np.arange(r0, r0 + ts)[:, None]
+		cc = np.arange(c0, c0 + ts)[None, :]
+		edge = (rr <= 0) | (rr >= self.rows - 1) | (cc <= 0) | (cc >= self.cols - 1)
+		tile[np.broadcast_to(edge, tile.shape)] = WALL
+		return tile
+
+	def _load(self, key: Tuple[int, int]) -> bytearray:
+		tile = self._tiles.get(key)
+		if tile is not None:
+			self.hits += 1
+			self._tiles.move_to_end(key)
+		else:
+			self.misses += 1
+			tile = bytearray(self.generate_tile(*key).tobytes())
+			if self._edits:
+				ts = self.tile_size
+				r0, c0 = key[0] * ts, key[1] * ts
+				for (r, c), code in self._edits.items():
+					if r0 <= r < r0 + ts and c0 <= c < c0 + ts:
+						tile[(r - r0) * ts + (c - c0)] = code
+			self._tiles[key] = tile
+			if len(self._tiles) > self.max_tiles:
+				self._tiles.popitem(last=False)
+				self.evictions += 1
+		self._last_key = key
+		self._last_tile = tile
+		return tile
+
+	def code(self, r: int, c: int) -> int:
+		ts = self.tile_size
+		key = (r // ts, c // ts)
+		tile = self._last_tile if key == self._last_key else self._load(key)
+		return tile[(r % ts) * ts + (c % ts)]
+
+	def is_blocked(self, r: int, c: int) -> bool:
+		code = self.code(r, c)
+		return code == WALL or code == OBJECT
+
+	def in_bounds(self, r: int, c: int) -> bool:
+		return 0 <= r < self.rows and 0 <= c < self.cols
+
+	def set(self, r: int, c: int, code: int) -> None:
+		"""Change one cell; the edit survives tile eviction."""
+		self._edits[(r, c)] = code
+		ts = self.tile_size
+		key = (r // ts, c // ts)
+		tile = self._tiles.get(key)
+		if tile is not None:
+			tile[(r % ts) * ts + (c % ts)] = code
+
+	@property
+	def cached_bytes(self) -> int:
+		return len(self._tiles) * self.tile_size * self.tile_size
+
+	def tile_grid(self, tr: int, tc: int) -> RoomGrid:
+		"""Tile (tr, tc) clipped to the map edge, as a standalone RoomGrid."""
+		ts = self.tile_size
+		rows = min(ts, self.rows - tr * ts)
+		cols = min(ts, self.cols - tc * ts)
+		tile = self._load((tr, tc))
+		return RoomGrid(rows, cols, bytearray(tile), stride=ts)
+
+	def iter_tiles(self) -> Iterator[Tuple[int, int, RoomGrid]]:
+		"""Stream every tile in row-major order as (tr, tc, grid)."""
+		for tr in range(self.tile_rows):
+			for tc in range(self.tile_cols):
+				yield tr, tc, self.tile_grid(tr, tc)
+
+	def __repr__(self) -> str:
+		return (f"TiledRoom(rows={self.rows}, cols={self.cols}, seed={self.seed}, "
+				f"tile_size={self.tile_size}, cached={len(self._tiles)}/{self.max_tiles})")
+
+
+__all__ = ["TiledRoom"]
@@ -0,0 +1,198 @@
+"""Many independent RobotVacuum simulations stepped in lockstep with NumPy.
+
+VecRobotVacuum keeps the state of N robots in arrays instead of N Python
+objects. Each robot has a position, a facing direction and a cleaned
+mask. One step(actions) call applies one Action per robot with a few
+whole-array operations. The semantics match RobotVacuum: the Action codes,
+the Status codes returned, and DIRS/DELTAS for the facing. A robot in env
+i behaves exactly like RobotVacuum(room_i, ...) given the same actions.
+
+	env = VecRobotVacuum(rooms.random_grid(24, 36, seed=0), num_envs=4096, start=(1, 1))
+	actions = np.random.default_rng(0).integers(0, len(Action), size=env.num_envs)
+	statuses = env.step(actions)        # uint8 Status values, one per env
+	env.cleaned_count                   # cells cleaned per env
+
+Rooms are stored padded with an out-of-bounds ring, so a move is a table
+lookup on the target cell and needs no bounds check. All envs can share
+one room (no per-env copy of the map) or each can have its own room of the
+same size (from_rooms()). Unlike RobotVacuum there are no visualizer,
+trace, fleet or stats hooks; the envs are independent.
+
+numpy is required by this module.
+"""
+from __future__ import annotations
+
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from grid import as_grid, padded_cells
+from scaffolding import Action, RobotVacuum, Status
+
+# padded cell codes
+_OPEN, _BLOCKED, _OUTSIDE = 0, 1, 2
+
+# per Action: direction change and move sign (forward +1, backward -1)
+_TURN = np.array([-1, 1, 0, 0, 0], dtype=np.int8)
+_MOVE = np.array([0, 0, 1, -1, 0], dtype=np.int8)
+# padded cell code -> Status of a move into it
+_MOVE_STATUS = np.array([Status.OK.value, Status.BLOCKED.value, Status.OUT_OF_BOUNDS.value], dtype=np.uint8)
+
+
+def _padded_codes(room_map) -> np.ndarray:
+	"""(rows + 2, cols + 2) uint8 array of _OPEN/_BLOCKED with an _OUTSIDE ring."""
+	grid = as_grid(room_map)
+	cells = padded_cells(grid, open_code=_OPEN, blocked_code=_BLOCKED, ring_code=_OUTSIDE)
+	return np.frombuffer(cells, dtype=np.uint8).reshape(grid.rows + 2, grid.cols + 2)
+
+
+class VecRobotVacuum:
+	"""N RobotVacuum simulations whose state lives in NumPy arrays.
+
+	Args:
+		room_map: room shared by every env (RoomGrid or list-of-lists map)
+		num_envs: number of robots / environments
+		start: (row, col) for every env, or an (num_envs, 2) array
+		start_dir: 'N', 'E', 'S' or 'W' for every env, or a sequence of them
+		auto_clean_start: mark each start cell as cleaned (like RobotVacuum)
+
+	Attributes:
+		pos: (num_envs,) int64 padded cell index of each robot
+		dir_idx: (num_envs,) int8 facing, an index into RobotVacuum.DIRS
+		cleaned_count: (num_envs,) int64 cells cleaned per env
+		steps: number of step() calls since the last reset()
+	"""
+
+	DIRS = RobotVacuum.DIRS
+	DELTAS = RobotVacuum.DELTAS
+
+	def __init__(
+		self,
+		room_map,
+		num_envs: int,
+		start: Union[Tuple[int, int], Sequence[Tuple[int, int]]] = (0, 0),
+		start_dir: Union[str, Sequence[str]] = "N",
+		auto_clean_start: bool = True,
+	) -> None:
+		self._init(_padded_codes(room_map)[None], num_envs, start, start_dir, auto_clean_start)
+
+	@classmethod
+	def from_rooms(
+		cls,
+		room_maps: Sequence,
+		start: Union[Tuple[int, int], Sequence[Tuple[int, int]]] = (0, 0),
+		start_dir: Union[str, Sequence[str]] = "N",
+		auto_clean_start: bool = True,
+	) -> "VecRobotVacuum":
+		"""One env per room; every room must have the same dimensions."""
+		codes = np.stack([_padded_codes(room) for room in room_maps])
+		env = cls.__new__(cls)
+		env._init(codes, len(room_maps), start, start_dir, auto_clean_start)
+		return env
+
+	def _init(self, codes: np.ndarray, num_envs: int, start, start_dir, auto_clean_start: bool) -> None:
+		self.num_envs = num_envs
+		self.rows = codes.shape[1] - 2
+		self.cols = codes.shape[2] - 2
+		width = self.width = self.cols + 2
+		self.size = codes.shape[1] * width
+		# flat codes: one shared room (offset 0) or one room per env
+		self._codes = codes.reshape(-1)
+		self._room_offset = (np.arange(num_envs, dtype=np.int64) * self.size
+				if codes.shape[0] > 1 else np.zeros(num_envs, dtype=np.int64))
+		self._env_offset = np.arange(num_envs, dtype=np.int64) * self.size
+		# padded index step per dir_idx (N, E, S, W)
+		self._dir_step = np.array([self.DELTAS[d][0] * width + self.DELTAS[d][1] for d in self.DIRS],
+				dtype=np.int64)
+
+		start = np.broadcast_to(np.asarray(start, dtype=np.int64), (num_envs, 2))
+		if not ((start >= 0) & (start < (self.rows, self.cols))).all():
+			raise ValueError("start out of bounds")
+		self._start_pos = (start[:, 0] + 1) * width + start[:, 1] + 1
+		dirs = [start_dir] if isinstance(start_dir, str) else list(start_dir)
+		self._start_dir = np.broadcast_to(np.array([self.DIRS.index(d) for d in dirs], dtype=np.int8),
+				(num_envs,)).copy()
+		self.auto_clean_start = auto_clean_start
+		self.reset()
+
+	def reset(self, mask: Optional[np.ndarray] = None) -> None:
+		"""Put every env (or those where `mask` is True) back to its start state."""
+		if mask is None:
+			self.pos = self._start_pos.copy()
+			self.dir_idx = self._start_dir.copy()
+			self._cleaned = np.zeros(self.num_envs * self.size, dtype=bool)
+			self.cleaned_count = np.zeros(self.num_envs, dtype=np.int64)
+			self.steps = 0
+			envs = np.arange(self.num_envs)
+		else:
+			envs = np.flatnonzero(mask)
+			self.pos[envs] = self._start_pos[envs]
+			self.dir_idx[envs] = self._start_dir[envs]
+			self._cleaned.reshape(self.num_envs, self.size)[envs] = False
+			self.cleaned_count[envs] = 0
+		if self.auto_clean_start:
+			here = self.pos[envs]
+			ok = self._codes[self._room_offset[envs] + here] == _OPEN
+			self._cleaned[self._env_offset[envs][ok] + here[ok]] = True
+			self.cleaned_count[envs] = ok
+
+	def step(self, actions) -> np.ndarray:
+		"""Apply one Action per env and return the (num_envs,) uint8 Status values.
+
+		Args:
+			actions: (num_envs,) integer Action values, or one Action for all
+		"""
+		actions = np.broadcast_to(np.asarray(actions, dtype=np.intp), (self.num_envs,))
+		pos, dir_idx = self.pos, self.dir_idx
+		statuses = np.zeros(self.num_envs, dtype=np.uint8)
+
+		# moves: look up the target cell's code in the padded room
+		move = _MOVE[actions]
+		moving = np.flatnonzero(move)
+		if moving.size:
+			target = pos[moving] + move[moving] * self._dir_step[dir_idx[moving]]
+			code = self._codes[self._room_offset[moving] + target]
+			statuses[moving] = _MOVE_STATUS[code]
+			ok = code == _OPEN
+			pos[moving[ok]] = target[ok]
+
+		# turns never fail
+		self.dir_idx = (dir_idx + _TURN[actions]) & 3
+
+		# clean: ALREADY_CLEANED, BLOCKED (standing on a blocked start) or OK
+		cleaning = np.flatnonzero(actions == Action.CLEAN)
+		if cleaning.size:
+			here = pos[cleaning]
+			flat = self._env_offset[cleaning] + here
+			already = self._cleaned[flat]
+			blocked = self._codes[self._room_offset[cleaning] + here] != _OPEN
+			statuses[cleaning] = np.where(already, Status.ALREADY_CLEANED.value,
+					np.where(blocked, Status.BLOCKED.value, Status.OK.value))
+			fresh = ~already & ~blocked
+			self._cleaned[flat[fresh]] = True
+			self.cleaned_count[cleaning[fresh]] += 1
+
+		self.steps += 1
+		return statuses
+
+	def sense(self) -> np.ndarray:
+		"""(num_envs, 4) uint8 Status of a move into each neighbour, by dir_idx (N, E, S, W)."""
+		neighbours = self.pos[:, None] + self._dir_step[None, :]
+		return _MOVE_STATUS[self._codes[self._room_offset[:, None] + neighbours]]
+
+	@property
+	def positions(self) -> np.ndarray:
+		"""(num_envs, 2) array of (row, col) robot positions."""
+		r, c = np.divmod(self.pos, self.width)
+		return np.stack([r - 1, c - 1], axis=1)
+
+	@property
+	def cleaned(self) -> np.ndarray:
+		"""(num_envs, rows, cols) bool view of the cleaned masks."""
+		return self._cleaned.reshape(self.num_envs, self.rows + 2, self.width)[:, 1:-1, 1:-1]
+
+	def __repr__(self) -> str:
+		return f"VecRobotVacuum(num_envs={self.num_envs}, rows={self.rows}, cols={self.cols})"
+
+
+__all__ = ["VecRobotVacuum"]